@@ -0,0 +1,124 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Gabungkan request inferensi dari banyak thread jadi satu forward pass.
+
+    Tiap caller `submit()` satu input (tanpa dimensi batch). Worker thread
+    mengumpulkan input sampai `max_batch_size` item atau sampai `max_wait_ms`
+    lewat sejak item pertama masuk, lalu memanggil `run_batch` sekali untuk
+    semuanya. Hasil baris ke-i dikembalikan ke caller ke-i lewat Future.
+
+    `run_batch(batch)` menerima array (B, ...) dan harus mengembalikan sequence
+    sepanjang B (mis. array prediksi (B, n_kelas)). Array batch adalah buffer
+    yang dipakai ulang, jadi jangan disimpan setelah `run_batch` selesai.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[np.ndarray], Sequence[Any]],
+        *,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[Tuple[np.ndarray, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+        self.batches = 0
+        self.items = 0
+
+        # Buffer batch dipakai ulang (hanya diakses worker thread).
+        self._buf: Optional[np.ndarray] = None
+
+    def submit(self, item: np.ndarray) -> Future:
+        fut: Future = Future()
+        self._ensure_worker()
+        self._queue.put((item, fut))
+        return fut
+
+    def predict(self, item: np.ndarray, *, timeout: Optional[float] = None):
+        """Submit lalu tunggu hasilnya (blocking)."""
+        return self.submit(item).result(timeout=timeout)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000.0, 3),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._worker.start()
+
+    def _collect(self) -> List[Tuple[np.ndarray, Future]]:
+        first = self._queue.get()
+        pending = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    # Waktu tunggu habis: ambil yang sudah antre saja, jangan menunggu lagi.
+                    pending.append(self._queue.get_nowait())
+                else:
+                    pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _fill(self, pending: List[Tuple[np.ndarray, Future]]) -> np.ndarray:
+        first = pending[0][0]
+        buf = self._buf
+        if buf is None or buf.shape[1:] != first.shape or buf.dtype != first.dtype:
+            buf = np.empty((self.max_batch_size,) + first.shape, dtype=first.dtype)
+            self._buf = buf
+        for i, (x, _) in enumerate(pending):
+            buf[i] = x
+        return buf[: len(pending)]
+
+    def _loop(self) -> None:
+        while True:
+            pending = self._collect()
+            # Caller yang sudah cancel tidak perlu ikut dihitung.
+            pending = [(x, f) for x, f in pending if f.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+
+            try:
+                batch = self._fill(pending)
+                outputs = self.run_batch(batch)
+                if len(outputs) != len(pending):
+                    raise RuntimeError(
+                        f"run_batch mengembalikan {len(outputs)} hasil untuk {len(pending)} input"
+                    )
+            except Exception as e:
+                for _, f in pending:
+                    f.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(pending)
+            for (_, f), out in zip(pending, outputs):
+                f.set_result(out)
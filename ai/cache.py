@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import PrediksiCache
+
+from .predict import model_version, predict_image_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class PredictionCache:
+    """Cache hasil klasifikasi, key = sha256(isi foto) + versi model.
+
+    Dua lapis:
+    - LRU di memori (per proses), untuk foto yang baru saja dikirim ulang.
+    - Tabel `prediksi_cache` (dibagi semua worker & tahan restart).
+
+    Error DB di lapis persisten dianggap miss, tidak menggagalkan klasifikasi.
+    Lapis persisten butuh app context.
+    """
+
+    def __init__(self, *, max_items: int = 2048, persist: bool = True):
+        self.max_items = max(0, int(max_items))
+        self.persist = persist
+
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def init_app(self, app) -> None:
+        # Tabel prediksi_cache dibuat lewat `flask ai-init-db`, bukan saat import app.
+        self.max_items = max(0, int(app.config.get("AI_CACHE_SIZE", self.max_items)))
+        self.persist = bool(app.config.get("AI_CACHE_PERSIST", self.persist))
+
+    def get(self, digest: str, version: Optional[str] = None) -> Optional[dict]:
+        key = (digest, version or model_version())
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                self._mem.move_to_end(key)
+                self.memory_hits += 1
+                return dict(hit)
+
+        hit = self._store_get(*key) if self.persist else None
+        if hit is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        self._remember(key, hit)
+        with self._lock:
+            self.store_hits += 1
+        return dict(hit)
+
+    def put(self, digest: str, result: dict, version: Optional[str] = None) -> None:
+        # Versi diambil dari hasil prediksi, bukan versi aktif saat ini: model bisa
+        # diganti / di-rollback di antara predict dan put.
+        key = (digest, version or result.get("model_version") or model_version())
+        self._remember(key, result)
+        if self.persist:
+            self._store_put(key, result)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.store_hits
+            total = hits + self.misses
+            return {
+                "memory_items": len(self._mem),
+                "max_items": self.max_items,
+                "memory_hits": self.memory_hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+            }
+
+    def _remember(self, key: Tuple[str, str], result: dict) -> None:
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._mem[key] = dict(result)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_items:
+                self._mem.popitem(last=False)
+
+    def _store_get(self, digest: str, version: str) -> Optional[dict]:
+        try:
+            row = PrediksiCache.query.filter_by(digest=digest, model_version=version).first()
+        except Exception as e:
+            logger.warning("Lookup prediksi_cache gagal: %s", e)
+            return None
+        if row is None:
+            return None
+        return {
+            "label": row.label,
+            "confidence": row.confidence,
+            "probs": json.loads(row.probs) if row.probs else {},
+            "model_version": version,
+        }
+
+    def _store_put(self, key: Tuple[str, str], result: dict) -> None:
+        digest, version = key
+        row = PrediksiCache(
+            digest=digest,
+            model_version=version,
+            label=result["label"],
+            confidence=result["confidence"],
+            probs=json.dumps(result.get("probs") or {}),
+        )
+        # Savepoint: kalau worker lain sudah menyimpan digest yang sama,
+        # cukup batalkan insert ini tanpa mengganggu perubahan lain di session.
+        try:
+            with db.session.begin_nested():
+                db.session.add(row)
+        except IntegrityError:
+            pass
+        except Exception as e:
+            logger.warning("Simpan prediksi_cache gagal: %s", e)
+
+
+prediction_cache = PredictionCache()
+
+
+def predict_image_cached(img_path: str, *, data: Optional[bytes] = None) -> dict:
+    """Seperti predict_image, tapi lewat cache dulu (perlu app context).
+
+    Kalau `data` (bytes foto) sudah ada di memori, file tidak dibaca lagi.
+    """
+    if data is None:
+        with open(img_path, "rb") as f:
+            data = f.read()
+    digest = content_digest(data)
+
+    hit = prediction_cache.get(digest)
+    if hit is not None:
+        return hit
+
+    result = predict_image_bytes(data)
+    prediction_cache.put(digest, result, version=result["model_version"])
+    return result
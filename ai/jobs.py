@@ -0,0 +1,203 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from extensions import db
+from models import KlasifikasiJob, Laporan
+
+from .cache import predict_image_cached
+from .predict import model_version
+
+logger = logging.getLogger(__name__)
+
+# Nilai ai_label selama laporan belum / gagal diklasifikasi.
+AI_LABEL_PENDING = "pending"
+AI_LABEL_FAILED = "gagal"
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class ClassificationQueue:
+    """Antrean klasifikasi foto laporan, diproses worker pool di background.
+
+    Job disimpan di tabel `klasifikasi_job` (satu baris per laporan), jadi job
+    yang belum selesai tetap ada walaupun proses restart: `start()` akan
+    menjadwalkan ulang job pending / running yang sudah basi.
+
+    Tiap job di-"claim" dengan UPDATE bersyarat (status pending -> running),
+    jadi aman walaupun beberapa worker gunicorn memulihkan job yang sama.
+    Job gagal dicoba ulang sampai AI_JOB_MAX_RETRIES kali dengan jeda
+    eksponensial; setelah itu ai_label laporan di-set "gagal".
+    """
+
+    def __init__(self):
+        self.app = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.max_retries = 3
+        self.retry_delay = 5.0
+        # Thread pool tidak ikut ter-fork: worker gunicorn (mode preload) bikin pool sendiri.
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Baca konfigurasi saja. Tabel dibuat lewat `flask ai-init-db`, job lama
+        dipulihkan lewat `start()` di proses worker (bukan saat import app)."""
+        self.app = app
+        self.max_retries = int(app.config.get("AI_JOB_MAX_RETRIES", 3))
+        self.retry_delay = float(app.config.get("AI_JOB_RETRY_DELAY", 5))
+
+    def start(self) -> int:
+        """Jadwalkan ulang job pending / running yang basi. Dipanggil sekali per
+        worker saat mulai melayani request (lihat preload.worker_start)."""
+        if not self.app.config.get("AI_ASYNC", True):
+            return 0
+        try:
+            with self.app.app_context():
+                return self.recover(stale_seconds=int(self.app.config.get("AI_JOB_STALE_SECONDS", 600)))
+        except Exception as e:
+            # DB belum siap bukan alasan worker gagal start; job lama diproses di start berikutnya.
+            logger.warning("Gagal memulihkan job klasifikasi: %s", e)
+            return 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = int(self.app.config.get("AI_JOB_WORKERS", 2))
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(1, workers), thread_name_prefix="ai-job"
+                    )
+        return self._executor
+
+    def create_job(self, laporan: Laporan, *, done_version: Optional[str] = None) -> KlasifikasiJob:
+        """Tambahkan job ke session (ikut commit bareng laporan-nya).
+
+        Kalau label sudah diketahui (mis. dari cache), isi `done_version`: job
+        langsung tercatat selesai beserta versi model-nya dan tidak perlu di-submit.
+        """
+        job = KlasifikasiJob(laporan=laporan, status=JOB_PENDING, attempts=0)
+        if done_version is not None:
+            job.status = JOB_DONE
+            job.model_version = done_version
+        db.session.add(job)
+        return job
+
+    def submit(self, job_id: int, *, delay: float = 0.0, data: Optional[bytes] = None) -> None:
+        """Jadwalkan job. `data` = bytes foto yang masih di memori (upload baru),
+        supaya worker tidak perlu membaca ulang file dari disk."""
+        if delay > 0:
+            t = threading.Timer(delay, self.submit, args=(job_id,))
+            t.daemon = True
+            t.start()
+            return
+        self._get_executor().submit(self._run, job_id, data)
+
+    def recover(self, *, stale_seconds: int = 600) -> int:
+        """Jadwalkan ulang job yang belum selesai (dipanggil di dalam app context)."""
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+        KlasifikasiJob.query.filter(
+            KlasifikasiJob.status == JOB_RUNNING,
+            KlasifikasiJob.updated_at < cutoff,
+        ).update({"status": JOB_PENDING}, synchronize_session=False)
+        db.session.commit()
+
+        ids = [
+            row.id for row in
+            KlasifikasiJob.query.with_entities(KlasifikasiJob.id)
+            .filter(KlasifikasiJob.status == JOB_PENDING)
+            .order_by(KlasifikasiJob.id)
+            .all()
+        ]
+        for job_id in ids:
+            self.submit(job_id)
+        return len(ids)
+
+    def _claim(self, job_id: int) -> bool:
+        claimed = KlasifikasiJob.query.filter_by(id=job_id, status=JOB_PENDING).update(
+            {
+                "status": JOB_RUNNING,
+                "attempts": KlasifikasiJob.attempts + 1,
+                "updated_at": datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return claimed == 1
+
+    def _run(self, job_id: int, data: Optional[bytes] = None) -> None:
+        with self.app.app_context():
+            try:
+                self._process(job_id, data)
+            except Exception:
+                logger.exception("Job klasifikasi %s error", job_id)
+            finally:
+                db.session.remove()
+
+    def _process(self, job_id: int, data: Optional[bytes] = None) -> None:
+        if not self._claim(job_id):
+            return
+
+        job = KlasifikasiJob.query.get(job_id)
+        laporan = job.laporan
+        try:
+            foto_path = os.path.join(self.app.config["UPLOAD_FOLDER"], laporan.foto)
+            result = predict_image_cached(foto_path, data=data)
+        except Exception as e:
+            db.session.rollback()
+            self._fail(job, e)
+            return
+
+        laporan.ai_label = result["label"]
+        laporan.ai_confidence = result["confidence"]
+        job.status = JOB_DONE
+        job.error = None
+        job.model_version = result.get("model_version") or model_version()
+        db.session.commit()
+
+    def _fail(self, job: KlasifikasiJob, err: Exception) -> None:
+        job.error = str(err)[:1000]
+        if job.attempts < self.max_retries:
+            job.status = JOB_PENDING
+            db.session.commit()
+            delay = self.retry_delay * (2 ** (job.attempts - 1))
+            logger.warning("Job klasifikasi %s gagal (percobaan %s), dicoba lagi %.0fs: %s",
+                           job.id, job.attempts, delay, err)
+            self.submit(job.id, delay=delay)
+            return
+
+        job.status = JOB_FAILED
+        job.laporan.ai_label = AI_LABEL_FAILED
+        db.session.commit()
+        logger.error("Job klasifikasi %s gagal permanen: %s", job.id, err)
+
+
+classification_queue = ClassificationQueue()
+
+
+def ai_status_json(laporan: Laporan) -> dict:
+    """Status klasifikasi yang bisa di-poll client."""
+    job = laporan.klasifikasi_job
+    if job is not None:
+        status = job.status
+    elif laporan.ai_label == AI_LABEL_PENDING:
+        status = JOB_PENDING
+    else:
+        status = JOB_DONE
+    return {
+        "id": laporan.id,
+        "ai_status": status,
+        "ai_label": laporan.ai_label,
+        "ai_confidence": laporan.ai_confidence,
+        "attempts": job.attempts if job is not None else None,
+        "ai_model_version": job.model_version if job is not None else None,
+    }
@@ -0,0 +1,232 @@
+import hashlib
+import os
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .preprocess import preprocess_tag
+
+STATE_IDLE = "idle"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_ERROR = "error"
+
+
+def load_keras_model(model_path: str):
+    """Load model Keras (TensorFlow di-import di sini, bukan saat import modul)."""
+    import tensorflow as tf
+    from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
+
+    try:
+        return tf.keras.models.load_model(
+            model_path,
+            custom_objects={"preprocess_input": preprocess_input},
+            safe_mode=False
+        )
+    except TypeError:
+        # fallback kalau tf/keras kamu belum support safe_mode param
+        return tf.keras.models.load_model(
+            model_path,
+            custom_objects={"preprocess_input": preprocess_input}
+        )
+
+
+def file_version(path: str, *, name: str = "", extra: str = "") -> str:
+    """`<name>-<hash12>` dari isi file model (+ `extra`, mis. daftar kelas)."""
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    except OSError:
+        return f"{name}-missing"
+    h.update(extra.encode("utf-8"))
+    return f"{name}-{h.hexdigest()[:12]}"
+
+
+class ModelHolder:
+    """Pegang model klasifikasi dan load-nya cuma sekali, saat pertama dibutuhkan.
+
+    - `get()` load model secara lazy (thread-safe), jadi import modul tidak lagi
+      menunggu TensorFlow + MobileNetV2.
+    - `warmup()` load model + 1x inferensi dummy (biar graph sudah ter-trace),
+      bisa jalan di background thread saat app start.
+    - `status()` untuk readiness check.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        *,
+        class_names: Sequence[str] = ("bersih", "kotor"),
+        name: str = "",
+        registry_version: str = "default",
+        input_shape=(224, 224, 3),
+        backend: str = "keras",
+        tflite_quant: str = "float16",
+        tflite_threads: int = 0,
+        tflite_max_batch: int = 1,
+        tflite_dir: str = "",
+        representative_dir: str = "",
+        jpeg_draft: bool = False,
+    ):
+        self.model_path = model_path
+        self.class_names: List[str] = list(class_names)
+        self.name = name or os.path.splitext(os.path.basename(model_path))[0]
+        self.registry_version = registry_version
+        self.input_shape = tuple(input_shape)
+
+        # Backend inferensi: "keras" (model.predict_on_batch) atau "tflite"
+        # (model dikonversi sekali ke .tflite, lalu jalan di interpreter TFLite).
+        self.backend = backend
+        self.tflite_quant = tflite_quant
+        self.tflite_threads = int(tflite_threads)
+        # Batch terbesar dari MicroBatcher; TFLite menyiapkan satu interpreter per ukuran batch.
+        self.tflite_max_batch = max(1, int(tflite_max_batch))
+        # Hasil konversi = artefak build: default ke subfolder tflite/ (di-.gitignore), bukan folder model.
+        self.tflite_dir = tflite_dir or os.path.join(os.path.dirname(os.path.abspath(model_path)), "tflite")
+        self.representative_dir = representative_dir
+        # Mode decode JPEG (AI_JPEG_DRAFT) ikut menentukan output, jadi masuk versi.
+        self.jpeg_draft = bool(jpeg_draft)
+
+        self._lock = threading.Lock()
+        self._model = None
+        self._state = STATE_IDLE
+        self._error: Optional[str] = None
+        self._load_seconds: Optional[float] = None
+        self._warm = False
+        self._version: Optional[str] = None
+        self._model_version: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def version(self) -> str:
+        """Versi hasil prediksi = versi model + mode preprocessing (dihitung sekali).
+
+        Dipakai sebagai bagian key cache prediksi, jadi model yang di-retrain
+        (atau mode decode JPEG yang diganti) otomatis tidak memakai hasil cache
+        lama.
+        """
+        if self._version is None:
+            tag = preprocess_tag(self.jpeg_draft)
+            self._version = f"{self.model_version}.{tag}" if tag else self.model_version
+        return self._version
+
+    @property
+    def model_version(self) -> str:
+        """Versi file model = nama + hash isi file model & daftar kelas (+ backend TFLite)."""
+        if self._model_version is None:
+            version = file_version(self.model_path, name=self.name, extra=",".join(self.class_names))
+            if self.backend == "tflite":
+                # Output TFLite (apalagi terkuantisasi) bisa sedikit beda, jadi versinya dibedakan.
+                version = f"{version}.tflite-{self.tflite_quant}"
+            self._model_version = version
+        return self._model_version
+
+    def is_ready(self) -> bool:
+        return self._state == STATE_READY
+
+    @property
+    def fork_safe(self) -> bool:
+        """Model yang sudah di-load boleh dipakai proses hasil fork? Hanya TFLite;
+        runtime TensorFlow (keras) bisa hang kalau dipakai setelah fork."""
+        return self.backend == "tflite"
+
+    def discard(self) -> None:
+        """Lupakan model yang sudah di-load (mis. warisan proses master setelah
+        fork); `get()` berikutnya load ulang di proses ini."""
+        self._lock = threading.Lock()
+        self._model = None
+        self._state = STATE_IDLE
+        self._error = None
+        self._load_seconds = None
+        self._warm = False
+
+    def get(self):
+        """Ambil model; load dulu kalau belum ada. Thread lain yang datang saat
+        loading akan menunggu di lock, bukan ikut load model kedua kalinya."""
+        model = self._model
+        if model is not None:
+            return model
+
+        with self._lock:
+            if self._model is not None:
+                return self._model
+
+            self._state = STATE_LOADING
+            self._error = None
+            t0 = time.perf_counter()
+            try:
+                model = self._load()
+            except Exception as e:
+                self._state = STATE_ERROR
+                self._error = str(e)
+                raise RuntimeError(f"Gagal load model {self.model_path}: {e}") from e
+
+            self._load_seconds = time.perf_counter() - t0
+            self._model = model
+            self._state = STATE_READY
+            return model
+
+    def _load(self):
+        if self.backend != "tflite":
+            return load_keras_model(self.model_path)
+
+        from .tflite_backend import load_tflite_model, representative_images, tflite_path_for
+
+        path = tflite_path_for(self.model_version, self.tflite_dir)
+        size = self.input_shape[1], self.input_shape[0]
+        return load_tflite_model(
+            lambda: load_keras_model(self.model_path),
+            path,
+            quant=self.tflite_quant,
+            num_threads=self.tflite_threads,
+            max_batch_size=self.tflite_max_batch,
+            representative=lambda: representative_images(self.representative_dir, size),
+        )
+
+    def warmup(self, *, background: bool = True) -> Optional[threading.Thread]:
+        """Load model + inferensi dummy. Kalau background=True, jalan di daemon thread."""
+        if not background:
+            self._warmup()
+            return None
+
+        t = threading.Thread(target=self._warmup_quiet, name="model-warmup", daemon=True)
+        t.start()
+        return t
+
+    def _warmup(self) -> None:
+        model = self.get()
+        if self._warm:
+            return
+        dummy = np.zeros((1,) + self.input_shape, dtype=np.float32)
+        model.predict_on_batch(dummy)
+        self._warm = True
+
+    def _warmup_quiet(self) -> None:
+        # Error sudah dicatat di state/error; request berikutnya akan coba load lagi.
+        try:
+            self._warmup()
+        except Exception:
+            pass
+
+    def status(self) -> dict:
+        return {
+            "state": self._state,
+            "ready": self.is_ready(),
+            "warm": self._warm,
+            "name": self.name,
+            "registry_version": self.registry_version,
+            "backend": self.backend if self.backend != "tflite" else f"tflite-{self.tflite_quant}",
+            "model_path": self.model_path,
+            "version": self._version,
+            "class_names": self.class_names,
+            "load_seconds": round(self._load_seconds, 3) if self._load_seconds is not None else None,
+            "error": self._error,
+        }
@@ -1,37 +1,136 @@
-import tensorflow as tf
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
 import numpy as np
 import os
+from typing import List, Optional, Tuple
+
+from config import Config
+
+from .batching import MicroBatcher
+from .model_holder import ModelHolder
+from .preprocess import image_bytes_to_array, input_buffer
+from .registry import ModelRegistry, read_class_names
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, "ai", "model_pantai.keras")  # atau .h5 sesuai file kamu
+CLASS_NAMES_PATH = os.path.join(BASE_DIR, "ai", "class_names.json")
 
-try:
-    model = tf.keras.models.load_model(
-        MODEL_PATH,
-        custom_objects={"preprocess_input": preprocess_input},
-        safe_mode=False
-    )
-except TypeError:
-    # fallback kalau tf/keras kamu belum support safe_mode param
-    model = tf.keras.models.load_model(
-        MODEL_PATH,
-        custom_objects={"preprocess_input": preprocess_input}
+# Kelas model "default"; versi lain bawa class_names.json sendiri.
+CLASS_NAMES = read_class_names(CLASS_NAMES_PATH, ["bersih", "kotor"])
+IMG_SIZE = (224, 224)
+
+# Model tidak di-load saat import; registry membuat ModelHolder versi aktif
+# dan model baru di-load saat pertama dipakai / saat warm-up.
+_REGISTRY = ModelRegistry(
+    models_dir=Config.AI_MODELS_DIR,
+    default_model_path=MODEL_PATH,
+    default_class_names=CLASS_NAMES,
+    input_shape=IMG_SIZE + (3,),
+    initial_version=Config.AI_MODEL_VERSION,
+    poll_seconds=Config.AI_MODEL_POLL_SECONDS,
+    holder_options={
+        "backend": Config.AI_BACKEND,
+        "tflite_quant": Config.AI_TFLITE_QUANT,
+        "tflite_threads": Config.AI_TFLITE_THREADS,
+        "tflite_max_batch": Config.AI_BATCH_MAX_SIZE,
+        "tflite_dir": Config.AI_TFLITE_DIR,
+        "representative_dir": Config.UPLOAD_FOLDER,
+        "jpeg_draft": Config.AI_JPEG_DRAFT,
+    },
+)
+
+
+def registry() -> ModelRegistry:
+    return _REGISTRY
+
+
+def active_model() -> ModelHolder:
+    return _REGISTRY.active()
+
+
+def get_model():
+    return active_model().get()
+
+
+def warmup(*, background: bool = True):
+    """Load model + inferensi dummy (default di background thread)."""
+    return active_model().warmup(background=background)
+
+
+def model_version() -> str:
+    return active_model().version
+
+
+def model_status() -> dict:
+    status = active_model().status()
+    status["registry"] = _REGISTRY.status()
+    if _BATCHER is not None:
+        status["batching"] = _BATCHER.stats()
+    return status
+
+
+def predict_batch(batch: np.ndarray, *, holder: Optional[ModelHolder] = None) -> np.ndarray:
+    """Satu forward pass untuk batch (B, 224, 224, 3) -> probabilitas (B, n_kelas)."""
+    holder = holder or active_model()
+    return np.asarray(holder.get().predict_on_batch(batch))
+
+
+def _run_batch(batch: np.ndarray) -> List[Tuple[np.ndarray, ModelHolder]]:
+    # Satu batch selalu dilayani satu versi model, walaupun ada swap di tengah jalan.
+    holder = active_model()
+    preds = predict_batch(batch, holder=holder)
+    return [(p, holder) for p in preds]
+
+
+_BATCHER = (
+    MicroBatcher(
+        _run_batch,
+        max_batch_size=Config.AI_BATCH_MAX_SIZE,
+        max_wait_ms=Config.AI_BATCH_MAX_WAIT_MS,
+        name="ai-batcher",
     )
+    if Config.AI_BATCH_MAX_SIZE > 1
+    else None
+)
 
-CLASS_NAMES = ["bersih", "kotor"]
 
-def predict_image(img_path):
-    img = image.load_img(img_path, target_size=(224, 224))
-    img_array = image.img_to_array(img)
-    img_array = np.expand_dims(img_array, axis=0)
-    preds = model.predict(img_array)[0]
+def load_image_array(img_path, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Baca file gambar jadi array float32 (224, 224, 3)."""
+    with open(img_path, "rb") as f:
+        return image_bytes_to_array(f.read(), IMG_SIZE, out, draft=Config.AI_JPEG_DRAFT)
+
+
+def _to_result(preds, holder: ModelHolder) -> dict:
+    class_names = holder.class_names
     idx = int(np.argmax(preds))
     conf = float(preds[idx])
 
     return {
-        "label": CLASS_NAMES[idx],
+        "label": class_names[idx],
         "confidence": round(conf, 4),
-        "probs": {CLASS_NAMES[i]: float(preds[i]) for i in range(len(CLASS_NAMES))}
+        "probs": {class_names[i]: float(preds[i]) for i in range(len(class_names))},
+        "model_version": holder.version,
     }
+
+
+def predict_array(img_array: np.ndarray) -> dict:
+    """Klasifikasi satu gambar yang sudah jadi array (224, 224, 3).
+
+    Kalau batching aktif, request dari thread lain yang datang hampir bersamaan
+    ikut digabung ke satu forward pass.
+    """
+    if _BATCHER is not None:
+        preds, holder = _BATCHER.predict(img_array)
+    else:
+        preds, holder = _run_batch(np.expand_dims(img_array, axis=0))[0]
+    return _to_result(preds, holder)
+
+
+def predict_image_bytes(data: bytes) -> dict:
+    """Klasifikasi langsung dari bytes upload: decode + resize ke buffer
+    float32 milik thread ini, lalu inferensi. Tidak perlu file di disk."""
+    arr = image_bytes_to_array(data, IMG_SIZE, input_buffer(IMG_SIZE), draft=Config.AI_JPEG_DRAFT)
+    return predict_array(arr)
+
+
+def predict_image(img_path):
+    with open(img_path, "rb") as f:
+        return predict_image_bytes(f.read())
@@ -0,0 +1,82 @@
+import io
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Sama dengan default keras `image.load_img` (interpolation="nearest"),
+# supaya hasil klasifikasi identik dengan jalur lama.
+RESAMPLE = Image.NEAREST
+
+# Decode JPEG skala kecil (draft) minimal DRAFT_SCALE x ukuran input. Dengan
+# resize NEAREST, decode di skala yang pas 224x224 menggeser piksel yang
+# terambil dan probabilitas model ikut bergeser (label sama, confidence bisa
+# turun ~0.1-0.2); dengan 2x foto yang sudah di-scale app (~1000 px) tetap
+# di-decode penuh, dan foto kamera beberapa megapiksel tetap hemat.
+DRAFT_SCALE = 2
+
+_local = threading.local()
+
+
+def input_buffer(size: Tuple[int, int]) -> np.ndarray:
+    """Buffer float32 (H, W, 3) per thread, dipakai ulang antar request.
+
+    Aman dipakai ulang karena caller selalu menunggu hasil inferensi sebelum
+    memproses gambar berikutnya di thread yang sama.
+    """
+    shape = (size[1], size[0], 3)
+    buf = getattr(_local, "buf", None)
+    if buf is None or buf.shape != shape:
+        buf = np.empty(shape, dtype=np.float32)
+        _local.buf = buf
+    return buf
+
+
+def decode_image(data: bytes, size: Optional[Tuple[int, int]] = None) -> Image.Image:
+    """Decode gambar langsung dari bytes (tanpa simpan ke disk dulu).
+
+    Kalau `size` diisi dan gambarnya JPEG, decoder diminta langsung decode di
+    skala DCT 1/2, 1/4 atau 1/8 (`Image.draft`) yang masih >= DRAFT_SCALE x
+    `size`. Foto HP beberapa megapiksel jadi tidak perlu di-decode full
+    resolution cuma untuk dikecilkan ke 224x224. Format lain (PNG, WebP, ...)
+    tetap decode penuh.
+    """
+    img = Image.open(io.BytesIO(data))
+    if size is not None and img.format == "JPEG":
+        img.draft("RGB", (size[0] * DRAFT_SCALE, size[1] * DRAFT_SCALE))
+    img.load()
+    return img
+
+
+def preprocess_tag(draft: bool) -> str:
+    """Penanda mode preprocessing untuk versi model / key cache ("" = decode penuh)."""
+    return f"jpeg-draft{DRAFT_SCALE}" if draft else ""
+
+
+def resize_image(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != tuple(size):
+        img = img.resize(size, RESAMPLE)
+    return img
+
+
+def to_input_array(img: Image.Image, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Tulis piksel RGB ke array float32 (H, W, 3); pakai `out` kalau ada."""
+    pixels = np.asarray(img)
+    if out is None:
+        return pixels.astype(np.float32)
+    np.copyto(out, pixels, casting="unsafe")
+    return out
+
+
+def image_bytes_to_array(
+    data: bytes,
+    size: Tuple[int, int],
+    out: Optional[np.ndarray] = None,
+    *,
+    draft: bool = True,
+) -> np.ndarray:
+    img = decode_image(data, size if draft else None)
+    return to_input_array(resize_image(img, size), out)
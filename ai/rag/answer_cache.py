@@ -0,0 +1,93 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+def _approx_size(value: Any) -> int:
+    """Perkiraan memori nilai cache (string + container-nya), dalam byte."""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_approx_size(v) for v in value)
+    if hasattr(value, "__dataclass_fields__"):
+        return sys.getsizeof(value) + sum(_approx_size(getattr(value, f)) for f in value.__dataclass_fields__)
+    return sys.getsizeof(value)
+
+
+class AnswerCache:
+    """Cache LRU + TTL untuk hasil retrieval / jawaban chat (per proses).
+
+    Entry kedaluwarsa setelah `ttl_seconds` (0 = tanpa TTL), dan entry yang
+    paling lama tidak dipakai dibuang kalau isi cache melebihi `max_items`.
+    """
+
+    def __init__(self, *, max_items: int = 1024, ttl_seconds: float = 600.0):
+        self.max_items = max(0, int(max_items))
+        self.ttl_seconds = float(ttl_seconds)
+
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if self.max_items == 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value, size = item
+            if expires_at and expires_at < now:
+                del self._items[key]
+                self._bytes -= size
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_items == 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+        size = _approx_size(value)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._items[key] = (expires_at, value, size)
+            self._bytes += size
+            while len(self._items) > self.max_items:
+                _, (_, _, dropped) = self._items.popitem(last=False)
+                self._bytes -= dropped
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "approx_bytes": self._bytes,
+            }
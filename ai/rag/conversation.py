@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+from flask import current_app
+
+
+class ConversationStore:
+    """Riwayat chat per user di server (per proses), dengan memori terbatas.
+
+    - Tiap user menyimpan paling banyak `max_turns` giliran terakhir
+      ({"role": "user" / "assistant", "content": ...}); teks dipotong ke
+      `max_chars` karakter.
+    - Percakapan yang tidak aktif lebih dari `ttl_seconds` dianggap selesai
+      (0 = tanpa TTL).
+    - Kalau jumlah user melebihi `max_users`, percakapan yang paling lama
+      tidak aktif dibuang (LRU).
+
+    Disimpan di memori worker: dengan beberapa worker gunicorn, request user
+    yang sama bisa jatuh ke worker lain dan riwayatnya mulai dari kosong.
+    Untuk chatbot ini cukup (riwayat cuma konteks tambahan untuk retrieval).
+    """
+
+    def __init__(self, *, max_users: int = 10000, max_turns: int = 6, ttl_seconds: float = 1800.0, max_chars: int = 1000):
+        self.max_users = max(0, int(max_users))
+        self.max_turns = max(1, int(max_turns))
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_chars = max(1, int(max_chars))
+
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Hashable, Tuple[float, Deque[Dict[str, str]]]]" = OrderedDict()
+
+        self.expired = 0
+        self.evictions = 0
+
+    def history(self, user_id: Hashable) -> List[Dict[str, str]]:
+        """Giliran percakapan user (lama -> baru); list kosong kalau belum ada / sudah kedaluwarsa."""
+        if self.max_users == 0:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return []
+            last_seen, turns = item
+            if self.ttl_seconds > 0 and now - last_seen > self.ttl_seconds:
+                del self._items[user_id]
+                self.expired += 1
+                return []
+            return list(turns)
+
+    def append(self, user_id: Hashable, question: str, reply: str) -> None:
+        """Catat satu tanya-jawab sebagai dua giliran (user, lalu assistant)."""
+        if self.max_users == 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.pop(user_id, None)
+            if item is None or (self.ttl_seconds > 0 and now - item[0] > self.ttl_seconds):
+                turns: Deque[Dict[str, str]] = deque(maxlen=self.max_turns)
+            else:
+                turns = item[1]
+            turns.append({"role": "user", "content": (question or "")[:self.max_chars]})
+            turns.append({"role": "assistant", "content": (reply or "")[:self.max_chars]})
+            self._items[user_id] = (now, turns)
+            # Urutan dict = urutan aktivitas terakhir, jadi yang kedaluwarsa ada di depan.
+            while self.ttl_seconds > 0 and self._items:
+                oldest, (seen, _) = next(iter(self._items.items()))
+                if now - seen <= self.ttl_seconds:
+                    break
+                del self._items[oldest]
+                self.expired += 1
+            while len(self._items) > self.max_users:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, user_id: Optional[Hashable] = None) -> None:
+        """Hapus riwayat satu user (atau semua kalau `user_id` None)."""
+        with self._lock:
+            if user_id is None:
+                self._items.clear()
+            else:
+                self._items.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._items),
+                "max_users": self.max_users,
+                "max_turns": self.max_turns,
+                "ttl_seconds": self.ttl_seconds,
+                "turns": sum(len(turns) for _, turns in self._items.values()),
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+
+_STORE: Optional[ConversationStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_conversations() -> ConversationStore:
+    """Singleton store percakapan, dibuat dari config app saat pertama dipakai."""
+    global _STORE
+    if _STORE is not None:
+        return _STORE
+
+    with _STORE_LOCK:
+        if _STORE is None:
+            cfg = current_app.config
+            _STORE = ConversationStore(
+                max_users=int(cfg.get("RAG_MEMORY_MAX_USERS", 10000)),
+                max_turns=int(cfg.get("RAG_MEMORY_MAX_TURNS", 6)),
+                ttl_seconds=float(cfg.get("RAG_MEMORY_TTL", 1800)),
+                max_chars=int(cfg.get("RAG_MEMORY_MAX_CHARS", 1000)),
+            )
+    return _STORE
@@ -0,0 +1,217 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.preprocessing import normalize
+
+from .loader import Chunk
+from .vector_store import ScoredChunk, _text_hashes, _tokenize
+
+# Default vektorizer; bagian dari config yang disimpan bersama index.
+N_FEATURES = 1 << 20
+NGRAM_RANGE = (3, 4)
+
+
+def _words(text: str) -> str:
+    # Tokenisasi sama dengan BM25 (tanpa tanda baca), lalu n-gram karakter per kata.
+    return " ".join(_tokenize(text))
+
+
+class DenseIndex:
+    """Retriever dense lokal (tanpa model / API eksternal), pelengkap BM25.
+
+    Teks dipecah jadi n-gram karakter per kata (HashingVectorizer
+    analyzer="char_wb": " numpuk " -> " nu", "num", ...) yang di-hash ke
+    `n_features` kolom, diberi bobot tf-idf (sublinear), lalu diproyeksikan ke
+    `dim` dimensi dengan TruncatedSVD. Ejaan yang mirip ("numpuk" /
+    "menumpuk", "jalan jalan" / "jalan-jalan") berbagi banyak n-gram, dan SVD
+    menangkap n-gram yang sering muncul bersama, jadi chunk relevan tetap
+    ketemu walau kata persisnya beda. Kata di luar KB tetap dapat vektor dari
+    n-gram-nya yang dikenal.
+
+    Hanya kolom hash yang muncul di KB yang dipakai (`_features`), jadi
+    komponen SVD (`_components`, fitur x dim) tidak sebesar `n_features`.
+    Vektor chunk disimpan sebagai satu matriks float32 contiguous (chunk x
+    dim, baris ternormalisasi L2): search = satu perkalian matriks (cosine).
+    """
+
+    # Array yang membentuk index; dipakai index_store untuk simpan/load.
+    ARRAYS = ("features", "idf", "components", "vectors", "text_hashes")
+
+    def __init__(
+        self,
+        chunks: Sequence[Chunk],
+        *,
+        dim: int = 256,
+        n_features: int = N_FEATURES,
+        ngram_range: Tuple[int, int] = NGRAM_RANGE,
+        fit_rows: int = 20000,
+        seed: int = 0,
+    ):
+        self.chunks = chunks
+        self.dim = int(dim)
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(ngram_range)
+
+        self._features = np.zeros(0, dtype=np.int64)  # kolom hash n-gram yang muncul di KB (urut)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._components = np.zeros((0, self.dim), dtype=np.float32)  # fitur x dim
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)  # chunk x dim
+        self._text_hashes = np.zeros(0, dtype=np.uint64)
+        self._init_transforms()
+
+        self._fit(fit_rows=fit_rows, seed=seed)
+
+    def _init_transforms(self) -> None:
+        self._hasher = HashingVectorizer(
+            analyzer="char_wb",
+            preprocessor=_words,
+            ngram_range=self.ngram_range,
+            n_features=self.n_features,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32,
+        )
+        self._tfidf = TfidfTransformer(sublinear_tf=True)
+        self._tfidf.idf_ = self._idf
+
+    # --- fit ---
+
+    def _fit(self, *, fit_rows: int, seed: int) -> None:
+        n = len(self.chunks)
+        self._text_hashes = _text_hashes(self.chunks)
+        counts = self._hasher.transform([ch.text for ch in self.chunks])
+        self._features = np.unique(counts.indices).astype(np.int64)
+        if not self._features.size:
+            self._vectors = np.zeros((n, self.dim), dtype=np.float32)
+            return
+
+        x = self._tfidf.fit_transform(self._known_features(counts))
+        self._idf = self._tfidf.idf_.astype(np.float32)
+
+        # SVD cukup dari sampel chunk (KB besar).
+        rng = np.random.default_rng(seed)
+        sample = np.arange(n) if n <= fit_rows else np.sort(rng.choice(n, size=fit_rows, replace=False))
+        rank = max(1, min(self.dim, len(sample), x.shape[1] - 1))
+        svd = TruncatedSVD(n_components=rank, algorithm="randomized", random_state=seed).fit(x[sample])
+        self._components = np.zeros((x.shape[1], self.dim), dtype=np.float32)
+        self._components[:, :rank] = svd.components_.T
+        self._vectors = self._project(x)
+
+    def _known_features(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Kolom hash -> kolom `_features`; n-gram yang tidak ada di KB dibuang."""
+        pos = np.minimum(np.searchsorted(self._features, counts.indices), len(self._features) - 1)
+        known = self._features[pos] == counts.indices
+        rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        return sparse.csr_matrix(
+            (counts.data[known], (rows[known], pos[known])),
+            shape=(counts.shape[0], len(self._features)),
+        )
+
+    def _project(self, x: sparse.csr_matrix) -> np.ndarray:
+        return np.ascontiguousarray(normalize(x @ self._components), dtype=np.float32)
+
+    def _embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        if not self._features.size:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+        counts = self._known_features(self._hasher.transform(texts))
+        return self._project(self._tfidf.transform(counts))
+
+    # --- update / simpan ---
+
+    def updated(self, chunks: Sequence[Chunk]) -> "DenseIndex":
+        """Index untuk `chunks` dengan fitur + proyeksi yang sama (tanpa fit ulang).
+
+        Vektor chunk yang teksnya tidak berubah dipakai ulang; chunk baru
+        di-embed dengan proyeksi yang ada. Fit ulang terjadi saat index
+        dibuat dari awal (mis. start worker dengan KB versi baru).
+        """
+        hashes = _text_hashes(chunks)
+        order = np.argsort(self._text_hashes, kind="stable")
+        sorted_hashes = self._text_hashes[order]
+        if len(sorted_hashes):
+            pos = np.minimum(np.searchsorted(sorted_hashes, hashes), len(sorted_hashes) - 1)
+            found = sorted_hashes[pos] == hashes
+        else:
+            pos = np.zeros(len(hashes), dtype=np.int64)
+            found = np.zeros(len(hashes), dtype=bool)
+
+        vectors = np.zeros((len(chunks), self.dim), dtype=np.float32)
+        vectors[found] = self._vectors[order[pos[found]]]
+        missing = np.flatnonzero(~found)
+        if missing.size:
+            vectors[missing] = self._embed_texts([chunks[int(i)].text for i in missing])
+
+        new = object.__new__(DenseIndex)
+        new.__dict__.update(self.__dict__)
+        new.chunks = chunks
+        new._vectors = vectors
+        new._text_hashes = hashes
+        return new
+
+    @classmethod
+    def from_arrays(cls, chunks: Sequence[Chunk], arrays: Dict[str, np.ndarray], *, config: dict) -> "DenseIndex":
+        self = object.__new__(cls)
+        self.chunks = chunks
+        self.dim = int(config["dim"])
+        self.n_features = int(config["n_features"])
+        self.ngram_range = tuple(config["ngram_range"])
+        for name in cls.ARRAYS:
+            setattr(self, f"_{name}", arrays[name])
+        self._init_transforms()
+        return self
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, f"_{name}") for name in self.ARRAYS}
+
+    def config(self) -> dict:
+        return {"dim": self.dim, "n_features": self.n_features, "ngram_range": list(self.ngram_range)}
+
+    def nbytes(self) -> int:
+        return sum(int(a.nbytes) for a in self.arrays().values())
+
+    # --- search ---
+
+    def search(self, query: str, *, k: int = 4, min_score: float = 0.0) -> List[ScoredChunk]:
+        return self.search_many([query], k=k, min_score=min_score)[0]
+
+    def search_many(self, queries: Sequence[str], *, k: int = 4, min_score: float = 0.0) -> List[List[ScoredChunk]]:
+        """Cosine similarity; semua query sekaligus = satu perkalian matriks.
+
+        Chunk dengan skor <= `min_score` dibuang: setelah proyeksi SVD hampir
+        semua chunk punya cosine > 0 walau tidak ada hubungannya dengan query.
+        """
+        if not len(self.chunks) or not queries:
+            return [[] for _ in queries]
+        scores = self._embed_texts([q or "" for q in queries]) @ self._vectors.T
+        return [self._top_k(row, k, min_score) for row in scores]
+
+    def _top_k(self, scores: np.ndarray, k: int, min_score: float) -> List[ScoredChunk]:
+        k = max(1, k)
+        cand = np.flatnonzero(scores > max(0.0, min_score))
+        if cand.size > k:
+            vals = scores[cand]
+            kth = np.partition(vals, -k)[-k]
+            cand = cand[vals >= kth]
+        # Skor sama -> chunk yang lebih awal menang (sama dengan index BM25).
+        top = cand[np.lexsort((cand, -scores[cand]))][:k]
+        return [ScoredChunk(chunk=self.chunks[int(i)], score=float(scores[i])) for i in top]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[ScoredChunk]], *, k: int = 4, rrf_k: int = 60) -> List[Chunk]:
+    """Gabung beberapa ranking: skor chunk = sum 1 / (rrf_k + peringkat), peringkat mulai 1.
+
+    Skor sama -> urutan pertama kali muncul (ranking pertama = BM25 didahulukan).
+    """
+    scores: Dict[str, float] = {}
+    chunks: Dict[str, Chunk] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            cid = hit.chunk.id
+            if cid not in chunks:
+                chunks[cid] = hit.chunk
+            scores[cid] = scores.get(cid, 0.0) + 1.0 / (rrf_k + rank)
+    order = sorted(scores, key=lambda cid: -scores[cid])  # sort stabil
+    return [chunks[cid] for cid in order[:max(1, k)]]
@@ -0,0 +1,315 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .loader import SINGLE_DOC_ID, Chunk, list_kb_documents, load_kb_chunks
+from .vector_store import CompactBM25Index
+
+if TYPE_CHECKING:
+    # scipy + scikit-learn; di-import saat index dense dibuka (open_dense).
+    from .dense_index import DenseIndex
+
+logger = logging.getLogger(__name__)
+
+# Naikkan kalau layout file / tokenizer / rumus skor berubah, supaya index lama dibuat ulang.
+FORMAT_VERSION = 3
+# Sama, untuk index dense (vektorizer / rumus bobot DenseIndex berubah -> naikkan).
+DENSE_FORMAT_VERSION = 2
+_META = "meta.json"
+
+
+def file_digest(path: str) -> str:
+    """sha256 isi satu file."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def document_digests(kb_path: str) -> Dict[str, str]:
+    """id dokumen -> sha256 isinya, untuk semua dokumen KB."""
+    return {doc_id: file_digest(path) for doc_id, path in list_kb_documents(kb_path)}
+
+
+def combine_digests(digests: Dict[str, str]) -> str:
+    """Satu hash untuk seluruh KB dari hash per dokumen."""
+    if set(digests) == {SINGLE_DOC_ID}:
+        # KB satu file: sama dengan hash file-nya (kompatibel dengan index yang sudah ada).
+        return digests[SINGLE_DOC_ID]
+    h = hashlib.sha256()
+    for doc_id in sorted(digests):
+        h.update(f"{doc_id}\t{digests[doc_id]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def kb_digest(kb_path: str) -> str:
+    """sha256 isi KB (file, atau gabungan semua dokumen kalau folder)."""
+    return combine_digests(document_digests(kb_path))
+
+
+def index_key(
+    kb_path: str,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    k1: float = 1.5,
+    b: float = 0.75,
+    digest: str = "",
+) -> str:
+    """Hash isi KB + konfigurasi chunking/BM25 -> nama folder index."""
+    h = hashlib.sha256((digest or kb_digest(kb_path)).encode())
+    h.update(json.dumps([FORMAT_VERSION, chunk_size, chunk_overlap, k1, b]).encode())
+    return h.hexdigest()[:16]
+
+
+def _write_strings(folder: str, name: str, strings: Sequence[str]) -> None:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    with open(os.path.join(folder, f"{name}.bin"), "wb") as f:
+        for e in encoded:
+            f.write(e)
+    np.save(os.path.join(folder, f"{name}_offsets.npy"), offsets)
+
+
+class _StringTable:
+    """Daftar string dari blob UTF-8 yang di-mmap; di-decode saat diakses."""
+
+    def __init__(self, folder: str, name: str):
+        self._offsets = np.load(os.path.join(folder, f"{name}_offsets.npy"), mmap_mode="r")
+        path = os.path.join(folder, f"{name}.bin")
+        # np.memmap tidak bisa untuk file 0 byte
+        self._blob = np.memmap(path, dtype=np.uint8, mode="r") if os.path.getsize(path) else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        lo, hi = int(self._offsets[i]), int(self._offsets[i + 1])
+        return bytes(self._blob[lo:hi]).decode("utf-8")
+
+
+_CHUNK_CACHE_SIZE = 4096
+
+
+class StoredChunks(Sequence):
+    """List Chunk yang dibaca langsung dari file index (teks tidak dimuat ke RAM)."""
+
+    def __init__(self, folder: str):
+        self._ids = _StringTable(folder, "chunk_ids")
+        self._texts = _StringTable(folder, "chunk_texts")
+        # Chunk yang sering keluar di hasil search disimpan, supaya kalimat yang
+        # sudah dipecah (Chunk.sentences) tidak dihitung ulang tiap request.
+        self._chunk = functools.lru_cache(maxsize=_CHUNK_CACHE_SIZE)(self._load_chunk)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._chunk(i)
+
+    def _load_chunk(self, i: int) -> Chunk:
+        return Chunk(id=self._ids[i], text=self._texts[i])
+
+
+def save_index(folder: str, index: CompactBM25Index, *, meta: dict) -> None:
+    """Tulis index ke `folder` (folder harus sudah ada dan kosong)."""
+    chunks = index.chunks
+    _write_strings(folder, "chunk_ids", [c.id for c in chunks])
+    _write_strings(folder, "chunk_texts", [c.text for c in chunks])
+    for name, arr in index.arrays().items():
+        np.save(os.path.join(folder, f"{name}.npy"), np.ascontiguousarray(arr))
+    terms: List[str] = [""] * len(index._vocab)
+    for t, tid in index._vocab.items():
+        terms[tid] = t
+    with open(os.path.join(folder, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+
+    meta = dict(meta, format=FORMAT_VERSION, chunks=len(chunks), k1=index.k1, b=index.b, avg_len=index._avg_len)
+    # meta.json ditulis terakhir: folder tanpa meta dianggap belum lengkap.
+    with open(os.path.join(folder, _META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def open_index(folder: str) -> Optional[CompactBM25Index]:
+    """Buka index tersimpan (array di-mmap read-only, page-nya dibagi antar proses)."""
+    try:
+        with open(os.path.join(folder, _META), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            return None
+        with open(os.path.join(folder, "vocab.json"), "r", encoding="utf-8") as f:
+            terms = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(folder, f"{name}.npy"), mmap_mode="r")
+            for name in CompactBM25Index.ARRAYS
+        }
+        chunks = StoredChunks(folder)
+    except (OSError, ValueError) as e:
+        logger.warning("Index RAG di %s tidak bisa dibuka: %s", folder, e)
+        return None
+    if len(chunks) != meta.get("chunks"):
+        return None
+    return CompactBM25Index.from_arrays(
+        chunks,
+        {t: i for i, t in enumerate(terms)},
+        arrays,
+        avg_len=meta["avg_len"],
+        k1=meta["k1"],
+        b=meta["b"],
+    )
+
+
+def load_or_build_index(
+    kb_path: str,
+    index_dir: str,
+    *,
+    chunk_size: int = 650,
+    chunk_overlap: int = 120,
+    digest: str = "",
+    k1: float = 1.5,
+    b: float = 0.75,
+    build: Optional[Callable[[], CompactBM25Index]] = None,
+) -> CompactBM25Index:
+    """Index untuk `kb_path`: buka file index kalau cocok, kalau tidak build + simpan.
+
+    Folder index: `<index_dir>/<hash isi KB + config chunking>/`. Kalau KB atau
+    RAG_CHUNK_SIZE/RAG_CHUNK_OVERLAP berubah, hash-nya beda sehingga index
+    otomatis dibuat ulang (begitu juga kalau k1 / b BM25 berubah); folder index
+    lama dihapus. `build` membuat index kalau belum ada di disk (default: build
+    penuh dari KB; saat reload diisi update inkremental dari index lama).
+    """
+    if not kb_path or not os.path.exists(kb_path):
+        # biar pesan error-nya sama dengan load_kb_chunks
+        load_kb_chunks(kb_path)
+
+    key = index_key(kb_path, chunk_size=chunk_size, chunk_overlap=chunk_overlap, k1=k1, b=b, digest=digest)
+    folder = os.path.join(index_dir, key)
+    index = open_index(folder) if os.path.isdir(folder) else None
+    if index is not None:
+        return index
+
+    if build is not None:
+        index = build()
+    else:
+        index = CompactBM25Index(load_kb_chunks(kb_path, chunk_size=chunk_size, chunk_overlap=chunk_overlap), k1=k1, b=b)
+
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=index_dir)
+        save_index(tmp, index, meta={
+            "key": key,
+            "kb_path": os.path.abspath(kb_path),
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+        })
+        try:
+            os.rename(tmp, folder)
+        except OSError:
+            # Worker lain sudah lebih dulu menyimpan index yang sama.
+            shutil.rmtree(tmp, ignore_errors=True)
+    except OSError as e:
+        logger.warning("Gagal menyimpan index RAG ke %s: %s", index_dir, e)
+        return index
+
+    _remove_stale(index_dir, keep=key)
+    # Pakai versi mmap supaya memori yang dipegang sama dengan worker lain.
+    return open_index(folder) or index
+
+
+def _remove_stale(index_dir: str, *, keep: str) -> None:
+    for name in os.listdir(index_dir):
+        path = os.path.join(index_dir, name)
+        if name == keep or name.startswith(".") or not os.path.isdir(path):
+            continue
+        if os.path.isfile(os.path.join(path, _META)):
+            # Proses lain yang masih memakai index lama tetap aman (mmap ke file yang sudah di-unlink).
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# --- index dense (retriever hybrid) ---
+#
+# Disimpan di subfolder folder index BM25 (`<index_dir>/<key>/dense-<hash config>/`),
+# jadi ikut terhapus bersama index BM25 lama saat KB berubah.
+
+
+def dense_folder(index_folder: str, config: dict) -> str:
+    h = hashlib.sha256(json.dumps([DENSE_FORMAT_VERSION, config], sort_keys=True).encode())
+    return os.path.join(index_folder, f"dense-{h.hexdigest()[:12]}")
+
+
+def save_dense(folder: str, dense: "DenseIndex") -> None:
+    """Tulis index dense ke `folder` (folder harus sudah ada dan kosong)."""
+    for name, arr in dense.arrays().items():
+        np.save(os.path.join(folder, f"{name}.npy"), np.ascontiguousarray(arr))
+    meta = {"format": DENSE_FORMAT_VERSION, "chunks": len(dense.chunks), "config": dense.config()}
+    with open(os.path.join(folder, _META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def open_dense(folder: str, chunks: Sequence[Chunk]) -> Optional["DenseIndex"]:
+    """Buka index dense tersimpan untuk `chunks` (array di-mmap read-only)."""
+    from .dense_index import DenseIndex
+
+    try:
+        with open(os.path.join(folder, _META), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != DENSE_FORMAT_VERSION or meta.get("chunks") != len(chunks):
+            return None
+        arrays = {
+            name: np.load(os.path.join(folder, f"{name}.npy"), mmap_mode="r")
+            for name in DenseIndex.ARRAYS
+        }
+    except (OSError, ValueError) as e:
+        logger.warning("Index dense di %s tidak bisa dibuka: %s", folder, e)
+        return None
+    return DenseIndex.from_arrays(chunks, arrays, config=meta["config"])
+
+
+def load_or_build_dense(
+    index_folder: str,
+    chunks: Sequence[Chunk],
+    *,
+    config: dict,
+    build: Callable[[], "DenseIndex"],
+) -> "DenseIndex":
+    """Index dense untuk index BM25 di `index_folder`: buka kalau sudah ada, kalau tidak build + simpan.
+
+    `config` = DenseIndex.config() yang diinginkan (bagian dari nama subfolder).
+    """
+    folder = dense_folder(index_folder, config)
+    dense = open_dense(folder, chunks) if os.path.isdir(folder) else None
+    if dense is not None:
+        return dense
+
+    dense = build()
+    if not os.path.isdir(index_folder):
+        # Index BM25-nya tidak tersimpan (mis. gagal tulis), jadi dense juga tidak.
+        return dense
+    try:
+        tmp = tempfile.mkdtemp(prefix=".dense-", dir=index_folder)
+        save_dense(tmp, dense)
+        try:
+            os.rename(tmp, folder)
+        except OSError:
+            # Worker lain sudah lebih dulu menyimpan.
+            shutil.rmtree(tmp, ignore_errors=True)
+    except OSError as e:
+        logger.warning("Gagal menyimpan index dense ke %s: %s", index_folder, e)
+        return dense
+    return open_dense(folder, chunks) or dense
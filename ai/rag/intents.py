@@ -0,0 +1,119 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.json")
+
+@dataclass(frozen=True)
+class QueryMatch:
+    """Hasil satu kali scan pertanyaan."""
+
+    intents: FrozenSet[str]  # "quick" / "why" / "travel" / ...
+    tags: FrozenSet[str]  # kata kunci tambahan, mis. "kiriman", "tegal", "pantura"
+    beaches: Tuple[str, ...]  # nama pantai yang disebut, urut prioritas gazetteer
+
+    @property
+    def beach(self) -> Optional[str]:
+        return self.beaches[0] if self.beaches else None
+
+
+# Sama dengan tokenizer BM25 (vector_store._TOKEN_RE), dipakai pada teks huruf kecil.
+_WORD = re.compile(r"[a-z0-9à-ÿ]+")
+
+
+class QueryMatcher:
+    """Semua intent + nama pantai dari gazetteer dalam satu scan pertanyaan.
+
+    Pertanyaan dipecah jadi kata (huruf kecil) sekali. Alias satu kata
+    dicari lewat irisan set, alias beberapa kata hanya dari kata awalnya,
+    lalu tiap alias yang ketemu dipetakan lewat satu dict ke (intent, tag,
+    pantai). Biaya per pertanyaan tergantung jumlah kata, tidak bertambah
+    dengan jumlah pantai di gazetteer.
+
+    Alias dicocokkan per kata utuh ("sampai" tidak dianggap "pai"); alias
+    beberapa kata juga cocok kalau ditulis tanpa spasi / pakai tanda hubung
+    ("jalan jalan" = "jalan-jalan" = "jalanjalan"). Kalau beberapa pantai
+    disebut, urutan `beaches` ikut urutan di gazetteer (entry lebih atas =
+    prioritas lebih tinggi).
+    """
+
+    def __init__(self, gazetteer: dict):
+        # alias (kata dipisah spasi) -> [(jenis, nilai, prioritas)]
+        self._entries: Dict[str, List[Tuple[str, str, int]]] = {}
+        self._phrase_starts = set()  # kata pertama alias yang lebih dari satu kata
+        self._max_words = 1
+
+        def add(term: str, kind: str, value: str, priority: int = 0) -> None:
+            words = _WORD.findall(term.lower())
+            if not words:
+                return
+            keys = {" ".join(words), "".join(words)}
+            for key in keys:
+                self._entries.setdefault(key, []).append((kind, value, priority))
+            if len(words) > 1:
+                self._phrase_starts.add(words[0])
+                self._max_words = max(self._max_words, len(words))
+
+        for intent, words in (gazetteer.get("intents") or {}).items():
+            for w in words:
+                add(w, "intent", intent)
+        for tag, words in (gazetteer.get("tags") or {}).items():
+            for w in words:
+                add(w, "tag", tag)
+        for priority, beach in enumerate(gazetteer.get("beaches") or []):
+            for alias in beach.get("aliases") or []:
+                add(alias, "beach", beach["name"], priority)
+        self._single = frozenset(k for k in self._entries if " " not in k)
+
+    def match(self, question: str) -> QueryMatch:
+        words = _WORD.findall((question or "").lower())
+        # Alias satu kata: irisan set (di C); alias beberapa kata hanya dicek dari kata awalnya.
+        keys = list(self._single.intersection(words))
+        if not self._phrase_starts.isdisjoint(words):
+            for i, w in enumerate(words):
+                if w in self._phrase_starts:
+                    for j in range(i + 2, min(len(words), i + self._max_words) + 1):
+                        keys.append(" ".join(words[i:j]))
+
+        intents, tags, beaches = set(), set(), {}
+        for key in keys:
+            for kind, value, priority in self._entries.get(key, ()):
+                if kind == "intent":
+                    intents.add(value)
+                elif kind == "tag":
+                    tags.add(value)
+                elif value not in beaches or priority < beaches[value]:
+                    beaches[value] = priority
+        return QueryMatch(
+            intents=frozenset(intents),
+            tags=frozenset(tags),
+            beaches=tuple(sorted(beaches, key=beaches.__getitem__)),
+        )
+
+
+def load_gazetteer(path: str = "") -> dict:
+    """Baca gazetteer JSON (intents / tags / beaches).
+
+    File yang tidak ada / rusak langsung error (OSError / ValueError), tidak
+    diam-diam diganti isi lain: jawaban chat bergantung ke isinya.
+    """
+    path = path or GAZETTEER_PATH
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get("beaches", []), list):
+        raise ValueError(f"Format gazetteer {path} tidak valid: harus object dengan intents / tags / beaches")
+    return data
+
+
+_MATCHERS: Dict[str, QueryMatcher] = {}
+
+
+def get_matcher(path: str = "") -> QueryMatcher:
+    """Matcher untuk gazetteer di `path` (default: gazetteer.json bawaan), dibuat sekali per path."""
+    path = path or GAZETTEER_PATH
+    matcher = _MATCHERS.get(path)
+    if matcher is None:
+        matcher = _MATCHERS[path] = QueryMatcher(load_gazetteer(path))
+    return matcher
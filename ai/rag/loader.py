@@ -1,99 +1,253 @@
+import io
 import os
 import re
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, ContextManager, Iterable, Iterator, List, Optional, Set, Tuple
 
 
 @dataclass(frozen=True)
-class Chunk:
-    """Potongan teks dari knowledge base."""
+class Sentence:
+    """Satu kalimat chunk + skor keyword untuk pemilihan kalimat kunci."""
 
-    id: str
     text: str
+    score: int  # jumlah keyword penting di kalimat
+    usable: bool  # lolos filter (cukup panjang, bukan list panjang, bukan header lokasi)
 
 
-_MULTI_NEWLINE = re.compile(r"\n{3,}")
+@dataclass(frozen=True)
+class ChunkSentences:
+    sentences: Tuple[Sentence, ...]
+    # Teks chunk diakhiri . ! ? -> kalimat terakhir tidak nyambung ke chunk berikutnya.
+    ends_sentence: bool
 
 
-def _normalize_text(text: str) -> str:
-    # rapikan newline, spasi, dll
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-    text = _MULTI_NEWLINE.sub("\n\n", text)
+# Keyword "kalimat berisi" untuk _extract_key_sentences (huruf kecil).
+KEY_SENTENCE_KEYWORDS = (
+    "sampah", "plastik", "puntung", "jaring", "biota", "mangrove", "lamun",
+    "edukasi", "konservasi", "wisata", "muara", "lapor", "ecosea",
+)
 
-    # Banyak KB yang berasal dari dokumen dengan line-wrap, jadi ada newline di tengah kalimat.
-    # Kita rapikan: simpan pemisah paragraf (\n\n) lalu gabungkan newline tunggal.
-    para_token = "<<PARA_BREAK>>"  # placeholder unik
-    text = text.replace("\n\n", para_token)
+_WHITESPACE = re.compile(r"\s+")
+# Pisah kalimat (kasar tapi cukup)
+_SENTENCE_SPLIT = re.compile(r"(?<=[\.!\?])\s+")
 
-    # Newline tunggal dianggap spasi (karena banyak dokumen hasil export punya wrap per baris).
-    text = text.replace("\n", " ")
 
-    # Perbaiki kasus umum split kata jadi "p antai", dll.
-    # Heuristik aman: gabungkan hanya kalau gabungan katanya memang muncul di KB (vocab).
-    vocab = set(re.findall(r"[A-Za-zÀ-ÿ]+", text.lower()))
+def score_sentence(text: str) -> Sentence:
+    ss = text.strip()
+    # Hindari "kalimat" hasil gabungan list panjang yang bikin output berantakan
+    usable = len(ss) >= 40 and ss.count("-") < 3 and "Lokasi pantai" not in ss and "Konteks lokal" not in ss
+    low = ss.lower()
+    return Sentence(text=ss, score=sum(1 for k in KEY_SENTENCE_KEYWORDS if k in low), usable=usable)
 
-    def _join_if_known(m: re.Match) -> str:
-        left = m.group(1)
-        right = m.group(2)
-        combined = f"{left}{right}"
-        return combined if combined in vocab else m.group(0)
 
-    text = re.sub(r"\b([a-z]{1,2})\s+([a-z]{2,})\b", _join_if_known, text)
-    text = text.replace(para_token, "\n\n")
+def split_sentences(text: str) -> ChunkSentences:
+    """Pecah teks jadi kalimat (whitespace dirapikan) + skor tiap kalimat."""
+    text = _WHITESPACE.sub(" ", text).strip()
+    if not text:
+        return ChunkSentences(sentences=(), ends_sentence=True)
+    return ChunkSentences(
+        sentences=tuple(score_sentence(s) for s in _SENTENCE_SPLIT.split(text)),
+        ends_sentence=text[-1] in ".!?",
+    )
 
-    return text.strip()
 
+@dataclass(frozen=True)
+class Chunk:
+    """Potongan teks dari knowledge base."""
 
-def split_into_chunks(text: str, *, chunk_size: int = 650, chunk_overlap: int = 120) -> List[str]:
-    """Split text berbasis karakter, tapi berusaha memotong di batas paragraf."""
+    id: str
+    text: str
+
+    @property
+    def sentences(self) -> ChunkSentences:
+        """Kalimat chunk beserta skornya; dihitung sekali lalu disimpan di objek."""
+        cached = self.__dict__.get("_sentences")
+        if cached is None:
+            cached = split_sentences(self.text)
+            object.__setattr__(self, "_sentences", cached)
+        return cached
+
+
+# Placeholder pemisah paragraf di versi lama _normalize_text. Tetap dikenali sebagai
+# pemisah, dan kata-katanya ("para", "break") ikut masuk vocab seperti dulu, supaya
+# chunk yang dihasilkan sama persis.
+_PARA_TOKEN = "<<PARA_BREAK>>"
+_PARA_TOKEN_WORDS = ("para", "break")
+
+_VOCAB_WORD = re.compile(r"[A-Za-zÀ-ÿ]+")
+# Kasus umum split kata jadi "p antai", dll.
+_SPLIT_WORD = re.compile(r"\b([a-z]{1,2})\s+([a-z]{2,})\b")
+
+
+def _raw_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """Paragraf mentah dari baris teks (newline sudah "\n").
+
+    Dua newline berurutan (baris kosong) = pemisah paragraf; newline tunggal
+    dianggap spasi, karena banyak dokumen hasil export punya wrap per baris.
+    Hanya satu paragraf yang ditahan di memori.
+    """
+    buf: List[str] = []
+    first = True
+    for line in lines:
+        if line == "\n" and not first:
+            yield " ".join(buf)
+            buf = []
+        else:
+            buf.append(line.rstrip("\n"))  # paling banyak satu "\n", di akhir baris
+        first = False
+    if buf:
+        yield " ".join(buf)
+
+
+def _segments(lines: Iterable[str]) -> Iterator[Optional[str]]:
+    """Seperti _raw_paragraphs, dengan None di tiap pemisah paragraf (dipakai untuk vocab)."""
+    for i, para in enumerate(_raw_paragraphs(lines)):
+        if i:
+            yield None
+        if _PARA_TOKEN in para:
+            for j, part in enumerate(para.split(_PARA_TOKEN)):
+                if j:
+                    yield None
+                yield part
+        else:
+            yield para
 
-    text = _normalize_text(text)
-    if not text:
-        return []
 
-    # Pecah dulu per paragraf biar chunk lebih enak dibaca
-    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+def _document_vocab(lines: Iterable[str]) -> Set[str]:
+    """Semua kata (huruf kecil) di dokumen, untuk heuristik gabung kata."""
+    vocab: Set[str] = set()
+    has_break = False
+    for seg in _segments(lines):
+        if seg is None:
+            has_break = True
+        else:
+            vocab.update(_VOCAB_WORD.findall(seg.lower()))
+    if has_break:
+        vocab.update(_PARA_TOKEN_WORDS)
+    return vocab
+
+
+def iter_paragraphs(open_lines: Callable[[], ContextManager[Iterable[str]]]) -> Iterator[str]:
+    """Paragraf yang sudah dirapikan, dibaca streaming.
 
-    chunks: List[str] = []
-    cur = ""
+    `open_lines()` dipanggil dua kali (mis. `lambda: open(path, encoding="utf-8")`): pass pertama
+    mengumpulkan vocab, pass kedua merapikan paragraf satu per satu. Memori yang
+    dipakai = vocab + satu paragraf, bukan seluruh isi file.
+    """
+    # Heuristik aman: gabungkan "p antai" hanya kalau gabungan katanya memang muncul di KB (vocab).
+    with open_lines() as lines:
+        vocab = _document_vocab(lines)
+
+    def _join_if_known(m: re.Match) -> str:
+        combined = f"{m.group(1)}{m.group(2)}"
+        return combined if combined in vocab else m.group(0)
+
+    with open_lines() as lines:
+        for seg in _segments(lines):
+            p = _SPLIT_WORD.sub(_join_if_known, seg).strip() if seg else ""
+            if p:
+                yield p
+
+
+def iter_chunks(paragraphs: Iterable[str], *, chunk_size: int = 650, chunk_overlap: int = 120) -> Iterator[str]:
+    """Gabung paragraf jadi chunk <= chunk_size karakter, berusaha memotong di batas paragraf."""
+    cur: List[str] = []
+    cur_len = 0
     for p in paragraphs:
-        candidate = (cur + "\n\n" + p).strip() if cur else p
-        if len(candidate) <= chunk_size:
-            cur = candidate
+        # panjang cur + "\n\n" + p, tanpa menyambung string dulu
+        if len(p) + (cur_len + 2 if cur else 0) <= chunk_size:
+            cur.append(p)
+            cur_len += len(p) + (2 if cur_len else 0)
             continue
 
         if cur:
-            chunks.append(cur)
-            cur = ""
+            yield "\n\n".join(cur)
+            cur, cur_len = [], 0
 
         # kalau paragraf panjang banget, potong pakai sliding window
         if len(p) > chunk_size:
             start = 0
             while start < len(p):
                 end = min(len(p), start + chunk_size)
-                chunks.append(p[start:end].strip())
+                yield p[start:end].strip()
                 if end >= len(p):
                     break
                 start = max(0, end - chunk_overlap)
         else:
-            cur = p
+            cur, cur_len = [p], len(p)
 
     if cur:
-        chunks.append(cur)
+        yield "\n\n".join(cur)
 
     # Catatan: overlap antar chunk sering bikin kata kepotong (mis. "p antai").
     # Untuk KB EcoSea yang paragrafnya cukup jelas, kita kembalikan chunk apa adanya.
+
+
+def split_into_chunks(text: str, *, chunk_size: int = 650, chunk_overlap: int = 120) -> List[str]:
+    """Split text berbasis karakter, tapi berusaha memotong di batas paragraf."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    paragraphs = iter_paragraphs(lambda: io.StringIO(text))
+    return list(iter_chunks(paragraphs, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+
+
+# Ekstensi dokumen yang dibaca kalau RAG_KB_PATH berupa folder.
+KB_EXTENSIONS = (".txt", ".md")
+# Id dokumen untuk KB satu file (chunk id tetap "kb:{i}" seperti sebelumnya).
+SINGLE_DOC_ID = "kb"
+
+
+def chunk_doc_id(chunk_id: str) -> str:
+    """Id dokumen dari id chunk ("<dokumen>:<nomor>")."""
+    return chunk_id.rsplit(":", 1)[0]
+
+
+def list_kb_documents(kb_path: str) -> List[Tuple[str, str]]:
+    """(id dokumen, path) untuk KB berupa satu file atau folder berisi .txt/.md.
+
+    Id dokumen di folder = path relatif (pakai "/"), jadi stabil walau ada
+    dokumen lain yang ditambah/dihapus.
+    """
+    if not os.path.isdir(kb_path):
+        return [(SINGLE_DOC_ID, kb_path)]
+
+    docs: List[Tuple[str, str]] = []
+    for root, dirs, files in os.walk(kb_path):
+        # folder tersembunyi (mis. folder index) tidak ikut dibaca
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith(".") or not name.lower().endswith(KB_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            docs.append((os.path.relpath(path, kb_path).replace(os.sep, "/"), path))
+    return docs
+
+
+def _make_chunks(doc_id: str, parts: Iterable[str]) -> List[Chunk]:
+    chunks = [Chunk(id=f"{doc_id}:{i}", text=p) for i, p in enumerate(parts)]
+    for ch in chunks:
+        ch.sentences  # hitung sekarang (saat index dibuat), bukan saat request chat
     return chunks
 
 
+def document_chunks(doc_id: str, text: str, *, chunk_size: int = 650, chunk_overlap: int = 120) -> List[Chunk]:
+    """Chunk satu dokumen; id chunk "<doc_id>:<nomor>"."""
+    return _make_chunks(doc_id, split_into_chunks(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+
+
+def load_document(doc_id: str, path: str, *, chunk_size: int = 650, chunk_overlap: int = 120) -> List[Chunk]:
+    """Chunk satu file dokumen; file dibaca streaming per paragraf (tidak dimuat utuh)."""
+    paragraphs = iter_paragraphs(lambda: open(path, "r", encoding="utf-8"))
+    return _make_chunks(doc_id, iter_chunks(paragraphs, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+
+
 def load_kb_chunks(kb_path: str, *, chunk_size: int = 650, chunk_overlap: int = 120) -> List[Chunk]:
+    """Chunk semua dokumen KB (`kb_path` berupa file atau folder), urut per dokumen."""
     if not kb_path:
         raise ValueError("kb_path kosong")
     if not os.path.exists(kb_path):
         raise FileNotFoundError(f"Knowledge base tidak ditemukan: {kb_path}")
 
-    with open(kb_path, "r", encoding="utf-8") as f:
-        text = f.read()
-
-    parts = split_into_chunks(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    return [Chunk(id=f"kb:{i}", text=p) for i, p in enumerate(parts)]
+    chunks: List[Chunk] = []
+    for doc_id, path in list_kb_documents(kb_path):
+        chunks.extend(load_document(doc_id, path, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+    return chunks
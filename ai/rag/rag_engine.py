@@ -1,11 +1,40 @@
-import re
+import logging
+import os
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from flask import current_app
 
-from .loader import Chunk, load_kb_chunks
-from .vector_store import BM25Index, ScoredChunk, build_index
+from .answer_cache import AnswerCache
+from .index_store import (
+    combine_digests,
+    document_digests,
+    file_digest,
+    index_key,
+    load_or_build_dense,
+    load_or_build_index,
+)
+from .intents import get_matcher
+from .loader import (
+    Chunk,
+    ChunkSentences,
+    Sentence,
+    document_chunks,
+    list_kb_documents,
+    load_document,
+    load_kb_chunks,
+    score_sentence,
+    split_sentences,
+)
+from .vector_store import BM25Index, ScoredChunk, SearchIndex, _tokenize, build_index
+
+if TYPE_CHECKING:
+    # scipy + scikit-learn: baru di-import saat retriever hybrid dipakai (lihat _load_dense).
+    from .dense_index import DenseIndex
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -14,72 +43,34 @@ class RetrievalResult:
     contexts: List[str]
 
 
-# Intent detection (sederhana)
-_INTENT_QUICK = re.compile(r"\b(lapor|melapor|report|titik|koordinat|lokasi|foto|kotor|numpuk|muara|rob)\b", re.I)
-_INTENT_WHY = re.compile(r"\b(kenapa|mengapa|alasan|dampak|bahaya|pengaruh|akibat)\b", re.I)
-_INTENT_TRAVEL = re.compile(r"\b(wisata|liburan|rekomendasi|jalan\s?jalan|spot|pantai\s+mana|destinasi)\b", re.I)
-
-
-def _pick_beach_name(question: str) -> Optional[str]:
-    q = question.lower()
-    # Tangkap beberapa referensi lokal yang sering dipakai
-    mapping = {
-        "pai": "Pantai Alam Indah (PAI)",
-        "alam indah": "Pantai Alam Indah (PAI)",
-        "muarareja": "Pantai Muarareja",
-        "dampyak": "Pantai Dampyak",
-        "purwahamba": "Pantai Purwahamba Indah",
-        "randusanga": "Pantai Randusanga",
-        "pulau kodok": "Pulau Kodok",
-        "komodo": "Pantai Komodo",
-        "batam sari": "Pantai Batam Sari",
-    }
-    for k, v in mapping.items():
-        if k in q:
-            return v
-    if "tegal" in q:
-        return "pantai sekitar Tegal"
-    return None
+def _merge_sentences(parts: Sequence[ChunkSentences]) -> List[Sentence]:
+    """Gabungkan kalimat beberapa chunk, sama seperti kalau teksnya digabung lalu dipecah ulang.
 
-
-def _extract_key_sentences(contexts: List[str], *, max_sentences: int = 2) -> List[str]:
-    """Ambil 1-2 kalimat yang paling 'berisi' dari konteks."""
-    if not contexts:
-        return []
-
-    # Normalisasi whitespace biar kalimatnya gak kepotong aneh
-    text = "\n".join(contexts)
-    text = re.sub(r"\s+", " ", text).strip()
-
-    # Pisah kalimat (kasar tapi cukup)
-    sentences = re.split(r"(?<=[\.!\?])\s+", text)
-    # Skor kalimat: banyak kata kunci penting
-    keywords = [
-        "sampah", "plastik", "puntung", "jaring", "biota", "mangrove", "lamun",
-        "edukasi", "konservasi", "wisata", "muara", "lapor", "EcoSea",
-    ]
-
-    scored: List[Tuple[int, str]] = []
-    for s in sentences:
-        ss = s.strip()
-        if len(ss) < 40:
-            continue
-        # Hindari "kalimat" hasil gabungan list panjang yang bikin output berantakan
-        if ss.count("-") >= 3:
-            continue
-        if "Lokasi pantai" in ss or "Konteks lokal" in ss:
+    Kalau chunk tidak diakhiri . ! ?, kalimat terakhirnya nyambung dengan
+    kalimat pertama chunk berikutnya, jadi dua potongan itu digabung dan
+    diskor ulang (jarang terjadi); sisanya pakai hasil yang sudah dihitung.
+    """
+    merged: List[Sentence] = []
+    open_tail = False
+    for part in parts:
+        if not part.sentences:
             continue
-        score = 0
-        low = ss.lower()
-        for k in keywords:
-            if k.lower() in low:
-                score += 1
-        scored.append((score, ss))
-
-    scored.sort(key=lambda x: (x[0], len(x[1])), reverse=True)
+        if open_tail:
+            merged[-1] = score_sentence(merged[-1].text + " " + part.sentences[0].text)
+            merged.extend(part.sentences[1:])
+        else:
+            merged.extend(part.sentences)
+        open_tail = not part.ends_sentence
+    return merged
+
+
+def _pick_key_sentences(parts: Sequence[ChunkSentences], *, max_sentences: int = 2) -> List[str]:
+    """Ambil 1-2 kalimat yang paling 'berisi' dari kalimat chunk yang sudah dihitung."""
+    scored = [s for s in _merge_sentences(parts) if s.usable]
+    scored.sort(key=lambda s: (s.score, len(s.text)), reverse=True)
     out = []
-    for _, s in scored[:max_sentences]:
-        ss = s.strip()
+    for s in scored[:max_sentences]:
+        ss = s.text
         # Biar ringkas
         if len(ss) > 220:
             ss = ss[:217].rstrip() + "..."
@@ -87,62 +78,478 @@ def _extract_key_sentences(contexts: List[str], *, max_sentences: int = 2) -> Li
     return out
 
 
+def _extract_key_sentences(contexts: List[str], *, max_sentences: int = 2) -> List[str]:
+    """Ambil 1-2 kalimat yang paling 'berisi' dari konteks (teks mentah)."""
+    if not contexts:
+        return []
+    return _pick_key_sentences([split_sentences(c) for c in contexts], max_sentences=max_sentences)
+
+
+# Pertanyaan dengan token sebanyak ini atau kurang dianggap bisa jadi pertanyaan lanjutan.
+_FOLLOWUP_MAX_TOKENS = 6
+
+
+def _fusion_depth(k: int) -> int:
+    """Jumlah kandidat per retriever sebelum digabung RRF."""
+    return max(4 * k, 20)
+
+
+def _scan_kb(kb_path: str) -> Dict[str, Tuple[int, int]]:
+    """id dokumen -> (mtime_ns, size), untuk deteksi perubahan KB yang murah."""
+    state: Dict[str, Tuple[int, int]] = {}
+    if not kb_path or not os.path.exists(kb_path):
+        return state
+    for doc_id, path in list_kb_documents(kb_path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        state[doc_id] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
 class EcoSeaRAG:
     """RAG engine untuk EcoSea.
 
-    - Retrieval: BM25 dari knowledge base (chatbot.txt)
+    - Retrieval: BM25 dari knowledge base (chatbot.txt); retriever="hybrid" menambah
+      index dense (n-gram karakter + SVD) dan menggabungkan ranking-nya (RRF).
     - Generation: rule-based template agar tidak bergantung ke API/model eksternal.
 
     Catatan: kalau nanti mau pakai LLM, tinggal ganti fungsi _generate().
     """
 
-    def __init__(self, *, kb_path: str, top_k: int = 4, chunk_size: int = 650, chunk_overlap: int = 120):
+    def __init__(
+        self,
+        *,
+        kb_path: str,
+        top_k: int = 4,
+        chunk_size: int = 650,
+        chunk_overlap: int = 120,
+        index_backend: str = "bm25",
+        index_dir: str = "",
+        reload_seconds: float = 0.0,
+        cache_size: int = 1024,
+        cache_ttl: float = 600.0,
+        retriever: str = "bm25",
+        dense_dim: int = 256,
+        dense_min_score: float = 0.2,
+        rrf_k: int = 60,
+        gazetteer_path: str = "",
+        history_turns: int = 2,
+        bm25_k1: float = 1.5,
+        bm25_b: float = 0.75,
+    ):
         self.kb_path = kb_path
         self.top_k = max(1, int(top_k))
         self.chunk_size = max(200, int(chunk_size))
         self.chunk_overlap = max(0, int(chunk_overlap))
+        self.index_backend = index_backend
+        self.bm25_k1 = float(bm25_k1)
+        self.bm25_b = float(bm25_b)
+        self.index_dir = index_dir
+        self.reload_seconds = float(reload_seconds)
+        self.retriever = retriever
+        self.dense_dim = max(8, int(dense_dim))
+        self.dense_min_score = float(dense_min_score)
+        self.rrf_k = max(1, int(rrf_k))
+        # Intent + nama pantai (gazetteer JSON): indeks alias per kata, dibangun sekali per file.
+        self._matcher = get_matcher(gazetteer_path)
+        # Jumlah pertanyaan user sebelumnya yang digabung ke query pertanyaan lanjutan.
+        self.history_turns = max(0, int(history_turns))
+
+        # Hot reload KB: cek stat dokumen paling sering tiap reload_seconds, konfirmasi pakai hash isi.
+        self._update_lock = threading.Lock()
+        self._reloading = False
+        self._last_check = time.monotonic()
+        self._kb_state = _scan_kb(kb_path)
+        self._doc_digests = document_digests(kb_path) if kb_path and os.path.exists(kb_path) else {}
+        self._kb_digest = combine_digests(self._doc_digests) if self._doc_digests else ""
+
+        self._index = self._load_index(digest=self._kb_digest)
+        self._dense: Optional["DenseIndex"] = self._load_dense() if retriever == "hybrid" else None
+        # Naik tiap index berubah; bagian dari key cache, jadi jawaban lama otomatis tidak dipakai.
+        self._index_version = 0
+        self._cache = AnswerCache(max_items=cache_size, ttl_seconds=cache_ttl)
+
+    @property
+    def _chunks(self) -> Sequence[Chunk]:
+        return self._index.chunks
+
+    def _load_index(self, *, digest: str = "") -> SearchIndex:
+        if self.index_dir:
+            # Index tersimpan di disk (CSR, di-mmap): start worker tidak perlu chunking + build ulang.
+            return load_or_build_index(
+                self.kb_path,
+                self.index_dir,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                digest=digest,
+                k1=self.bm25_k1,
+                b=self.bm25_b,
+            )
+        chunks = load_kb_chunks(
+            self.kb_path,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+        )
+        return build_index(chunks, backend=self.index_backend, k1=self.bm25_k1, b=self.bm25_b)
+
+    def _load_dense(self) -> "DenseIndex":
+        from .dense_index import NGRAM_RANGE, N_FEATURES, DenseIndex
+
+        def build() -> DenseIndex:
+            t0 = time.perf_counter()
+            dense = DenseIndex(self._index.chunks, dim=self.dense_dim)
+            logger.info("Index dense RAG dibuat: %d chunk (%.2f s)", len(dense.chunks), time.perf_counter() - t0)
+            return dense
 
-        self._chunks: List[Chunk] = load_kb_chunks(
-            kb_path,
+        if not self.index_dir:
+            return build()
+        key = index_key(
+            self.kb_path,
             chunk_size=self.chunk_size,
             chunk_overlap=self.chunk_overlap,
+            k1=self.bm25_k1,
+            b=self.bm25_b,
+            digest=self._kb_digest,
         )
-        self._index: BM25Index = build_index(self._chunks)
+        return load_or_build_dense(
+            os.path.join(self.index_dir, key),
+            self._index.chunks,
+            config={"dim": self.dense_dim, "n_features": N_FEATURES, "ngram_range": list(NGRAM_RANGE)},
+            build=build,
+        )
+
+    def _document_chunks(self, doc_id: str, text: str) -> List[Chunk]:
+        return document_chunks(doc_id, text, chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
+
+    # --- ubah index per dokumen ---
+
+    def add_document(self, doc_id: str, text: str) -> int:
+        """Tambah / ganti satu dokumen di index yang sedang dipakai (file KB tidak diubah).
+
+        Return jumlah chunk dokumen itu.
+        """
+        chunks = self._document_chunks(doc_id, text)
+        with self._update_lock:
+            self._replace_documents({doc_id: chunks})
+        return len(chunks)
+
+    def remove_document(self, doc_id: str) -> None:
+        with self._update_lock:
+            self._replace_documents({doc_id: []})
+
+    def _replace_documents(self, docs: Dict[str, List[Chunk]], order: Optional[List[str]] = None) -> None:
+        """Ganti chunk beberapa dokumen (list kosong = hapus). Panggil dengan _update_lock."""
+        index = self._index
+        if isinstance(index, BM25Index):
+            # Diubah di tempat, per dokumen; search hanya tertahan saat posting diubah.
+            for doc_id, chunks in docs.items():
+                if chunks:
+                    index.add_document(doc_id, chunks)
+                else:
+                    index.remove_document(doc_id)
+            self._index_changed()
+            return
+
+        # CSR tidak bisa diubah di tempat: build index baru (inkremental), lalu tukar
+        # dengan satu assignment.
+        if self.index_dir and order is not None:
+            # Perubahan dari file KB: simpan juga supaya worker lain tinggal buka.
+            self._index = load_or_build_index(
+                self.kb_path,
+                self.index_dir,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                digest=combine_digests(self._doc_digests),
+                k1=self.bm25_k1,
+                b=self.bm25_b,
+                build=lambda: index.with_documents(docs, order=order),
+            )
+        else:
+            self._index = index.with_documents(docs, order=order)
+        self._index_changed()
+
+    def _index_changed(self) -> None:
+        if self._dense is not None:
+            # Vocab + proyeksi tetap, hanya chunk baru yang di-embed (fit ulang saat start berikutnya).
+            self._dense = self._dense.updated(self._index.chunks)
+        self._index_version += 1
+        self._cache.clear()
+
+    # --- hot reload dari file KB ---
+
+    def maybe_reload(self) -> None:
+        """Kalau file KB berubah, perbarui index di background."""
+        if self.reload_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.reload_seconds:
+            return
+        self._last_check = now
+        if _scan_kb(self.kb_path) == self._kb_state:
+            return
+        with self._update_lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self.reload, name="rag-kb-reload", daemon=True).start()
+
+    def reload(self) -> bool:
+        """Perbarui index dari KB terbaru; hanya dokumen yang berubah yang di-chunk ulang.
+
+        True kalau ada dokumen yang berubah.
+        """
+        try:
+            with self._update_lock:
+                state = _scan_kb(self.kb_path)
+                paths = dict(list_kb_documents(self.kb_path))
+                digests = {}
+                for doc_id, path in paths.items():
+                    same_stat = state.get(doc_id) == self._kb_state.get(doc_id)
+                    if same_stat and doc_id in self._doc_digests:
+                        digests[doc_id] = self._doc_digests[doc_id]
+                    else:
+                        digests[doc_id] = file_digest(path)
+
+                changed = [d for d in paths if digests[d] != self._doc_digests.get(d)]
+                removed = [d for d in self._doc_digests if d not in digests]
+                if not changed and not removed:
+                    self._kb_state = state
+                    return False
+
+                t0 = time.perf_counter()
+                docs: Dict[str, List[Chunk]] = {d: [] for d in removed}
+                for doc_id in changed:
+                    docs[doc_id] = load_document(
+                        doc_id, paths[doc_id], chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
+                    )
+                self._doc_digests = digests
+                self._replace_documents(docs, order=list(paths))
+                self._kb_digest = combine_digests(digests)
+                self._kb_state = state
+            logger.info(
+                "KB %s dimuat ulang: %d dokumen berubah, %d dihapus (%.2f s)",
+                self.kb_path, len(changed), len(removed), time.perf_counter() - t0,
+            )
+            return True
+        except Exception as e:
+            # state tidak diperbarui, jadi dicoba lagi di pengecekan berikutnya.
+            logger.warning("Gagal reload KB %s: %s", self.kb_path, e)
+            return False
+        finally:
+            self._reloading = False
+
+    def _cache_key(self, kind: str, question: str, k: int, *, query: Optional[str] = None) -> Optional[tuple]:
+        # Key = urutan token query ternormalisasi (huruf kecil, tanpa tanda baca), jadi
+        # "Apa itu EcoSea?" dan "apa itu ecosea" berbagi entry.
+        toks = tuple(_tokenize(question or ""))
+        if not toks:
+            return None
+        if query is not None and query != question:
+            # Query retrieval ikut riwayat: konteksnya beda walau pertanyaannya sama.
+            return (kind, self._index_version, toks, tuple(_tokenize(query)), k)
+        return (kind, self._index_version, toks, k)
+
+    def _retrieval_query(self, question: str, history: Optional[list]) -> str:
+        """Query retrieval: pertanyaan lanjutan yang pendek ("kalau di PAI gimana?")
+        digabung dengan pertanyaan user sebelumnya supaya topiknya tidak hilang.
+
+        `history` = giliran lama -> baru ({"role": "user" / "assistant", "content": ...}).
+        Pertanyaan yang cukup panjang dianggap berdiri sendiri.
+        """
+        if not history or self.history_turns == 0 or len(_tokenize(question)) > _FOLLOWUP_MAX_TOKENS:
+            return question
+        previous = [
+            turn["content"] for turn in history
+            if isinstance(turn, dict) and turn.get("role") == "user" and isinstance(turn.get("content"), str)
+        ][-self.history_turns:]
+        if not previous:
+            return question
+        return " ".join([question] + previous[::-1])
 
     def retrieve(self, question: str, *, k: Optional[int] = None) -> List[str]:
+        self.maybe_reload()
         k = self.top_k if k is None else max(1, int(k))
-        hits = self._index.search(question, k=k)
-        return [h.chunk.text for h in hits]
+        key = self._cache_key("ctx", question, k)
+        cached = self._cache.get(key) if key else None
+        if cached is not None:
+            return list(cached)
+
+        contexts = [c.text for c in self._retrieve_chunks(question, k)]
+        if key:
+            self._cache.put(key, tuple(contexts))
+        return contexts
+
+    def _retrieve_chunks(self, question: str, k: int) -> List[Chunk]:
+        index, dense = self._index, self._dense
+        if dense is None:
+            return [h.chunk for h in index.search(question, k=k)]
+        depth = _fusion_depth(k)
+        return self._fuse(
+            index.search(question, k=depth), dense.search(question, k=depth, min_score=self.dense_min_score), k
+        )
 
-    def answer(self, question: str, *, history: Optional[list] = None) -> RetrievalResult:
-        contexts = self.retrieve(question, k=self.top_k)
-        reply = self._generate(question, contexts, history=history)
-        return RetrievalResult(reply=reply, contexts=contexts)
+    def _retrieve_many(self, questions: Sequence[str], k: int) -> List[List[Chunk]]:
+        index, dense = self._index, self._dense
+        if dense is None:
+            return [[h.chunk for h in hits] for hits in index.search_many(questions, k=k)]
+        depth = _fusion_depth(k)
+        return [
+            self._fuse(lexical, semantic, k)
+            for lexical, semantic in zip(
+                index.search_many(questions, k=depth),
+                dense.search_many(questions, k=depth, min_score=self.dense_min_score),
+            )
+        ]
+
+    def _fuse(self, lexical: List[ScoredChunk], semantic: List[ScoredChunk], k: int) -> List[Chunk]:
+        # Tanpa satu pun hit BM25 (tidak ada kata query di KB), hit dense saja tidak dipakai:
+        # cosine setelah SVD hampir selalu > 0, jadi jawaban "tidak ditemukan" tetap bisa muncul.
+        if not lexical:
+            return []
+        from .dense_index import reciprocal_rank_fusion
 
-    def _generate(self, question: str, contexts: List[str], *, history: Optional[list] = None) -> str:
+        return reciprocal_rank_fusion([lexical, semantic], k=k, rrf_k=self.rrf_k)
+
+    def answer(self, question: str, *, history: Optional[list] = None) -> RetrievalResult:
+        self.maybe_reload()
+        # _generate tidak memakai history selain lewat query retrieval, jadi key cukup
+        # pertanyaan + query itu.
+        query = self._retrieval_query(question, history)
+        key = self._cache_key("ans", question, self.top_k, query=query)
+        cached = self._cache.get(key) if key else None
+        if cached is not None:
+            return cached
+
+        chunks = self._retrieve_chunks(query, self.top_k)
+        contexts = [c.text for c in chunks]
+        reply = self._generate(question, contexts, history=history, sentences=[c.sentences for c in chunks])
+        res = RetrievalResult(reply=reply, contexts=contexts)
+        if key:
+            self._cache.put(key, res)
+        return res
+
+    def answer_many(self, questions: Sequence[str]) -> List[RetrievalResult]:
+        """answer() untuk banyak pertanyaan sekaligus (tanpa history), urutan hasil sama.
+
+        Pertanyaan yang sama setelah normalisasi dihitung sekali, yang sudah ada di
+        cache langsung dipakai, sisanya di-search bersama lewat `search_many`.
+        """
+        self.maybe_reload()
+        results: List[Optional[RetrievalResult]] = [None] * len(questions)
+        pending: Dict[object, List[int]] = {}
+        for i, q in enumerate(questions):
+            key = self._cache_key("ans", q, self.top_k)
+            cached = self._cache.get(key) if key else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(key or ("tanpa-token", i), []).append(i)
+
+        firsts = [idxs[0] for idxs in pending.values()]
+        all_chunks = self._retrieve_many([questions[i] for i in firsts], self.top_k)
+        for (key, idxs), chunks in zip(pending.items(), all_chunks):
+            contexts = [c.text for c in chunks]
+            reply = self._generate(questions[idxs[0]], contexts, sentences=[c.sentences for c in chunks])
+            res = RetrievalResult(reply=reply, contexts=contexts)
+            if key[0] == "ans":
+                self._cache.put(key, res)
+            for i in idxs:
+                results[i] = res
+        return results
+
+    def answer_stream(self, question: str, *, history: Optional[list] = None) -> Iterator[Tuple[str, object]]:
+        """Seperti answer(), tapi bertahap: ("contexts", [teks]) dulu, lalu ("delta", potongan jawaban).
+
+        Jawaban yang selesai di-stream ikut masuk cache yang sama dengan answer().
+        """
+        self.maybe_reload()
+        query = self._retrieval_query(question, history)
+        key = self._cache_key("ans", question, self.top_k, query=query)
+        cached = self._cache.get(key) if key else None
+        if cached is not None:
+            yield "contexts", list(cached.contexts)
+            yield "delta", cached.reply
+            return
+
+        chunks = self._retrieve_chunks(query, self.top_k)
+        contexts = [c.text for c in chunks]
+        yield "contexts", contexts
+
+        parts: List[str] = []
+        for piece in self._generate_stream(question, contexts, history=history, sentences=[c.sentences for c in chunks]):
+            parts.append(piece)
+            yield "delta", piece
+        if key:
+            self._cache.put(key, RetrievalResult(reply="".join(parts), contexts=contexts))
+
+    def stats(self) -> dict:
+        dense = self._dense
+        return {
+            "chunks": len(self._index.chunks),
+            "retriever": "hybrid" if dense is not None else "bm25",
+            "dense": {"dim": dense.dim, "bytes": dense.nbytes()} if dense is not None else None,
+            "index_version": self._index_version,
+            "kb_digest": self._kb_digest,
+            "cache": self._cache.stats(),
+        }
+
+    def _generate(
+        self,
+        question: str,
+        contexts: List[str],
+        *,
+        history: Optional[list] = None,
+        sentences: Optional[Sequence[ChunkSentences]] = None,
+    ) -> str:
+        return "".join(self._generate_stream(question, contexts, history=history, sentences=sentences))
+
+    def _generate_stream(
+        self,
+        question: str,
+        contexts: List[str],
+        *,
+        history: Optional[list] = None,
+        sentences: Optional[Sequence[ChunkSentences]] = None,
+    ) -> Iterator[str]:
+        """Jawaban dalam potongan teks (digabung = jawaban utuh).
+
+        Generator, supaya generator jawaban yang lebih lambat (mis. LLM) nanti
+        bisa langsung di-stream ke client lewat stream_answer().
+        """
         q = (question or "").strip()
         if not q:
-            return "Pesannya kosong nih. Coba tulis pertanyaanmu ya 😊"
+            yield "Pesannya kosong nih. Coba tulis pertanyaanmu ya 😊"
+            return
 
-        beach = _pick_beach_name(q)
-        key_sents = _extract_key_sentences(contexts, max_sentences=2)
+        found = self._matcher.match(q)
+        beach = found.beach
+        if sentences is not None:
+            # Kalimat + skornya sudah dihitung saat index dibuat; tinggal digabung.
+            key_sents = _pick_key_sentences(sentences, max_sentences=2)
+        else:
+            key_sents = _extract_key_sentences(contexts, max_sentences=2)
 
         # 1) Tindakan cepat / pelaporan
-        if _INTENT_QUICK.search(q):
+        if "quick" in found.intents:
             headline = f"Oke, aku bantu. {('Kalau ini di ' + beach + ', ') if beach else ''}yang paling cepat bisa kamu lakukan:".strip()
             steps = [
                 "1) Foto kondisi dari beberapa sudut + catat jam (kalau bisa) dan lokasi/titiknya.",
                 "2) Pilah cepat: plastik (kresek/botol/sedotan) vs residu. Pakai sarung tangan kalau ada.",
                 "3) Laporkan lewat EcoSea (foto + lokasi + detail). Kalau di area wisata, kabari juga pengelola/penjaga.",
             ]
-            extra = ""
-            if "muara" in q.lower() or "rob" in q.lower():
-                extra = "\n\nCatatan: muara/drainase itu sering jadi titik sampah kiriman (apalagi pas hujan/rob), jadi laporannya penting banget."
-            context_line = f"\n\nInfo singkat: {key_sents[0]}" if key_sents else ""
-            return headline + "\n" + "\n".join(steps) + extra + context_line
+            yield headline
+            for step in steps:
+                yield "\n" + step
+            if "kiriman" in found.tags:
+                yield "\n\nCatatan: muara/drainase itu sering jadi titik sampah kiriman (apalagi pas hujan/rob), jadi laporannya penting banget."
+            if key_sents:
+                yield f"\n\nInfo singkat: {key_sents[0]}"
+            return
 
         # 2) Kenapa / dampak
-        if _INTENT_WHY.search(q):
+        if "why" in found.intents:
             expl = key_sents[0] if key_sents else "Sampah (terutama plastik) bisa terbawa arus/ombak ke laut, merusak ekosistem, dan membahayakan biota."
             prevent = [
                 "Yang bisa dicegah bareng-bareng:",
@@ -150,13 +557,14 @@ class EcoSeaRAG:
                 "- Buang sampah di tempatnya / bawa pulang kalau tempat sampah penuh.",
                 "- Ikut bersih pantai atau ajak teman 2–5 menit ambil sampah sebelum pulang.",
             ]
-            local = ""
-            if beach or "pantura" in q.lower() or "tegal" in q.lower():
-                local = "\n\nDi Pantura (terutama dekat muara/pemukiman), sampah juga sering kiriman dari sungai—jadi selain bersihin, laporan titik rawan itu ngebantu banget."
-            return f"Singkatnya: {expl}\n\n" + "\n".join(prevent) + local
+            yield f"Singkatnya: {expl}\n\n"
+            yield from _lines(prevent)
+            if beach or found.tags & {"pantura", "tegal"}:
+                yield "\n\nDi Pantura (terutama dekat muara/pemukiman), sampah juga sering kiriman dari sungai—jadi selain bersihin, laporan titik rawan itu ngebantu banget."
+            return
 
         # 3) Wisata / rekomendasi
-        if _INTENT_TRAVEL.search(q):
+        if "travel" in found.intents:
             picks = [
                 "Pantai Alam Indah (PAI)",
                 "Pantai Muarareja",
@@ -164,7 +572,7 @@ class EcoSeaRAG:
                 "Pantai Purwahamba Indah",
                 "Pantai Randusanga",
             ]
-            if "tegal" in q.lower() or (beach and "Tegal" in beach):
+            if "tegal" in found.tags or (beach and "Tegal" in beach):
                 header = "Kalau sekitar Tegal/Pantura, beberapa opsi yang sering jadi pilihan:" 
             else:
                 header = "Kalau kamu cari wisata pantai, coba pertimbangkan ini (terutama Pantura):"
@@ -174,8 +582,14 @@ class EcoSeaRAG:
                 "- Bawa botol minum isi ulang, kurangi jajan kemasan sekali pakai.",
                 "- Sebelum pulang, 2–5 menit ambil sampah kecil di sekitar spotmu.",
             ]
-            context_line = f"\n\nTambahan: {key_sents[0]}" if key_sents else ""
-            return header + "\n- " + "\n- ".join(picks) + "\n\n" + "\n".join(tips) + context_line
+            yield header
+            for pick in picks:
+                yield "\n- " + pick
+            yield "\n\n"
+            yield from _lines(tips)
+            if key_sents:
+                yield f"\n\nTambahan: {key_sents[0]}"
+            return
 
         # 4) Default
         expl = key_sents[0] if key_sents else "Pantai itu penyangga ekosistem laut dan juga ruang wisata, jadi kebersihannya penting banget." 
@@ -185,29 +599,63 @@ class EcoSeaRAG:
             "- Pilah sampah (plastik / logam-kaca / organik / residu).",
             "- Kalau lihat titik kotor, foto + lokasi lalu lapor lewat EcoSea.",
         ]
-        return f"{expl}\n\n" + "\n".join(actions)
+        yield f"{expl}\n\n"
+        yield from _lines(actions)
+
+
+def _lines(lines: List[str]) -> Iterator[str]:
+    """Potongan per baris, sama dengan "\\n".join(lines)."""
+    for i, line in enumerate(lines):
+        yield ("\n" + line) if i else line
 
 
 _ENGINE: Optional[EcoSeaRAG] = None
+_ENGINE_LOCK = threading.Lock()
 
 
 def get_engine() -> EcoSeaRAG:
-    """Singleton engine, dibuat saat pertama dipakai."""
+    """Singleton engine, dibuat saat pertama dipakai (sekali, walau banyak thread datang bersamaan)."""
     global _ENGINE
     if _ENGINE is not None:
         return _ENGINE
 
-    cfg = current_app.config
-    kb_path = cfg.get("RAG_KB_PATH")
-    _ENGINE = EcoSeaRAG(
-        kb_path=kb_path,
-        top_k=int(cfg.get("RAG_TOP_K", 4)),
-        chunk_size=int(cfg.get("RAG_CHUNK_SIZE", 650)),
-        chunk_overlap=int(cfg.get("RAG_CHUNK_OVERLAP", 120)),
-    )
+    with _ENGINE_LOCK:
+        if _ENGINE is not None:
+            return _ENGINE
+        cfg = current_app.config
+        kb_path = cfg.get("RAG_KB_PATH")
+        _ENGINE = EcoSeaRAG(
+            kb_path=kb_path,
+            top_k=int(cfg.get("RAG_TOP_K", 4)),
+            chunk_size=int(cfg.get("RAG_CHUNK_SIZE", 650)),
+            chunk_overlap=int(cfg.get("RAG_CHUNK_OVERLAP", 120)),
+            index_backend=cfg.get("RAG_INDEX_BACKEND", "bm25"),
+            index_dir=cfg.get("RAG_INDEX_DIR", ""),
+            reload_seconds=float(cfg.get("RAG_RELOAD_SECONDS", 0)),
+            cache_size=int(cfg.get("RAG_CACHE_SIZE", 1024)),
+            cache_ttl=float(cfg.get("RAG_CACHE_TTL", 600)),
+            retriever=cfg.get("RAG_RETRIEVER", "bm25"),
+            dense_dim=int(cfg.get("RAG_DENSE_DIM", 256)),
+            dense_min_score=float(cfg.get("RAG_DENSE_MIN_SCORE", 0.2)),
+            rrf_k=int(cfg.get("RAG_RRF_K", 60)),
+            gazetteer_path=cfg.get("RAG_GAZETTEER_PATH", ""),
+            history_turns=int(cfg.get("RAG_HISTORY_TURNS", 2)),
+            bm25_k1=float(cfg.get("RAG_BM25_K1", 1.5)),
+            bm25_b=float(cfg.get("RAG_BM25_B", 0.75)),
+        )
     return _ENGINE
 
 
 def answer_question(question: str, *, history: Optional[list] = None) -> RetrievalResult:
     engine = get_engine()
     return engine.answer(question, history=history)
+
+
+def answer_many(questions: Sequence[str]) -> List[RetrievalResult]:
+    engine = get_engine()
+    return engine.answer_many(questions)
+
+
+def stream_answer(question: str, *, history: Optional[list] = None) -> Iterator[Tuple[str, object]]:
+    engine = get_engine()
+    return engine.answer_stream(question, history=history)
@@ -1,9 +1,20 @@
+import hashlib
+import heapq
 import math
 import re
+import threading
+from array import array
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-from .loader import Chunk
+import numpy as np
+
+from .loader import Chunk, chunk_doc_id
+
+if TYPE_CHECKING:
+    # scipy.sparse baru di-import saat CompactBM25Index dipakai (backend default tidak butuh).
+    from scipy import sparse
 
 
 _TOKEN_RE = re.compile(r"[A-Za-z0-9À-ÿ]+", flags=re.UNICODE)
@@ -19,83 +30,472 @@ class ScoredChunk:
     score: float
 
 
+def _term_freqs(text: str) -> Dict[str, int]:
+    tf: Dict[str, int] = {}
+    for t in _tokenize(text):
+        tf[t] = tf.get(t, 0) + 1
+    return tf
+
+
 class BM25Index:
     """BM25 sederhana (tanpa dependensi eksternal).
 
-    Cocok untuk KB kecil-menengah seperti chatbot.txt.
+    Cocok untuk KB kecil-menengah seperti chatbot.txt. Postings (term ->
+    {slot dokumen: tf}) dibuat sekali di `_build`, jadi `search` hanya
+    menyentuh dokumen yang punya minimal satu kata dari query.
+
+    Index bisa diubah per dokumen KB (`add_document` / `remove_document`):
+    hanya posting chunk dokumen itu yang disentuh. Chunk yang teksnya tidak
+    berubah tetap di slot-nya, dan slot chunk yang dihapus dipakai ulang oleh
+    chunk berikutnya. Tokenisasi dilakukan di luar `_lock`, jadi `search`
+    hanya tertahan selama posting benar-benar diubah. IDF dihitung saat
+    query, dan normalisasi panjang dihitung ulang sekali setelah ada perubahan.
     """
 
     def __init__(self, chunks: List[Chunk], *, k1: float = 1.5, b: float = 0.75):
-        self.chunks = chunks
         self.k1 = k1
         self.b = b
 
-        self._doc_tokens: List[List[str]] = []
-        self._tf: List[Dict[str, int]] = []
-        self._df: Dict[str, int] = {}
-        self._idf: Dict[str, float] = {}
+        self._slots: List[Optional[Chunk]] = []
+        self._free: List[int] = []  # heap slot kosong
+        self._docs: Dict[str, List[int]] = {}  # id dokumen -> slot chunk-nya
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {slot: tf}
         self._doc_lens: List[int] = []
+        self._total_len = 0
+        self._n = 0
+        # k1 * (1 - b + b * dl / avgdl) per slot; None = perlu dihitung ulang
+        self._norms: Optional[List[float]] = None
+        self._lock = threading.Lock()  # dipegang search + saat index diubah
+        self._write_lock = threading.Lock()  # satu perubahan dokumen dalam satu waktu
+
+        self._build(chunks)
+
+    @property
+    def chunks(self) -> List[Chunk]:
+        return [c for c in self._slots if c is not None]
+
+    @property
+    def _avg_len(self) -> float:
+        return self._total_len / max(1, self._n)
+
+    def _build(self, chunks: List[Chunk]) -> None:
+        for ch in chunks:
+            self._docs.setdefault(chunk_doc_id(ch.id), []).append(self._insert(ch, _term_freqs(ch.text)))
+
+    def _insert(self, ch: Chunk, tf: Dict[str, int]) -> int:
+        """Masukkan chunk (tf sudah dihitung); return slot-nya."""
+        length = sum(tf.values())
+        if self._free:
+            slot = heapq.heappop(self._free)
+        else:
+            slot = len(self._slots)
+            self._slots.append(None)
+            self._doc_lens.append(0)
+        self._slots[slot] = ch
+        self._doc_lens[slot] = length
+        self._total_len += length
+        self._n += 1
+
+        for t, f in tf.items():
+            self._postings.setdefault(t, {})[slot] = f
+        self._norms = None
+        return slot
+
+    def _delete(self, slot: int, terms: Iterable[str]) -> None:
+        for t in terms:
+            posting = self._postings[t]
+            del posting[slot]
+            if not posting:
+                del self._postings[t]
+        self._total_len -= self._doc_lens[slot]
+        self._doc_lens[slot] = 0
+        self._slots[slot] = None
+        self._n -= 1
+        heapq.heappush(self._free, slot)
+        self._norms = None
+
+    def documents(self) -> List[str]:
+        with self._lock:
+            return list(self._docs)
+
+    def add_document(self, doc_id: str, chunks: List[Chunk]) -> None:
+        """Tambah dokumen, atau ganti semua chunk-nya kalau `doc_id` sudah ada.
+
+        Chunk lama yang teksnya sama dengan chunk baru tetap di slot-nya
+        (hanya objek Chunk-nya diganti); hanya chunk yang berubah yang
+        di-tokenize dan diubah postingnya.
+        """
+        with self._write_lock:
+            # Slot lama per teks; hanya writer (yang sedang kita pegang) yang mengubahnya.
+            by_text: Dict[str, List[int]] = {}
+            for slot in self._docs.get(doc_id, []):
+                by_text.setdefault(self._slots[slot].text, []).append(slot)
+
+            plan: List[Tuple[Chunk, Optional[int], Optional[Dict[str, int]]]] = []
+            for ch in chunks:
+                same = by_text.get(ch.text)
+                if same:
+                    plan.append((ch, same.pop(0), None))
+                else:
+                    plan.append((ch, None, _term_freqs(ch.text)))
+            stale = [(slot, set(_tokenize(self._slots[slot].text))) for slots in by_text.values() for slot in slots]
+
+            with self._lock:
+                for slot, terms in stale:
+                    self._delete(slot, terms)
+                slots = []
+                for ch, slot, tf in plan:
+                    if slot is None:
+                        slot = self._insert(ch, tf)
+                    else:
+                        self._slots[slot] = ch
+                    slots.append(slot)
+                if slots:
+                    self._docs[doc_id] = slots
+                else:
+                    self._docs.pop(doc_id, None)
+
+    def remove_document(self, doc_id: str) -> int:
+        """Hapus semua chunk dokumen `doc_id`; return jumlah chunk yang dihapus."""
+        with self._write_lock:
+            stale = [(slot, set(_tokenize(self._slots[slot].text))) for slot in self._docs.get(doc_id, [])]
+            with self._lock:
+                self._docs.pop(doc_id, None)
+                for slot, terms in stale:
+                    self._delete(slot, terms)
+            return len(stale)
+
+    def _ensure_norms(self) -> List[float]:
+        if self._norms is None:
+            avg = self._avg_len or 1.0
+            self._norms = [self.k1 * (1 - self.b + self.b * (dl / avg)) for dl in self._doc_lens]
+        return self._norms
+
+    def search(self, query: str, *, k: int = 4) -> List[ScoredChunk]:
+        if not query:
+            return []
+
+        q_toks = _tokenize(query)
+        if not q_toks:
+            return []
+
+        with self._lock:
+            if self._n == 0:
+                return []
+            n = self._n
+            norms = self._ensure_norms()
+
+            # Term-at-a-time: akumulasi skor hanya untuk dokumen di postings tiap term.
+            # Kata yang muncul dua kali di query tetap dihitung dua kali (sama seperti sebelumnya).
+            scores: Dict[int, float] = {}
+            k1p1 = self.k1 + 1
+            for t in q_toks:
+                posting = self._postings.get(t)
+                if not posting:
+                    continue
+                df = len(posting)
+                # IDF BM25 klasik
+                idf = math.log((n - df + 0.5) / (df + 0.5) + 1.0)
+                for slot, f in posting.items():
+                    denom = f + norms[slot]
+                    scores[slot] = scores.get(slot, 0.0) + idf * (f * k1p1 / (denom or 1.0))
+
+            # Top-k pakai heap; skor sama -> slot yang lebih awal menang.
+            top = heapq.nlargest(
+                max(1, k),
+                ((score, -slot) for slot, score in scores.items() if score > 0),
+            )
+            return [ScoredChunk(chunk=self._slots[-neg_slot], score=score) for score, neg_slot in top]
+
+    def search_many(self, queries: Sequence[str], *, k: int = 4) -> List[List[ScoredChunk]]:
+        """search() untuk banyak query (versi batch yang di-vectorize ada di CompactBM25Index)."""
+        return [self.search(q, k=k) for q in queries]
+
+
+def _text_hashes(chunks: Sequence[Chunk]) -> np.ndarray:
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(c.text.encode("utf-8"), digest_size=8).digest(), "little") for c in chunks],
+        dtype=np.uint64,
+    )
+
+
+class CompactBM25Index:
+    """BM25 dengan storage ringkas berbasis NumPy/SciPy, untuk KB besar.
+
+    Index = matriks sparse term x dokumen `_matrix` (scipy.sparse CSR):
+    kata -> baris (`_vocab`), isinya bobot BM25 per (kata, dokumen) yang
+    sudah dihitung di depan, idf * tf * (k1 + 1) / (tf + norm_dokumen).
+    Skor semua dokumen untuk satu query = satu perkalian sparse
+    `q @ _matrix`, dengan `q` vektor jumlah kemunculan kata query; untuk
+    banyak query sekaligus cukup satu `Q @ _matrix`.
+
+    Array CSR-nya (`_indptr`, `_doc_ids`, `_weights`) disimpan terpisah
+    bersama tf mentah (`_tfs`) supaya bisa di-mmap dari disk dan dipakai
+    `updated()` untuk menghitung ulang bobot. Entri Q mengikuti urutan kata
+    di query, jadi kontribusi dijumlahkan dengan urutan yang sama seperti
+    `BM25Index.search` dan skornya identik sampai bit.
+    """
+
+    # Array yang membentuk index; dipakai juga oleh index_store untuk simpan/load.
+    ARRAYS = ("indptr", "doc_ids", "tfs", "weights", "idf", "norms", "doc_lens", "text_hashes")
+
+    def __init__(self, chunks: Sequence[Chunk], *, k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        self._vocab: Dict[str, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._doc_ids = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float64)
+        self._idf = np.zeros(0, dtype=np.float64)
+        self._norms = np.zeros(0, dtype=np.float64)
+        self._doc_lens = np.zeros(0, dtype=np.int64)
+        self._text_hashes = np.zeros(0, dtype=np.uint64)  # untuk mencocokkan chunk saat update
         self._avg_len: float = 0.0
+        self._matrix = self._csr()
 
         self._build()
 
     def _build(self) -> None:
         n = len(self.chunks)
         if n == 0:
-            self._avg_len = 0.0
             return
 
-        for ch in self.chunks:
+        postings = (array("i"), array("i"), array("i"))  # (term id, dokumen, tf)
+        doc_lens = np.zeros(n, dtype=np.int64)
+        self._count_into(postings, doc_lens, enumerate(self.chunks))
+        self._text_hashes = _text_hashes(self.chunks)
+        self._assemble(*(np.frombuffer(p, dtype=np.int32) for p in postings), doc_lens)
+
+    def _count_into(self, postings, doc_lens: np.ndarray, docs: Iterable[Tuple[int, Chunk]]) -> None:
+        """Tokenize `docs` ((idx, chunk)) dan tambahkan (term id, idx, tf) ke `postings`."""
+        term_ids, doc_ids, tfs = postings
+        vocab = self._vocab
+        for idx, ch in docs:
             toks = _tokenize(ch.text)
-            self._doc_tokens.append(toks)
             tf: Dict[str, int] = {}
             for t in toks:
                 tf[t] = tf.get(t, 0) + 1
-            self._tf.append(tf)
-            self._doc_lens.append(len(toks))
-
-            for t in tf.keys():
-                self._df[t] = self._df.get(t, 0) + 1
+            doc_lens[idx] = len(toks)
+            for t, f in tf.items():
+                tid = vocab.get(t)
+                if tid is None:
+                    tid = vocab[t] = len(vocab)
+                term_ids.append(tid)
+                doc_ids.append(idx)
+                tfs.append(f)
 
-        self._avg_len = sum(self._doc_lens) / max(1, n)
+    def _assemble(self, term_ids: np.ndarray, doc_ids: np.ndarray, tfs: np.ndarray, doc_lens: np.ndarray) -> None:
+        """Susun CSR + statistik BM25 dari daftar posting (urutan bebas)."""
+        n = len(self.chunks)
+        # Urut term, lalu dokumen: di dalam satu term, dokumen urut naik. Sort stabil (timsort)
+        # cepat untuk update, karena posting lama sudah hampir urut.
+        order = np.argsort(term_ids.astype(np.int64) * max(1, n) + doc_ids, kind="stable")
+        self._doc_ids = np.ascontiguousarray(doc_ids[order], dtype=np.int32)
+        self._tfs = np.ascontiguousarray(tfs[order], dtype=np.int32)
+        df = np.bincount(term_ids, minlength=len(self._vocab))
+        self._indptr = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+        self._doc_lens = doc_lens
 
+        self._avg_len = float(doc_lens.sum()) / max(1, n)
+        avg = self._avg_len or 1.0
+        self._norms = self.k1 * (1 - self.b + self.b * (doc_lens / avg))
         # IDF BM25 klasik
-        for t, df in self._df.items():
-            self._idf[t] = math.log((n - df + 0.5) / (df + 0.5) + 1.0)
+        self._idf = np.log((n - df + 0.5) / (df + 0.5) + 1.0)
+        f = self._tfs
+        self._weights = np.repeat(self._idf, df) * (f * (self.k1 + 1) / (f + self._norms[self._doc_ids]))
+        self._matrix = self._csr()
+
+    def _csr(self) -> "sparse.csr_matrix":
+        """Matriks term x dokumen di atas array yang sudah ada (tanpa copy, aman untuk mmap)."""
+        from scipy import sparse
+
+        return sparse.csr_matrix(
+            (self._weights, self._doc_ids, self._indptr),
+            shape=(len(self._indptr) - 1, len(self.chunks)),
+            copy=False,
+        )
+
+    def updated(self, chunks: Sequence[Chunk], *, text_hashes: Optional[np.ndarray] = None) -> "CompactBM25Index":
+        """Index baru untuk `chunks` (KB versi baru), tanpa mengubah index ini.
+
+        Chunk yang teksnya sama dengan chunk lama tidak di-tokenize ulang:
+        posting-nya diambil dari CSR lama dan hanya dipetakan ke posisi baru.
+        Hanya chunk baru/berubah yang di-tokenize, lalu df/idf dan
+        normalisasi panjang dihitung ulang secara vektor. Hasilnya sama
+        dengan build penuh dari `chunks`. `text_hashes` boleh diisi kalau
+        hash teks `chunks` sudah diketahui.
+        """
+        new = type(self).__new__(type(self))
+        new.chunks = chunks
+        new.k1 = self.k1
+        new.b = self.b
+        new._vocab = dict(self._vocab)
+
+        # Cocokkan chunk lewat hash teks (tanpa decode teks lama dari mmap).
+        old_by_hash: Dict[int, List[int]] = {}
+        for i, h in reversed(list(enumerate(self._text_hashes.tolist()))):
+            old_by_hash.setdefault(h, []).append(i)
+        new._text_hashes = _text_hashes(chunks) if text_hashes is None else np.asarray(text_hashes, dtype=np.uint64)
+        old_to_new = np.full(len(self.chunks), -1, dtype=np.int64)
+        added: List[Tuple[int, Chunk]] = []
+        for idx, h in enumerate(new._text_hashes.tolist()):
+            same = old_by_hash.get(h)
+            if same:
+                old_to_new[same.pop()] = idx
+            else:
+                added.append((idx, chunks[idx]))
+
+        doc_lens = np.zeros(len(chunks), dtype=np.int64)
+        kept = np.flatnonzero(old_to_new >= 0)
+        doc_lens[old_to_new[kept]] = self._doc_lens[kept]
+
+        # Posting lama yang chunk-nya masih ada.
+        term_of = np.repeat(np.arange(len(self._indptr) - 1, dtype=np.int32), np.diff(self._indptr))
+        mapped = old_to_new[self._doc_ids]
+        keep = mapped >= 0
+
+        postings = (array("i"), array("i"), array("i"))
+        new._count_into(postings, doc_lens, added)
+        new_terms, new_docs, new_tfs = (np.frombuffer(p, dtype=np.int32) for p in postings)
+        new._assemble(
+            np.concatenate((term_of[keep], new_terms)),
+            np.concatenate((mapped[keep].astype(np.int32), new_docs)),
+            np.concatenate((np.asarray(self._tfs)[keep], new_tfs)),
+            doc_lens,
+        )
+        return new
+
+    def with_documents(
+        self,
+        docs: Dict[str, Sequence[Chunk]],
+        *,
+        order: Optional[Sequence[str]] = None,
+    ) -> "CompactBM25Index":
+        """Index baru dengan chunk dokumen di `docs` diganti (list kosong = hapus dokumen).
+
+        CSR tidak bisa diubah di tempat, jadi ini lewat `updated()`: yang
+        di-tokenize dan di-hash hanya chunk di `docs`, sisanya vektor NumPy
+        atas posting lama. `order`: urutan dokumen (default: urutan lama,
+        dokumen baru di belakang).
+        """
+        old_chunks = list(self.chunks)
+        positions: Dict[str, List[int]] = {}
+        for i, ch in enumerate(old_chunks):
+            positions.setdefault(chunk_doc_id(ch.id), []).append(i)
+
+        doc_order = list(order) if order is not None else list(positions)
+        seen = set(doc_order)
+        doc_order += [d for d in positions if d not in seen]
+        seen.update(positions)
+        doc_order += [d for d in docs if d not in seen]
+
+        chunks: List[Chunk] = []
+        hashes: List[np.ndarray] = []
+        for doc_id in doc_order:
+            if doc_id in docs:
+                new = list(docs[doc_id])
+                chunks.extend(new)
+                hashes.append(_text_hashes(new))
+            else:
+                pos = positions.get(doc_id, [])
+                chunks.extend(old_chunks[p] for p in pos)
+                hashes.append(self._text_hashes[pos])
+        return self.updated(chunks, text_hashes=np.concatenate(hashes) if hashes else None)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        chunks: Sequence[Chunk],
+        vocab: Dict[str, int],
+        arrays: Dict[str, np.ndarray],
+        *,
+        avg_len: float,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> "CompactBM25Index":
+        """Index dari array yang sudah jadi (mis. hasil np.load mmap), tanpa `_build`."""
+        self = cls.__new__(cls)
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._vocab = vocab
+        for name in cls.ARRAYS:
+            setattr(self, f"_{name}", arrays[name])
+        self._avg_len = float(avg_len)
+        self._matrix = self._csr()
+        return self
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, f"_{name}") for name in self.ARRAYS}
+
+    def nbytes(self) -> int:
+        """Perkiraan memori array index (tanpa teks chunk dan dict vocab)."""
+        return sum(a.nbytes for a in (self._indptr, self._doc_ids, self._tfs, self._weights, self._idf, self._norms))
 
     def search(self, query: str, *, k: int = 4) -> List[ScoredChunk]:
-        if not query or not self.chunks:
-            return []
+        return self.search_many([query], k=k)[0]
 
-        q_toks = _tokenize(query)
-        if not q_toks:
-            return []
+    def search_many(self, queries: Sequence[str], *, k: int = 4) -> List[List[ScoredChunk]]:
+        """search() untuk banyak query sekaligus: satu perkalian sparse Q @ M.
 
-        # hitung skor untuk tiap dokumen
-        results: List[ScoredChunk] = []
-        for idx, ch in enumerate(self.chunks):
-            score = self._score_doc(idx, q_toks)
-            if score > 0:
-                results.append(ScoredChunk(chunk=ch, score=score))
+        Q = matriks query x term (jumlah kemunculan tiap kata query). Hasilnya
+        matriks sparse query x dokumen yang hanya memuat dokumen tersentuh
+        postings query, jadi biaya per query sebanding jumlah postings, bukan
+        jumlah chunk. Tiap baris dihitung sama seperti search() satu query.
+        """
+        from scipy import sparse
 
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[: max(1, k)]
+        if not self.chunks:
+            return [[] for _ in queries]
 
-    def _score_doc(self, doc_idx: int, q_toks: List[str]) -> float:
-        tf = self._tf[doc_idx]
-        dl = self._doc_lens[doc_idx]
-        avg = self._avg_len or 1.0
+        term_lists = [[self._vocab[t] for t in _tokenize(q) if t in self._vocab] if q else [] for q in queries]
+        q_indptr = np.zeros(len(term_lists) + 1, dtype=np.int64)
+        np.cumsum([len(tids) for tids in term_lists], out=q_indptr[1:])
+        terms = np.fromiter(chain.from_iterable(term_lists), dtype=np.int32, count=int(q_indptr[-1]))
+        # Kata yang muncul dua kali di query = dua entri di baris yang sama (dijumlahkan saat perkalian).
+        q = sparse.csr_matrix(
+            (np.ones(terms.size), terms, q_indptr),
+            shape=(len(term_lists), self._matrix.shape[0]),
+        )
+
+        scores = q @ self._matrix
+        ptr = scores.indptr
+        return [
+            self._select(scores.indices[ptr[i]:ptr[i + 1]], scores.data[ptr[i]:ptr[i + 1]], k)
+            for i in range(len(term_lists))
+        ]
+
+    def _select(self, cand: np.ndarray, vals: np.ndarray, k: int) -> List[ScoredChunk]:
+        """Top-k dari kandidat (id dokumen, skor); kandidat dengan skor <= 0 diabaikan."""
+        pos = vals > 0
+        if not pos.all():
+            cand, vals = cand[pos], vals[pos]
+        k = max(1, k)
+        if cand.size > k:
+            kth = np.partition(vals, -k)[-k]
+            keep = vals >= kth
+            cand, vals = cand[keep], vals[keep]
+        # Skor sama -> dokumen yang lebih awal menang (sama dengan BM25Index).
+        order = np.lexsort((cand, -vals))[:k]
+        return [ScoredChunk(chunk=self.chunks[int(cand[i])], score=float(vals[i])) for i in order]
+
+
+INDEX_BACKENDS = {
+    "bm25": BM25Index,
+    "compact": CompactBM25Index,
+}
 
-        score = 0.0
-        for t in q_toks:
-            if t not in tf:
-                continue
-            f = tf[t]
-            idf = self._idf.get(t, 0.0)
-            denom = f + self.k1 * (1 - self.b + self.b * (dl / avg))
-            score += idf * (f * (self.k1 + 1) / (denom or 1.0))
-        return score
+# Index hasil build_index: keduanya punya chunks, search() dan search_many().
+SearchIndex = Union[BM25Index, CompactBM25Index]
 
 
-def build_index(chunks: List[Chunk]) -> BM25Index:
-    return BM25Index(chunks)
\ No newline at end of file
+def build_index(chunks: List[Chunk], *, backend: str = "bm25", k1: float = 1.5, b: float = 0.75) -> SearchIndex:
+    """Buat index BM25. `backend`: "bm25" (dict Python) atau "compact" (CSR NumPy)."""
+    try:
+        cls = INDEX_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Backend index tidak dikenal: {backend} (pilih {', '.join(INDEX_BACKENDS)})")
+    return cls(chunks, k1=k1, b=b)
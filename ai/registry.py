@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+from .model_holder import STATE_IDLE, ModelHolder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERSION = "default"
+ACTIVE_FILE = "ACTIVE"
+_MODEL_FILES = ("model.keras", "model_pantai.keras", "model.h5", "model_pantai.h5")
+
+
+def read_class_names(path: str, fallback: List[str]) -> List[str]:
+    """Baca class_names.json (list string); pakai `fallback` kalau tidak ada / rusak."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            names = json.load(f)
+    except (OSError, ValueError):
+        return list(fallback)
+    if not isinstance(names, list) or not names or not all(isinstance(n, str) for n in names):
+        return list(fallback)
+    return names
+
+
+def _is_version_name(version: str) -> bool:
+    """Nama versi = nama satu subfolder models_dir (tanpa separator path, bukan "." / "..")."""
+    if not version or version in (".", ".."):
+        return False
+    return "/" not in version and "\\" not in version
+
+
+class ModelRegistry:
+    """Daftar versi model classifier + model yang sedang aktif.
+
+    Versi model:
+    - "default": `ai/model_pantai.keras` + `ai/class_names.json` (layout lama).
+    - `<models_dir>/<versi>/`: berisi `model.keras` (atau `model_pantai.keras`
+      / `.h5`) dan `class_names.json`.
+
+    `activate()` load + warm-up versi baru di background, baru setelah siap
+    model aktif ditukar (satu assignment, atomik). Request yang sedang jalan
+    tetap memakai ModelHolder yang sudah dia pegang sampai selesai, jadi tidak
+    ada request yang tercampur dua model. Versi sebelumnya tetap di memori
+    supaya `rollback()` instan.
+
+    Versi aktif juga ditulis ke `<models_dir>/ACTIVE`; worker lain (proses
+    gunicorn lain di host yang sama) mengecek file itu tiap `poll_seconds`
+    dan ikut pindah versi di background.
+    """
+
+    def __init__(
+        self,
+        *,
+        models_dir: str,
+        default_model_path: str,
+        default_class_names: List[str],
+        input_shape=(224, 224, 3),
+        initial_version: str = "",
+        poll_seconds: float = 5.0,
+        holder_options: Optional[dict] = None,
+    ):
+        self.models_dir = models_dir
+        self.default_model_path = default_model_path
+        self.default_class_names = list(default_class_names)
+        self.input_shape = tuple(input_shape)
+        self.initial_version = initial_version
+        self.poll_seconds = float(poll_seconds)
+        # Opsi tambahan ModelHolder (backend, setting TFLite, ...).
+        self.holder_options = dict(holder_options or {})
+
+        self._lock = threading.Lock()
+        self._active: Optional[ModelHolder] = None
+        self._previous: Optional[ModelHolder] = None
+        self._activating: Optional[str] = None
+        self._activate_error: Optional[str] = None
+        self._last_poll = 0.0
+        self._active_file_mtime: Optional[float] = None
+
+    # --- daftar versi ---
+
+    def _version_dir(self, version: str) -> str:
+        return os.path.join(self.models_dir, version)
+
+    def _model_file(self, version: str) -> Optional[str]:
+        if version == DEFAULT_VERSION:
+            return self.default_model_path
+        if not _is_version_name(version):
+            # Nama versi datang dari URL / file ACTIVE: jangan sampai keluar dari models_dir ("..").
+            return None
+        folder = self._version_dir(version)
+        for name in _MODEL_FILES:
+            path = os.path.join(folder, name)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def versions(self) -> List[str]:
+        out = [DEFAULT_VERSION]
+        if os.path.isdir(self.models_dir):
+            for name in sorted(os.listdir(self.models_dir)):
+                if name != DEFAULT_VERSION and self._model_file(name):
+                    out.append(name)
+        return out
+
+    def build_holder(self, version: str) -> ModelHolder:
+        model_path = self._model_file(version)
+        if not model_path:
+            raise ValueError(f"Versi model tidak ditemukan: {version}")
+        if version == DEFAULT_VERSION:
+            names_path = os.path.join(os.path.dirname(model_path), "class_names.json")
+            # Versi default tetap pakai nama file sebagai prefix versi (kompatibel dengan cache lama).
+            name = ""
+        else:
+            names_path = os.path.join(self._version_dir(version), "class_names.json")
+            name = version
+        class_names = read_class_names(names_path, self.default_class_names)
+        return ModelHolder(
+            model_path,
+            class_names=class_names,
+            name=name,
+            registry_version=version,
+            input_shape=self.input_shape,
+            **self.holder_options,
+        )
+
+    # --- model aktif ---
+
+    def active(self) -> ModelHolder:
+        """ModelHolder yang sedang aktif. Caller sebaiknya memegang hasilnya
+        selama satu request/batch supaya konsisten walau ada swap."""
+        self._maybe_poll()
+        holder = self._active
+        if holder is not None:
+            return holder
+        with self._lock:
+            if self._active is None:
+                self._active = self.build_holder(self._initial_version())
+                # Yang memicu swap hanya perubahan file ACTIVE setelah ini.
+                try:
+                    self._active_file_mtime = os.path.getmtime(self._active_path())
+                except OSError:
+                    pass
+            return self._active
+
+    def after_fork(self) -> List[str]:
+        """Dipanggil di proses anak setelah fork: buang model yang tidak aman
+        dibagi (selain TFLite) supaya di-load ulang di proses ini. Hasil: versi
+        yang dibuang."""
+        self._lock = threading.Lock()
+        self._activating = None
+        discarded = []
+        for holder in (self._active, self._previous):
+            if holder is not None and holder.state != STATE_IDLE and not holder.fork_safe:
+                holder.discard()
+                discarded.append(holder.registry_version)
+        return discarded
+
+    def _initial_version(self) -> str:
+        # Urutan: config (AI_MODEL_VERSION) > file ACTIVE > "default".
+        version = self.initial_version or self._read_active_file() or DEFAULT_VERSION
+        if version not in self.versions():
+            logger.warning("Versi model %s tidak ada, pakai %s", version, DEFAULT_VERSION)
+            return DEFAULT_VERSION
+        return version
+
+    def activate(self, version: str, *, background: bool = True, persist: bool = True):
+        """Load + warm-up `version`, lalu jadikan aktif. Return thread kalau background."""
+        holder = self.build_holder(version)  # validasi versi sebelum mulai
+        with self._lock:
+            if self._activating == version:
+                return None
+            self._activating = version
+            self._activate_error = None
+
+        def _run():
+            try:
+                holder.warmup(background=False)
+            except Exception as e:
+                logger.error("Gagal aktivasi model %s: %s", version, e)
+                with self._lock:
+                    self._activate_error = str(e)
+                    self._activating = None
+                return
+            self._swap(holder)
+            if persist:
+                self._write_active_file(version)
+
+        if not background:
+            _run()
+            if self._activate_error:
+                raise RuntimeError(self._activate_error)
+            return None
+
+        t = threading.Thread(target=_run, name=f"model-activate-{version}", daemon=True)
+        t.start()
+        return t
+
+    def rollback(self, *, persist: bool = True) -> str:
+        """Kembali ke versi sebelumnya (masih di memori, jadi instan)."""
+        with self._lock:
+            prev = self._previous
+            if prev is None:
+                raise ValueError("Tidak ada versi sebelumnya untuk rollback")
+            self._previous = self._active
+            self._active = prev
+        version = prev.registry_version
+        if persist:
+            self._write_active_file(version)
+        logger.info("Rollback model ke %s", version)
+        return version
+
+    def _swap(self, holder: ModelHolder) -> None:
+        with self._lock:
+            if self._active is not holder:
+                self._previous = self._active
+                self._active = holder
+            self._activating = None
+        logger.info("Model aktif sekarang %s (%s)", holder.registry_version, holder.version)
+
+    # --- sinkronisasi antar proses lewat file ACTIVE ---
+
+    def _active_path(self) -> str:
+        return os.path.join(self.models_dir, ACTIVE_FILE)
+
+    def _read_active_file(self) -> Optional[str]:
+        try:
+            with open(self._active_path(), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _write_active_file(self, version: str) -> None:
+        try:
+            os.makedirs(self.models_dir, exist_ok=True)
+            tmp = self._active_path() + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(version)
+            os.replace(tmp, self._active_path())
+            self._active_file_mtime = os.path.getmtime(self._active_path())
+        except OSError as e:
+            logger.warning("Gagal menulis %s: %s", self._active_path(), e)
+
+    def _maybe_poll(self) -> None:
+        if self.poll_seconds <= 0 or self._active is None:
+            return
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_seconds:
+            return
+        self._last_poll = now
+        try:
+            mtime = os.path.getmtime(self._active_path())
+        except OSError:
+            return
+        if mtime == self._active_file_mtime:
+            return
+        self._active_file_mtime = mtime
+        version = self._read_active_file()
+        current = self._active.registry_version
+        if not version or version == current:
+            return
+        try:
+            self.activate(version, background=True, persist=False)
+        except ValueError as e:
+            logger.warning("Versi di %s tidak valid: %s", self._active_path(), e)
+
+    def status(self) -> dict:
+        active = self._active
+        prev = self._previous
+        return {
+            "active": active.registry_version if active is not None else None,
+            "previous": prev.registry_version if prev is not None else None,
+            "activating": self._activating,
+            "activate_error": self._activate_error,
+            "versions": self.versions(),
+        }
@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUANT_MODES = ("float16", "dynamic", "int8")
+
+
+def _interpreter_class():
+    """Interpreter TFLite yang paling ringan yang tersedia."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+def convert_keras_to_tflite(
+    keras_model,
+    out_path: str,
+    *,
+    quant: str = "float16",
+    representative: Optional[Callable[[], Iterable[np.ndarray]]] = None,
+) -> str:
+    """Konversi model Keras ke .tflite (sekali saja, hasilnya disimpan di `out_path`).
+
+    quant:
+    - "float16": bobot float16, aktivasi float32 (akurasi hampir sama persis).
+    - "dynamic": bobot int8 (dynamic range), aktivasi float32.
+    - "int8"   : bobot + aktivasi int8, kalibrasi pakai `representative`
+                 (generator array (1, 224, 224, 3)); input/output tetap float32.
+    """
+    import tensorflow as tf
+
+    if quant not in QUANT_MODES:
+        raise ValueError(f"Mode kuantisasi tidak dikenal: {quant} (pilih {', '.join(QUANT_MODES)})")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quant == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quant == "int8":
+        if representative is None:
+            raise ValueError("Kuantisasi int8 butuh representative dataset")
+        converter.representative_dataset = lambda: ([x] for x in representative())
+
+    data = converter.convert()
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class TFLiteModel:
+    """Interpreter TFLite dengan API `predict_on_batch` seperti model Keras.
+
+    Ukuran batch dari MicroBatcher berubah-ubah, sedangkan resize input +
+    `allocate_tensors()` mahal kalau dilakukan tiap batch. Jadi tiap ukuran
+    batch (1..`max_batch_size`) punya interpreter sendiri, dibuat + dialokasikan
+    sekali saat ukuran itu pertama dipakai. Batch yang lebih besar dari
+    `max_batch_size` dipecah.
+
+    Interpreter tidak thread-safe, jadi inferensi dikunci; konkurensi sudah
+    ditangani MicroBatcher (satu forward pass per batch).
+    """
+
+    def __init__(self, tflite_path: str, *, num_threads: int = 0, max_batch_size: int = 1):
+        self.path = tflite_path
+        self.num_threads = int(num_threads)
+        self.max_batch_size = max(1, int(max_batch_size))
+        self._interps: Dict[int, object] = {}
+        self._lock = threading.Lock()
+        first = self._interpreter(1)
+        self._input = first.get_input_details()[0]
+        self._output = first.get_output_details()[0]
+
+    def _interpreter(self, batch_size: int):
+        """Interpreter untuk `batch_size` (dibuat sekali). Panggil dengan _lock, kecuali dari __init__."""
+        interp = self._interps.get(batch_size)
+        if interp is None:
+            kwargs = {"model_path": self.path}
+            if self.num_threads > 0:
+                kwargs["num_threads"] = self.num_threads
+            interp = _interpreter_class()(**kwargs)
+            inp = interp.get_input_details()[0]
+            if int(inp["shape"][0]) != batch_size:
+                interp.resize_tensor_input(inp["index"], [batch_size] + list(inp["shape"][1:]))
+            interp.allocate_tensors()
+            self._interps[batch_size] = interp
+        return interp
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.float32)
+        n = batch.shape[0]
+        if n > self.max_batch_size:
+            step = self.max_batch_size
+            return np.concatenate([self.predict_on_batch(batch[i:i + step]) for i in range(0, n, step)])
+
+        with self._lock:
+            interp = self._interpreter(n)
+            interp.set_tensor(self._input["index"], batch)
+            interp.invoke()
+            # copy: buffer output interpreter dipakai ulang di invoke berikutnya
+            return np.array(interp.get_tensor(self._output["index"]))
+
+
+def representative_images(folder: str, size, *, limit: int = 100) -> Iterable[np.ndarray]:
+    """Sampel foto untuk kalibrasi int8 (array (1, H, W, 3) float32)."""
+    from .preprocess import image_bytes_to_array
+
+    names = sorted(os.listdir(folder)) if folder and os.path.isdir(folder) else []
+    count = 0
+    for name in names:
+        if count >= limit:
+            break
+        if not name.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+            continue
+        try:
+            with open(os.path.join(folder, name), "rb") as f:
+                arr = image_bytes_to_array(f.read(), size)
+        except (OSError, ValueError):
+            continue
+        count += 1
+        yield arr[None]
+    if count == 0:
+        # Tanpa foto contoh, kalibrasi pakai noise (akurasi int8 bisa turun).
+        rng = np.random.default_rng(0)
+        for _ in range(16):
+            yield rng.uniform(0, 255, (1, size[1], size[0], 3)).astype(np.float32)
+
+
+def tflite_path_for(version: str, out_dir: str) -> str:
+    """Path file .tflite untuk satu versi model (versi sudah memuat mode kuantisasi)."""
+    return os.path.join(out_dir, f"{version}.tflite")
+
+
+def load_tflite_model(
+    keras_loader: Callable[[], object],
+    tflite_path: str,
+    *,
+    quant: str = "float16",
+    num_threads: int = 0,
+    max_batch_size: int = 1,
+    representative: Optional[Callable[[], Iterable[np.ndarray]]] = None,
+) -> TFLiteModel:
+    """Load .tflite; kalau belum ada, konversi dulu dari model Keras."""
+    if not os.path.isfile(tflite_path):
+        logger.info("Konversi model ke TFLite (%s): %s", quant, tflite_path)
+        convert_keras_to_tflite(keras_loader(), tflite_path, quant=quant, representative=representative)
+    return TFLiteModel(tflite_path, num_threads=num_threads, max_batch_size=max_batch_size)
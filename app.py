@@ -10,7 +10,13 @@ from routes.chat import chat_bp
 from routes.auth import auth_bp
 from routes.berita import berita_bp
 from routes.ulasan import ulasan_bp
+from routes.ai import ai_bp
+from ai.predict import warmup
+from ai.jobs import classification_queue
+from ai.cache import prediction_cache
 from flask_cors import CORS
+from preload import preload, worker_start
+import commands
 import os
 
 app = Flask(__name__)
@@ -27,6 +33,9 @@ os.makedirs(app.config["PROFILE_UPLOAD_FOLDER"], exist_ok=True)
 
 db.init_app(app)
 jwt.init_app(app)
+prediction_cache.init_app(app)
+classification_queue.init_app(app)
+commands.init_app(app)
 
 app.register_blueprint(auth_bp, url_prefix='/api')
 app.register_blueprint(laporan_bp, url_prefix='/api')
@@ -34,9 +43,18 @@ app.register_blueprint(admin_bp, url_prefix='/api')
 app.register_blueprint(chat_bp, url_prefix='/api')
 app.register_blueprint(user_bp, url_prefix="/api")
 app.register_blueprint(ulasan_bp, url_prefix="/api")
+app.register_blueprint(ai_bp, url_prefix="/api")
 
 app.register_blueprint(admin_web_bp)
 
+# Mode preload (gunicorn --preload): index RAG + model dibangun sekali di master sebelum
+# fork dan dibagi copy-on-write ke worker. Jangan start thread warm-up di master.
+if app.config.get("APP_PRELOAD"):
+    preload(app)
+# Load model classifier di background: request pertama tidak perlu nunggu TensorFlow.
+elif app.config.get("AI_WARMUP"):
+    warmup(background=True)
+
 @app.route('/uploads/laporan/<filename>')
 def uploaded_file(filename):
     return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
@@ -46,4 +64,7 @@ def uploaded_profile(filename):
     return send_from_directory(current_app.config['PROFILE_UPLOAD_FOLDER'], filename)
 
 if __name__ == '__main__':
+    # Server dev (debug): app dilayani proses anak reloader, job dipulihkan di sana.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        worker_start(app)
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,111 @@
+"""Helper kecil yang dipakai bersama oleh script benchmark."""
+
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Dict, List, Sequence
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Percentile (nearest-rank) tanpa numpy, p di rentang 0-100."""
+    if not values:
+        return 0.0
+    xs = sorted(values)
+    rank = max(1, int(round(p / 100.0 * len(xs) + 0.5)))
+    return xs[min(rank, len(xs)) - 1]
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    ms = [s * 1000.0 for s in seconds]
+    return {
+        "n": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS proses ini.
+
+    Di Linux dibaca dari VmHWM (/proc/self/status), karena ru_maxrss ikut
+    terbawa dari proses parent lewat fork+exec dan bisa menyesatkan.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def current_rss_mb() -> float:
+    """RSS proses ini saat ini (Linux, dari /proc); 0 kalau tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0.0
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def write_results(name: str, payload: dict, *, out_path: str = "") -> str:
+    """Simpan hasil benchmark sebagai JSON (default: benchmarks/results/<name>-<ts>.json)."""
+    if not out_path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        out_path = os.path.join(RESULTS_DIR, f"{name}-{stamp}.json")
+
+    doc = {
+        "benchmark": name,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": payload,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+    return out_path
+
+
+def synthetic_jpeg(size: str, path: str, *, quality: int = 90) -> None:
+    """Tulis JPEG sintetis ukuran `size` ("WxH"): gradasi + noise ringan, biar mirip foto."""
+    import numpy as np
+    from PIL import Image
+
+    w, h = (int(x) for x in size.lower().split("x"))
+    rng = np.random.default_rng(0)
+    xx = (np.arange(w, dtype=np.uint16) * 255 // w).astype(np.uint8)
+    yy = (np.arange(h, dtype=np.uint16) * 255 // h).astype(np.uint8)
+    arr = np.empty((h, w, 3), dtype=np.uint8)
+    arr[..., 0] = xx[None, :]
+    arr[..., 1] = yy[:, None]
+    arr[..., 2] = (xx[None, :] // 2) + (yy[:, None] // 2)
+    arr += rng.integers(0, 24, size=(h, w, 1), dtype=np.uint8)
+    Image.fromarray(arr, "RGB").save(path, format="JPEG", quality=quality)
+
+
+def list_images(folder: str, *, limit: int = 0) -> List[str]:
+    exts = (".jpg", ".jpeg", ".png", ".webp")
+    if not os.path.isdir(folder):
+        return []
+    files = sorted(
+        os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(exts)
+    )
+    return files[:limit] if limit else files
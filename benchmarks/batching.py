@@ -0,0 +1,103 @@
+"""Benchmark micro-batching vs inferensi per gambar di bawah beban konkuren.
+
+Beberapa thread (mensimulasikan worker request) masing-masing mengirim
+gambar secara berurutan. Preprocessing dilakukan sekali di awal, jadi yang
+diukur murni jalur inferensi:
+
+- single : `model.predict` batch 1 per gambar (jalur lama).
+- batched: `MicroBatcher` dengan ukuran batch / waktu tunggu yang diatur.
+
+Contoh:
+    python -m benchmarks.batching --threads 8 --requests 20 --batch-sizes 4,8,16 --wait-ms 2,5
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from benchmarks._common import BASE_DIR, latency_summary, list_images, write_results
+
+
+def _inputs(n: int):
+    from ai.predict import load_image_array
+
+    files = list_images(f"{BASE_DIR}/uploads/laporan", limit=n)
+    arrays = [load_image_array(p) for p in files]
+    rng = np.random.default_rng(0)
+    while len(arrays) < n:
+        arrays.append(rng.uniform(0, 255, (224, 224, 3)).astype(np.float32))
+    return arrays
+
+
+def _run(fn, inputs, *, threads: int, requests: int) -> dict:
+    latencies = []
+    lat_lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+
+    def worker(tid: int):
+        local = []
+        start.wait()
+        for i in range(requests):
+            x = inputs[(tid * requests + i) % len(inputs)]
+            t0 = time.perf_counter()
+            fn(x)
+            local.append(time.perf_counter() - t0)
+        with lat_lock:
+            latencies.extend(local)
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in ts:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    out = latency_summary(latencies)
+    out["throughput_img_s"] = round(len(latencies) / wall, 2) if wall else 0.0
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=20, help="request per thread")
+    ap.add_argument("--batch-sizes", default="4,8,16")
+    ap.add_argument("--wait-ms", default="2,5,10")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.batching import MicroBatcher
+    from ai.predict import get_model, predict_batch
+
+    model = get_model()
+    inputs = _inputs(32)
+    # Warm-up dua jalur biar tracing tidak ikut terukur.
+    model.predict(inputs[0][None], verbose=0)
+    predict_batch(np.stack(inputs[:4]))
+
+    results = {"threads": args.threads, "requests_per_thread": args.requests}
+    results["single"] = _run(
+        lambda x: model.predict(x[None], verbose=0)[0], inputs,
+        threads=args.threads, requests=args.requests,
+    )
+    print(f"single           {results['single']}")
+
+    for bs in [int(x) for x in args.batch_sizes.split(",") if x.strip()]:
+        for wait in [float(x) for x in args.wait_ms.split(",") if x.strip()]:
+            batcher = MicroBatcher(predict_batch, max_batch_size=bs, max_wait_ms=wait)
+            res = _run(batcher.predict, inputs, threads=args.threads, requests=args.requests)
+            res["avg_batch_size"] = batcher.stats()["avg_batch_size"]
+            key = f"batched_b{bs}_w{wait:g}"
+            results[key] = res
+            print(f"{key:16s} {res}")
+
+    path = write_results("batching", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark deteksi intent + nama pantai per pertanyaan saat gazetteer membesar.
+
+- legacy : cara lama: dict alias dibuat ulang tiap panggilan, cek substring
+           satu per satu, lalu tiga regex intent dicoba berurutan (plus
+           q.lower() berulang untuk kata kunci tambahan).
+- matcher: QueryMatcher (ai/rag/intents.py), satu scan per pertanyaan.
+
+Gazetteer bawaan ditambah pantai sintetis sampai --sizes entry pantai
+(alias satu dan dua kata), lalu pertanyaan acak (kata umum + sesekali alias)
+dijalankan ke dua cara tersebut.
+
+Contoh:
+    python -m benchmarks.chat_intents --sizes 9,100,500,2000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from benchmarks._common import latency_summary, write_results
+
+_WORDS = (
+    "apa itu ecosea sampah plastik di pantai numpuk kenapa bahaya wisata liburan rekomendasi "
+    "lapor foto lokasi muara rob tegal pantura aku mau ke yang bagus dong ya sekarang"
+).split()
+
+
+def _gazetteer(n_beaches: int) -> dict:
+    from ai.rag.intents import load_gazetteer
+
+    base = load_gazetteer()
+    extra = [
+        {"name": f"Pantai Lokal {i}", "aliases": [f"lokal{i}", f"pantai lokal{i}"]}
+        for i in range(max(0, n_beaches - len(base["beaches"])))
+    ]
+    return dict(base, beaches=base["beaches"] + extra)
+
+
+class _Legacy:
+    """Cara lama, dengan dict alias dari gazetteer yang sama."""
+
+    def __init__(self, gazetteer: dict):
+        def alt(words):
+            return "|".join(r"\s?".join(map(re.escape, w.split())) for w in words)
+
+        intents = gazetteer["intents"]
+        self.quick = re.compile(rf"\b({alt(intents['quick'])})\b", re.I)
+        self.why = re.compile(rf"\b({alt(intents['why'])})\b", re.I)
+        self.travel = re.compile(rf"\b({alt(intents['travel'])})\b", re.I)
+        self.items = [(a, b["name"]) for b in gazetteer["beaches"] for a in b["aliases"]]
+
+    def match(self, q: str):
+        ql = q.lower()
+        mapping = dict(self.items)  # dulu dict literal dibuat tiap panggilan
+        beach = next((v for k, v in mapping.items() if k in ql), None)
+        intent = "quick" if self.quick.search(q) else "why" if self.why.search(q) else (
+            "travel" if self.travel.search(q) else None
+        )
+        return beach, intent, "muara" in q.lower() or "rob" in q.lower(), "tegal" in q.lower()
+
+
+def _questions(gazetteer: dict, n: int, seed: int = 0):
+    rng = random.Random(seed)
+    aliases = [a for b in gazetteer["beaches"] for a in b["aliases"]]
+    out = []
+    for _ in range(n):
+        words = rng.choices(_WORDS, k=rng.randint(4, 12))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(aliases))
+        out.append(" ".join(words))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="9,100,500,2000", help="jumlah entry pantai di gazetteer")
+    ap.add_argument("--questions", type=int, default=5000)
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.intents import QueryMatcher
+
+    results = {"questions": args.questions, "sizes": {}}
+    for size in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        gazetteer = _gazetteer(size)
+        questions = _questions(gazetteer, args.questions)
+        t0 = time.perf_counter()
+        matcher = QueryMatcher(gazetteer)
+        build_s = time.perf_counter() - t0
+        row = {"build_ms": round(build_s * 1000, 3)}
+        for name, fn in (("legacy", _Legacy(gazetteer).match), ("matcher", matcher.match)):
+            timings = []
+            for q in questions:
+                t0 = time.perf_counter()
+                fn(q)
+                timings.append(time.perf_counter() - t0)
+            row[name] = latency_summary(timings)
+        results["sizes"][str(size)] = row
+        print(f"{size:5d} pantai  legacy p50 {row['legacy']['p50_ms'] * 1000:8.1f} us  "
+              f"matcher p50 {row['matcher']['p50_ms'] * 1000:8.1f} us  (build {row['build_ms']:.1f} ms)")
+
+    path = write_results("chat_intents", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark ukuran request dan latensi /api/chat: history dikirim client vs disimpan server.
+
+Tiap percakapan berisi --turns pertanyaan berurutan dari satu user:
+- client: cara lama, tiap request membawa seluruh transkrip sebelumnya di
+          field `history` (JSON tetap di-parse server walau tidak dipakai).
+- server: client cukup kirim pesan baru; riwayat diambil dari
+          ConversationStore di server.
+
+Dicatat ukuran body request (byte) dan latensi per request, plus latensi
+giliran terakhir (transkrip paling panjang). App Flask kecil sama dengan
+benchmark chat_stream (blueprint chat + JWT, tanpa database).
+
+Contoh:
+    python -m benchmarks.chat_memory --turns 30 --conversations 20
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+from benchmarks._common import latency_summary, write_results
+from benchmarks.chat_stream import _make_app
+from benchmarks.rag_answer import make_kb
+from benchmarks.rag_search import QUERIES
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, default=10000)
+    ap.add_argument("--turns", type=int, default=30)
+    ap.add_argument("--conversations", type=int, default=20)
+    ap.add_argument("--backend", default="compact")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.conversation import get_conversations
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    folder = tempfile.mkdtemp(prefix="chat-memory-")
+    try:
+        kb = make_kb(folder, args.chunks)
+        engine = EcoSeaRAG(kb_path=kb, index_backend=args.backend, cache_size=0)
+        app, headers = _make_app(engine)
+        client = app.test_client()
+
+        results = {"chunks": args.chunks, "turns": args.turns, "conversations": args.conversations, "modes": {}}
+        for mode in ("client", "server"):
+            timings, last_turn, sizes = [], [], []
+            for _ in range(args.conversations):
+                with app.app_context():
+                    get_conversations().clear()
+                transcript = []
+                for turn in range(args.turns):
+                    message = QUERIES[turn % len(QUERIES)]
+                    body = {"message": message}
+                    if mode == "client":
+                        body["history"] = transcript
+                    raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+                    t0 = time.perf_counter()
+                    res = client.post("/api/chat", data=raw, content_type="application/json", headers=headers)
+                    reply = res.get_json()["reply"]
+                    seconds = time.perf_counter() - t0
+
+                    timings.append(seconds)
+                    sizes.append(len(raw))
+                    if turn == args.turns - 1:
+                        last_turn.append(seconds)
+                    transcript += [{"role": "user", "content": message}, {"role": "assistant", "content": reply}]
+
+            results["modes"][mode] = {
+                "request_bytes_mean": round(sum(sizes) / len(sizes), 1),
+                "request_bytes_last": sizes[-1],
+                "latency": latency_summary(timings),
+                "last_turn": latency_summary(last_turn),
+            }
+            r = results["modes"][mode]
+            print(f"{mode:7s} body rata-rata {r['request_bytes_mean']:9.1f} B  terakhir {r['request_bytes_last']:7d} B  "
+                  f"p50 {r['latency']['p50_ms']:7.3f} ms  giliran terakhir p50 {r['last_turn']['p50_ms']:7.3f} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    path = write_results("chat_memory", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark time-to-first-byte /api/chat/stream (SSE) vs respons penuh /api/chat.
+
+App Flask kecil dibuat dengan blueprint chat + JWT saja (tanpa database), lalu
+tiap pertanyaan di QUERIES dikirim lewat test client:
+- /api/chat       : dicatat waktu sampai body JSON lengkap diterima.
+- /api/chat/stream: dicatat waktu sampai byte pertama (event `contexts`) dan
+                    sampai event `done`.
+
+--delay-ms mensimulasikan generator jawaban yang lebih lambat (mis. LLM):
+tiap potongan jawaban ditunda sekian ms. Cache jawaban dimatikan supaya tiap
+request benar-benar dihitung ulang.
+
+Contoh:
+    python -m benchmarks.chat_stream --chunks 10000 --delay-ms 20
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from benchmarks._common import latency_summary, write_results
+from benchmarks.rag_answer import make_kb
+from benchmarks.rag_search import QUERIES
+
+
+def _make_app(engine):
+    from flask import Flask
+    from flask_jwt_extended import JWTManager, create_access_token
+
+    import ai.rag.rag_engine as rag_engine
+    from routes.chat import chat_bp
+
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "benchmark-" + "x" * 32
+    JWTManager(app)
+    app.register_blueprint(chat_bp, url_prefix="/api")
+    rag_engine._ENGINE = engine
+    with app.app_context():
+        token = create_access_token(identity="1")
+    return app, {"Authorization": f"Bearer {token}"}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--backend", default="compact")
+    ap.add_argument("--delay-ms", type=float, default=0.0, help="jeda per potongan jawaban (simulasi generator lambat)")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    delay = args.delay_ms / 1000.0
+
+    class _SlowRAG(EcoSeaRAG):
+        def _generate_stream(self, *a, **kw):
+            for piece in super()._generate_stream(*a, **kw):
+                if delay:
+                    time.sleep(delay)
+                yield piece
+
+    folder = tempfile.mkdtemp(prefix="chat-stream-")
+    try:
+        kb = make_kb(folder, args.chunks)
+        engine = _SlowRAG(kb_path=kb, index_backend=args.backend, cache_size=0)
+        app, headers = _make_app(engine)
+        client = app.test_client()
+
+        full, first_byte, stream_done = [], [], []
+        for _ in range(args.repeat):
+            for q in QUERIES:
+                body = {"message": q}
+
+                t0 = time.perf_counter()
+                res = client.post("/api/chat", json=body, headers=headers)
+                res.get_data()
+                full.append(time.perf_counter() - t0)
+                assert res.status_code == 200, res.get_data(as_text=True)
+
+                t0 = time.perf_counter()
+                res = client.post("/api/chat/stream", json=body, headers=headers, buffered=False)
+                it = iter(res.response)
+                first = next(it)
+                first_byte.append(time.perf_counter() - t0)
+                rest = b"".join(it)
+                stream_done.append(time.perf_counter() - t0)
+                res.close()
+                assert first.startswith(b"event: contexts") and rest.endswith(b"event: done\ndata: {}\n\n")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    results = {
+        "chunks": args.chunks,
+        "delay_ms": args.delay_ms,
+        "chat_full": latency_summary(full),
+        "stream_first_byte": latency_summary(first_byte),
+        "stream_done": latency_summary(stream_done),
+    }
+    for name in ("chat_full", "stream_first_byte", "stream_done"):
+        s = results[name]
+        print(f"{name:18s} p50 {s['p50_ms']:9.3f} ms  p95 {s['p95_ms']:9.3f} ms")
+    path = write_results("chat_stream", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
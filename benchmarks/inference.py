@@ -0,0 +1,203 @@
+"""Benchmark + cek regresi performa classifier (ai/predict.py).
+
+Yang diukur (satu proses baru, jadi cold start-nya nyata):
+
+- cold_start : import ai.predict + `predict_image` pertama (load model,
+               warm-up graph, decode foto pertama).
+- corpus     : latensi `predict_image` untuk tiap foto di `uploads/laporan`.
+- synthetic  : latensi `predict_image` untuk JPEG sintetis beberapa resolusi
+               (default 640x480, 1920x1080, 4032x3024).
+- batch      : throughput `predict_batch` untuk batch 1 s/d 32.
+- peak_rss_mb: peak memori proses.
+
+Hasil disimpan sebagai JSON. Dengan --compare FILE, hasil dibandingkan dengan
+run sebelumnya; kalau ada metrik yang lebih lambat/boros dari --tolerance,
+exit code 1 (bisa dipakai sebagai gate sebelum deploy).
+
+Contoh:
+    python -m benchmarks.inference --out benchmarks/results/baseline.json
+    python -m benchmarks.inference --compare benchmarks/results/baseline.json
+"""
+
+import time
+
+_T_START = time.perf_counter()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import shutil  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+
+import numpy as np  # noqa: E402
+
+from benchmarks._common import (  # noqa: E402
+    BASE_DIR,
+    latency_summary,
+    list_images,
+    peak_rss_mb,
+    synthetic_jpeg,
+    write_results,
+)
+
+BATCH_SIZES = (1, 2, 4, 8, 16, 32)
+SYNTHETIC_SIZES = "640x480,1920x1080,4032x3024"
+
+
+def _timed(fn, items, repeat: int):
+    out = []
+    for _ in range(max(1, repeat)):
+        for item in items:
+            t0 = time.perf_counter()
+            fn(item)
+            out.append(time.perf_counter() - t0)
+    return out
+
+
+def run(args) -> dict:
+    files = list_images(args.images, limit=args.limit)
+    if not files:
+        raise SystemExit(f"Tidak ada gambar di {args.images}")
+
+    tmpdir = tempfile.mkdtemp(prefix="bench-inference-")
+    try:
+        synth = {}
+        for size in [s.strip() for s in args.synthetic.split(",") if s.strip()]:
+            path = os.path.join(tmpdir, f"synthetic_{size}.jpg")
+            synthetic_jpeg(size, path)
+            synth[size] = path
+
+        t0 = time.perf_counter()
+        from ai.predict import IMG_SIZE, model_status, predict_batch, predict_image
+
+        t_import = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        predict_image(files[0])
+        t_first = time.perf_counter() - t0
+        cold = {
+            "process_s": round(time.perf_counter() - _T_START, 3),
+            "import_s": round(t_import, 3),
+            "first_predict_s": round(t_first, 3),
+        }
+
+        corpus = latency_summary(_timed(predict_image, files, args.repeat))
+        synthetic = {size: latency_summary(_timed(predict_image, [p], args.repeat * 5)) for size, p in synth.items()}
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    from ai.preprocess import image_bytes_to_array
+
+    arrays = []
+    for p in files:
+        with open(p, "rb") as f:
+            arrays.append(image_bytes_to_array(f.read(), IMG_SIZE))
+
+    batch = {}
+    for bs in BATCH_SIZES:
+        x = np.stack([arrays[i % len(arrays)] for i in range(bs)])
+        predict_batch(x)  # alokasi/trace untuk shape ini tidak ikut dihitung
+        n = max(3, args.batch_images // bs)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            predict_batch(x)
+        elapsed = time.perf_counter() - t0
+        batch[str(bs)] = {
+            "images_per_s": round(bs * n / elapsed, 2),
+            "ms_per_batch": round(elapsed / n * 1000.0, 3),
+        }
+
+    status = model_status()
+    return {
+        "model_version": status.get("version"),
+        "backend": status.get("backend"),
+        "images": len(files),
+        "repeat": args.repeat,
+        "cold_start": cold,
+        "corpus": corpus,
+        "synthetic": synthetic,
+        "batch": batch,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _metrics(results: dict) -> dict:
+    """Metrik datar untuk dibandingkan: nama -> (nilai, True kalau makin besar makin baik)."""
+    out = {"cold_start.process_s": (results["cold_start"]["process_s"], False)}
+    for k in ("p50_ms", "p95_ms", "p99_ms"):
+        out[f"corpus.{k}"] = (results["corpus"][k], False)
+    for size, v in results.get("synthetic", {}).items():
+        out[f"synthetic.{size}.p50_ms"] = (v["p50_ms"], False)
+    for bs, v in results.get("batch", {}).items():
+        out[f"batch.{bs}.images_per_s"] = (v["images_per_s"], True)
+    out["peak_rss_mb"] = (results["peak_rss_mb"], False)
+    return out
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> dict:
+    cur = _metrics(current)
+    base = _metrics(baseline)
+    rows = []
+    for name, (value, higher_better) in cur.items():
+        if name not in base or not base[name][0]:
+            continue
+        ref = base[name][0]
+        change = (value - ref) / ref
+        worse = -change if higher_better else change
+        rows.append({
+            "metric": name,
+            "baseline": ref,
+            "current": value,
+            "change_pct": round(change * 100.0, 1),
+            "regression": worse > tolerance,
+        })
+    return {
+        "tolerance_pct": round(tolerance * 100.0, 1),
+        "metrics": rows,
+        "regressions": [r["metric"] for r in rows if r["regression"]],
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--images", default=os.path.join(BASE_DIR, "uploads", "laporan"))
+    ap.add_argument("--limit", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--synthetic", default=SYNTHETIC_SIZES, help="resolusi sintetis, pisahkan dengan koma")
+    ap.add_argument("--batch-images", type=int, default=256, help="jumlah gambar per ukuran batch")
+    ap.add_argument("--compare", default="", help="file hasil run sebelumnya (baseline)")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="batas regresi relatif (0.15 = 15%%)")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    results = run(args)
+    c = results["cold_start"]
+    print(f"cold start {c['process_s']:.2f} s (import {c['import_s']:.2f} s, predict pertama {c['first_predict_s']:.2f} s)")
+    for name, v in [("corpus", results["corpus"])] + list(results["synthetic"].items()):
+        print(f"{name:10s} p50 {v['p50_ms']:8.2f} ms  p95 {v['p95_ms']:8.2f} ms  p99 {v['p99_ms']:8.2f} ms")
+    for bs, v in results["batch"].items():
+        print(f"batch {bs:>2s}   {v['images_per_s']:8.1f} gambar/detik")
+    print(f"peak RSS {results['peak_rss_mb']} MB")
+
+    code = 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        results["compare"] = compare(results, baseline, args.tolerance)
+        results["compare"]["baseline_file"] = args.compare
+        for r in results["compare"]["metrics"]:
+            flag = "  REGRESI" if r["regression"] else ""
+            print(f"  {r['metric']:32s} {r['baseline']:>10} -> {r['current']:>10} ({r['change_pct']:+.1f}%){flag}")
+        if results["compare"]["regressions"]:
+            code = 1
+            print(f"{len(results['compare']['regressions'])} metrik melewati toleransi {args.tolerance:.0%}")
+
+    path = write_results("inference", results, out_path=args.out)
+    print(f"hasil disimpan di {path}", flush=True)
+    # Skip teardown interpreter: TF kadang abort saat exit.
+    sys.stdout.flush()
+    os._exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark decode JPEG skala kecil (Image.draft) vs decode full resolution.
+
+Tiap mode dijalankan di proses terpisah supaya peak RSS-nya tidak tercampur:
+
+- full : decode full resolution lalu resize ke 224x224 (perilaku sebelumnya).
+- draft: decode JPEG di skala DCT terdekat yang >= 2x 224x224 (DRAFT_SCALE), lalu resize.
+
+Selain corpus `uploads/laporan`, ditambahkan foto sintetis ukuran kamera HP
+(default 4032x3024) karena foto di corpus umumnya sudah di-scale oleh app.
+Dengan --labels, label hasil kedua mode dibandingkan di corpus (butuh model).
+
+Contoh:
+    python -m benchmarks.jpeg_draft --repeat 3 --labels
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks._common import (
+    BASE_DIR,
+    current_rss_mb,
+    latency_summary,
+    list_images,
+    peak_rss_mb,
+    synthetic_jpeg,
+    write_results,
+)
+
+
+def _child(mode: str, images: str, synthetic: str, repeat: int, labels: bool) -> None:
+    from ai.predict import IMG_SIZE
+    from ai.preprocess import image_bytes_to_array, input_buffer
+
+    draft = mode == "draft"
+    corpus = []
+    for p in list_images(images):
+        with open(p, "rb") as f:
+            corpus.append((os.path.basename(p), f.read()))
+    synth = []
+    if synthetic:
+        with open(synthetic, "rb") as f:
+            synth.append((os.path.basename(synthetic), f.read()))
+
+    buf = input_buffer(IMG_SIZE)
+    image_bytes_to_array(corpus[0][1] if corpus else synth[0][1], IMG_SIZE, buf, draft=draft)
+    rss_before = current_rss_mb()
+    timings = {"corpus": [], "synthetic": []}
+    for _ in range(max(1, repeat)):
+        for group, items in (("corpus", corpus), ("synthetic", synth)):
+            for _, data in items:
+                t0 = time.perf_counter()
+                image_bytes_to_array(data, IMG_SIZE, buf, draft=draft)
+                timings[group].append(time.perf_counter() - t0)
+
+    out = {
+        "mode": mode,
+        "corpus_images": len(corpus),
+        "preprocess": {k: latency_summary(v) for k, v in timings.items() if v},
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+    if labels:
+        from ai.predict import CLASS_NAMES, predict_batch
+
+        preds = {}
+        for name, data in corpus:
+            arr = image_bytes_to_array(data, IMG_SIZE, draft=draft)
+            p = predict_batch(arr[None])[0]
+            preds[name] = {"label": CLASS_NAMES[int(np.argmax(p))], "probs": [float(x) for x in p]}
+        out["predictions"] = preds
+
+    print(json.dumps(out), flush=True)
+    # Skip teardown interpreter: TF kadang abort saat exit.
+    os._exit(0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--images", default=os.path.join(BASE_DIR, "uploads", "laporan"))
+    ap.add_argument("--synthetic", default="4032x3024", help="ukuran foto sintetis, kosongkan untuk skip")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--labels", action="store_true", help="bandingkan label di corpus (butuh model)")
+    ap.add_argument("--out", default="")
+    ap.add_argument("--child", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child, args.images, args.synthetic, args.repeat, args.labels)
+        return
+
+    synthetic_path = ""
+    tmpdir = tempfile.mkdtemp(prefix="jpeg-draft-")
+    if args.synthetic:
+        synthetic_path = os.path.join(tmpdir, f"synthetic_{args.synthetic}.jpg")
+        synthetic_jpeg(args.synthetic, synthetic_path)
+
+    results = {}
+    for mode in ("full", "draft"):
+        cmd = [sys.executable, "-m", "benchmarks.jpeg_draft", "--child", mode,
+               "--images", args.images, "--synthetic", synthetic_path, "--repeat", str(args.repeat)]
+        if args.labels:
+            cmd.append("--labels")
+        out = subprocess.run(cmd, cwd=BASE_DIR, capture_output=True, text=True, check=True)
+        results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+        pre = results[mode]["preprocess"]
+        line = ", ".join(f"{k} p50 {v['p50_ms']:.2f} ms" for k, v in pre.items())
+        print(f"{mode:5s} {line}; peak RSS {results[mode]['peak_rss_mb']} MB"
+              f" (+{results[mode]['peak_rss_growth_mb']} MB selama decode)")
+
+    if args.labels:
+        full = results["full"].pop("predictions")
+        draft = results["draft"].pop("predictions")
+        changed = sorted(n for n in full if full[n]["label"] != draft[n]["label"])
+        max_diff = max(
+            (abs(a - b) for n in full for a, b in zip(full[n]["probs"], draft[n]["probs"])),
+            default=0.0,
+        )
+        results["labels"] = {
+            "images": len(full),
+            "same_label": len(full) - len(changed),
+            "changed": changed,
+            "max_prob_diff": round(max_diff, 6),
+        }
+        print(f"label sama {len(full) - len(changed)}/{len(full)}; selisih prob maks {max_diff:.6f}")
+
+    shutil.rmtree(tmpdir, ignore_errors=True)
+    path = write_results("jpeg_draft", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
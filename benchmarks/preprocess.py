@@ -0,0 +1,95 @@
+"""Benchmark per tahap jalur klasifikasi foto laporan.
+
+Untuk tiap gambar di `uploads/laporan` (atau --images DIR), diukur:
+
+- legacy : jalur lama (`keras image.load_img` dari disk -> img_to_array ->
+           expand_dims), tanpa forward pass.
+- decode : decode bytes -> PIL image (dari memori, full resolution supaya
+           hasilnya bisa dicek sama persis dengan jalur lama; lihat
+           benchmarks/jpeg_draft.py untuk decode JPEG skala kecil).
+- resize : konversi RGB + resize ke 224x224.
+- prep   : salin piksel ke buffer float32 yang dipakai ulang.
+- forward: satu forward pass batch 1.
+
+Contoh:
+    python -m benchmarks.preprocess --repeat 3
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks._common import BASE_DIR, latency_summary, list_images, peak_rss_mb, write_results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--images", default=os.path.join(BASE_DIR, "uploads", "laporan"))
+    ap.add_argument("--limit", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--no-forward", action="store_true", help="lewati tahap forward (tanpa model)")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from tensorflow.keras.preprocessing import image
+
+    from ai.predict import IMG_SIZE, get_model, predict_batch
+    from ai.preprocess import decode_image, input_buffer, resize_image, to_input_array
+
+    files = list_images(args.images, limit=args.limit)
+    if not files:
+        raise SystemExit(f"Tidak ada gambar di {args.images}")
+    blobs = []
+    for p in files:
+        with open(p, "rb") as f:
+            blobs.append(f.read())
+
+    if not args.no_forward:
+        get_model()
+        predict_batch(np.zeros((1,) + IMG_SIZE + (3,), dtype=np.float32))
+
+    stages = {k: [] for k in ("legacy", "decode", "resize", "prep", "forward", "total")}
+    buf = input_buffer(IMG_SIZE)
+    for _ in range(max(1, args.repeat)):
+        for path, data in zip(files, blobs):
+            t0 = time.perf_counter()
+            legacy = np.expand_dims(image.img_to_array(image.load_img(path, target_size=IMG_SIZE)), axis=0)
+            stages["legacy"].append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            img = decode_image(data)
+            t1 = time.perf_counter()
+            img = resize_image(img, IMG_SIZE)
+            t2 = time.perf_counter()
+            arr = to_input_array(img, buf)
+            t3 = time.perf_counter()
+            if not args.no_forward:
+                predict_batch(arr[None])
+            t4 = time.perf_counter()
+
+            stages["decode"].append(t1 - t0)
+            stages["resize"].append(t2 - t1)
+            stages["prep"].append(t3 - t2)
+            stages["forward"].append(t4 - t3)
+            stages["total"].append(t4 - t0)
+
+            if not np.array_equal(legacy[0], arr):
+                raise SystemExit(f"Hasil preprocessing beda dengan jalur lama: {path}")
+
+    results = {
+        "images": len(files),
+        "repeat": args.repeat,
+        "stages": {k: latency_summary(v) for k, v in stages.items() if v},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    for k, v in results["stages"].items():
+        print(f"{k:8s} p50 {v['p50_ms']:8.3f} ms  p95 {v['p95_ms']:8.3f} ms")
+
+    path = write_results("preprocess", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
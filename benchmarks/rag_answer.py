@@ -0,0 +1,85 @@
+"""Benchmark latensi EcoSeaRAG.answer (retrieval + generate) end-to-end.
+
+Traffic chat disimulasikan dengan --requests pertanyaan yang diambil dari
+QUERIES (benchmarks/rag_search.py) dengan distribusi Zipf: beberapa
+pertanyaan sangat sering diulang. Tiap pertanyaan divariasikan huruf besar /
+tanda bacanya supaya key cache ternormalisasi ikut teruji.
+
+Mode:
+- nocache: RAG_CACHE_SIZE=0 (tiap request dihitung ulang).
+- cache  : cache LRU + TTL default.
+
+Contoh:
+    python -m benchmarks.rag_answer --chunks 10000 --requests 2000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks._common import BASE_DIR, latency_summary, peak_rss_mb, write_results
+from benchmarks.rag_search import QUERIES, base_chunks, synthetic_chunks
+
+
+def _variants(q: str, rng: random.Random) -> str:
+    choice = rng.randint(0, 2)
+    if choice == 0:
+        return q
+    if choice == 1:
+        return q.lower().rstrip("?")
+    return q.upper() + " ?"
+
+
+def make_kb(folder: str, n_chunks: int) -> str:
+    base = base_chunks(os.getenv("RAG_KB_PATH", os.path.join(BASE_DIR, "ai-chat", "chatbot.txt")))
+    path = os.path.join(folder, "kb.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(c.text for c in synthetic_chunks(base, n_chunks)))
+    return path
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, default=10000)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--backend", default="compact")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    folder = tempfile.mkdtemp(prefix="rag-answer-")
+    try:
+        kb = make_kb(folder, args.chunks)
+        rng = random.Random(0)
+        weights = [1.0 / (r + 1) for r in range(len(QUERIES))]
+        traffic = [_variants(q, rng) for q in rng.choices(QUERIES, weights, k=args.requests)]
+
+        results = {"chunks": args.chunks, "requests": args.requests, "backend": args.backend, "modes": {}}
+        for mode, cache_size in (("nocache", 0), ("cache", 1024)):
+            engine = EcoSeaRAG(kb_path=kb, index_backend=args.backend, cache_size=cache_size)
+            timings = []
+            for q in traffic:
+                t0 = time.perf_counter()
+                engine.answer(q)
+                timings.append(time.perf_counter() - t0)
+            summary = latency_summary(timings)
+            summary["requests_per_s"] = round(len(timings) / sum(timings), 1)
+            results["modes"][mode] = {"latency": summary, "stats": engine.stats()["cache"]}
+            print(
+                f"{mode:8s} p50 {summary['p50_ms']:8.3f} ms  p99 {summary['p99_ms']:8.3f} ms  "
+                f"{summary['requests_per_s']:9.1f} req/s  hit rate {engine.stats()['cache']['hit_rate']:.2%}"
+            )
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    path = write_results("rag_answer", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
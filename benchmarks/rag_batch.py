@@ -0,0 +1,132 @@
+"""Benchmark throughput menjawab banyak pertanyaan: satu-satu vs batch.
+
+Mode:
+- engine_sequential: EcoSeaRAG.answer() dipanggil per pertanyaan.
+- engine_batch     : EcoSeaRAG.answer_many() sekali untuk semua pertanyaan.
+- http_sequential  : POST /api/chat per pertanyaan (JWT + JSON + dispatch Flask).
+- http_batch       : satu POST /api/chat/batch (admin) untuk semua pertanyaan.
+
+Mode http memakai app Flask kecil (blueprint chat + JWT) dengan database
+SQLite di memori berisi satu user admin. Cache jawaban dimatikan supaya tiap
+pertanyaan benar-benar dihitung; hasil batch dicek sama dengan satu-satu.
+
+Contoh:
+    python -m benchmarks.rag_batch --chunks 10000 --questions 500
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks._common import write_results
+from benchmarks.rag_answer import make_kb
+from benchmarks.rag_search import QUERIES
+
+
+def _make_app(engine):
+    from flask import Flask
+    from flask_jwt_extended import create_access_token
+
+    import ai.rag.rag_engine as rag_engine
+    from extensions import db, jwt
+    from models import User
+    from routes.chat import chat_bp
+
+    app = Flask(__name__)
+    app.config.update(
+        JWT_SECRET_KEY="benchmark-" + "x" * 32,
+        SQLALCHEMY_DATABASE_URI="sqlite://",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        RAG_BATCH_MAX_QUESTIONS=100000,
+    )
+    db.init_app(app)
+    jwt.init_app(app)
+    app.register_blueprint(chat_bp, url_prefix="/api")
+    rag_engine._ENGINE = engine
+    with app.app_context():
+        db.create_all()
+        admin = User(nama="Admin", email="admin@example.com", password="-", role="admin")
+        db.session.add(admin)
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id))
+    return app, {"Authorization": f"Bearer {token}"}
+
+
+def _questions(n: int, seed: int = 0):
+    """Pertanyaan FAQ: QUERIES dengan variasi kecil supaya tidak semua identik."""
+    rng = random.Random(seed)
+    suffix = ["", " ya", " dong", " di Tegal", " di pantai", " sekarang"]
+    return [rng.choice(QUERIES) + rng.choice(suffix) for _ in range(n)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, default=10000)
+    ap.add_argument("--questions", type=int, default=500)
+    ap.add_argument("--backend", default="compact")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    questions = _questions(args.questions)
+    folder = tempfile.mkdtemp(prefix="rag-batch-")
+    try:
+        kb = make_kb(folder, args.chunks)
+        # Tanpa riwayat: /api/chat menyimpan riwayat per user, jadi pertanyaan
+        # lanjutan akan digabung dengan pertanyaan sebelumnya dan hasilnya beda
+        # dengan answer() / answer_many() yang tanpa riwayat.
+        engine = EcoSeaRAG(kb_path=kb, index_backend=args.backend, cache_size=0, history_turns=0)
+        app, headers = _make_app(engine)
+        client = app.test_client()
+
+        def engine_sequential():
+            return [(r.reply, r.contexts) for r in (engine.answer(q) for q in questions)]
+
+        def engine_batch():
+            return [(r.reply, r.contexts) for r in engine.answer_many(questions)]
+
+        def http_sequential():
+            out = []
+            for q in questions:
+                body = client.post("/api/chat", json={"message": q}, headers=headers).get_json()
+                out.append((body["reply"], body["contexts"]))
+            return out
+
+        def http_batch():
+            res = client.post("/api/chat/batch", json={"questions": questions}, headers=headers)
+            assert res.status_code == 200, res.get_data(as_text=True)
+            return [(r["reply"], r["contexts"]) for r in res.get_json()["results"]]
+
+        results = {"chunks": args.chunks, "questions": len(questions), "backend": args.backend, "modes": {}}
+        reference = None
+        for name, fn in (
+            ("engine_sequential", engine_sequential),
+            ("engine_batch", engine_batch),
+            ("http_sequential", http_sequential),
+            ("http_batch", http_batch),
+        ):
+            fn()  # warm-up
+            t0 = time.perf_counter()
+            out = fn()
+            seconds = time.perf_counter() - t0
+            if reference is None:
+                reference = out
+            elif out != reference:
+                raise SystemExit(f"hasil {name} berbeda dengan engine_sequential")
+            results["modes"][name] = {
+                "seconds": round(seconds, 4),
+                "questions_per_s": round(len(questions) / seconds, 1),
+            }
+            print(f"{name:18s} {seconds:8.3f} s  {len(questions) / seconds:10.1f} pertanyaan/s")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    path = write_results("rag_batch", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
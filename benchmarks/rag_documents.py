@@ -0,0 +1,171 @@
+"""Benchmark KB multi-dokumen: biaya ganti / tambah / hapus satu dokumen.
+
+KB sintetis berupa folder dokumen .txt (kosakata KB + frekuensi Zipf, lihat
+benchmarks/rag_search.py) dengan --docs dokumen. Untuk tiap backend diukur
+build awal, lalu waktu `add_document` (dokumen baru), `add_document`
+(ganti dokumen yang ada) dan `remove_document`. Hasil search setelah
+perubahan dicek sama dengan build penuh.
+
+Bagian reload: KB satu file (--reload-chunks paragraf) diubah sebagian lalu
+`reload()` dijalankan di thread lain sementara thread utama terus search.
+Yang dicatat latensi search selama reload; benchmark gagal kalau ada search
+yang tertahan lebih dari --max-stall-ms (hot reload harus tetap melayani
+query), atau kalau hasil search setelah reload beda dengan build penuh.
+
+Contoh:
+    python -m benchmarks.rag_documents --docs 100,1000,5000
+    python -m benchmarks.rag_documents --docs 100 --reload-chunks 30000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks._common import BASE_DIR, latency_summary, peak_rss_mb, write_results
+from benchmarks.rag_search import QUERIES, base_chunks, synthetic_chunks
+
+
+def _write_kb(folder: str, n_docs: int, *, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    base = base_chunks(os.getenv("RAG_KB_PATH", os.path.join(BASE_DIR, "ai-chat", "chatbot.txt")))
+    pool = synthetic_chunks(base, max(len(base) + 1, 2000), seed=seed)
+    for i in range(n_docs):
+        paras = [rng.choice(pool).text for _ in range(rng.randint(2, 8))]
+        with open(os.path.join(folder, f"doc{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n\n".join(paras))
+
+
+def _check_same_as_full(index, backend: str, what: str) -> None:
+    from ai.rag.vector_store import CompactBM25Index
+
+    full = CompactBM25Index(list(index.chunks))
+    for q in QUERIES:
+        got = sorted((h.score, h.chunk.id) for h in index.search(q, k=4))
+        ref = sorted((h.score, h.chunk.id) for h in full.search(q, k=4))
+        if [s for s, _ in got] != [s for s, _ in ref]:
+            raise SystemExit(f"Skor search {backend} {what} beda dengan build penuh untuk query {q!r}")
+
+
+def _reload_stall(backend: str, n_chunks: int, *, edits: int, max_stall_ms: float, seed: int = 0) -> dict:
+    """Latensi search selama reload() KB satu file yang sebagian paragrafnya diubah."""
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    rng = random.Random(seed)
+    base = base_chunks(os.getenv("RAG_KB_PATH", os.path.join(BASE_DIR, "ai-chat", "chatbot.txt")))
+    paras = [c.text for c in synthetic_chunks(base, n_chunks, seed=seed)]
+    folder = tempfile.mkdtemp(prefix="rag-reload-")
+    try:
+        path = os.path.join(folder, "kb.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(paras))
+        engine = EcoSeaRAG(kb_path=path, index_backend=backend, cache_size=0)
+
+        for i in rng.sample(range(len(paras)), min(edits, len(paras))):
+            paras[i] = " ".join(reversed(paras[i].split()))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(paras))
+
+        done = threading.Event()
+        took = {}
+
+        def reload():
+            t0 = time.perf_counter()
+            engine.reload()
+            took["s"] = time.perf_counter() - t0
+            done.set()
+
+        latencies = []
+        thread = threading.Thread(target=reload)
+        thread.start()
+        i = 0
+        while not done.is_set():
+            t0 = time.perf_counter()
+            engine._index.search(QUERIES[i % len(QUERIES)], k=4)
+            latencies.append(time.perf_counter() - t0)
+            i += 1
+        thread.join()
+        _check_same_as_full(engine._index, backend, "setelah reload")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    summary = latency_summary(latencies)
+    if summary["max_ms"] > max_stall_ms:
+        raise SystemExit(
+            f"Search {backend} tertahan {summary['max_ms']:.0f} ms selama reload (batas {max_stall_ms:.0f} ms)"
+        )
+    return {"chunks": len(paras), "edits": edits, "reload_s": round(took["s"], 3), **summary}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", default="100,1000,5000")
+    ap.add_argument("--backends", default="bm25,compact")
+    ap.add_argument("--ops", type=int, default=10, help="jumlah operasi per jenis")
+    ap.add_argument("--reload-chunks", type=int, default=10000, help="0 = lewati bagian reload")
+    ap.add_argument("--reload-edits", type=int, default=50, help="jumlah paragraf yang diubah sebelum reload")
+    ap.add_argument("--max-stall-ms", type=float, default=500.0)
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    results = {"ops": args.ops, "docs": {}}
+    for n_docs in [int(x) for x in args.docs.split(",") if x.strip()]:
+        folder = tempfile.mkdtemp(prefix="rag-docs-")
+        try:
+            _write_kb(folder, n_docs)
+            row = {}
+            for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+                t0 = time.perf_counter()
+                engine = EcoSeaRAG(kb_path=folder, index_backend=backend)
+                build_s = time.perf_counter() - t0
+                rng = random.Random(1)
+                timings = {"add": [], "replace": [], "remove": []}
+                texts = [c.text for c in engine._chunks[:200]]
+                for i in range(args.ops):
+                    text = "\n\n".join(rng.sample(texts, 4))
+                    for op, doc_id in (("add", f"baru{i}.txt"), ("replace", f"doc{i:05d}.txt")):
+                        t0 = time.perf_counter()
+                        engine.add_document(doc_id, text)
+                        timings[op].append(time.perf_counter() - t0)
+                    t0 = time.perf_counter()
+                    engine.remove_document(f"doc{n_docs - 1 - i:05d}.txt")
+                    timings["remove"].append(time.perf_counter() - t0)
+
+                _check_same_as_full(engine._index, backend, "setelah add/remove")
+
+                row[backend] = {
+                    "chunks": len(engine._chunks),
+                    "build_s": round(build_s, 3),
+                    **{op: latency_summary(v) for op, v in timings.items()},
+                }
+                print(
+                    f"{n_docs:>6d} dokumen  {backend:8s} build {build_s:7.2f} s  "
+                    + "  ".join(f"{op} p50 {row[backend][op]['p50_ms']:8.2f} ms" for op in timings)
+                )
+            results["docs"][str(n_docs)] = row
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if args.reload_chunks > 0:
+        results["reload"] = {}
+        for backend in backends:
+            res = _reload_stall(backend, args.reload_chunks, edits=args.reload_edits, max_stall_ms=args.max_stall_ms)
+            results["reload"][backend] = res
+            print(
+                f"reload {res['chunks']:>6d} chunk  {backend:8s} {res['reload_s']:7.2f} s  "
+                f"search p50 {res['p50_ms']:7.3f} ms  p99 {res['p99_ms']:7.3f} ms  max {res['max_ms']:8.2f} ms"
+            )
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    path = write_results("rag_documents", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
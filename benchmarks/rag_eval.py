@@ -0,0 +1,278 @@
+"""Evaluasi kualitas + latensi retrieval RAG dengan pertanyaan berlabel, sambil menyapu parameter.
+
+Set pertanyaan (default benchmarks/data/rag_eval.json) berisi pertanyaan dan
+frasa `expected`: konteks hasil retrieval dianggap relevan kalau mengandung
+salah satu frasa itu (huruf besar/kecil diabaikan). Label tidak terikat ke id
+chunk, jadi tetap berlaku saat RAG_CHUNK_SIZE / RAG_CHUNK_OVERLAP diubah.
+KB default = KB contoh yang disebut di file pertanyaan (data/ecosea_kb.md);
+untuk KB produksi pakai --kb dan set pertanyaan sendiri.
+
+Untuk tiap kombinasi chunk size x overlap x k1 x b (x backend x retriever)
+dibuat EcoSeaRAG baru (tanpa cache jawaban), lalu dicatat:
+- recall@k (pertanyaan yang punya konteks relevan di k teratas) dan MRR
+- waktu build engine (chunking + index) dan memori index (tracemalloc)
+- latensi per pertanyaan: retrieval saja dan answer() lengkap (p50/p95/p99)
+- pertanyaan yang meleset (tidak ada konteks relevan di k terbesar)
+
+--pad-chunks menambah dokumen pengalih (paragraf sintetis topik lain, disisipi
+kata umum KB) supaya retrieval harus memilih dari KB yang lebih besar; chunk
+pengalih tidak pernah dianggap relevan.
+
+Hasil disimpan ke benchmarks/results/ (JSON, plus commit git); --compare <file
+hasil lama> menampilkan selisihnya per konfigurasi.
+
+Contoh:
+    python -m benchmarks.rag_eval
+    python -m benchmarks.rag_eval --chunk-sizes 400,650,900 --overlaps 60,120 --k1 1.2,1.5,2.0 --b 0.5,0.75
+    python -m benchmarks.rag_eval --pad-chunks 5000 --retrievers bm25,hybrid
+    python -m benchmarks.rag_eval --compare benchmarks/results/rag_eval-20261017-120000.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks._common import BASE_DIR, latency_summary, write_results
+
+DEFAULT_QUESTIONS = os.path.join(BASE_DIR, "benchmarks", "data", "rag_eval.json")
+_PAD_DOC = "zz-pengalih.txt"
+
+
+def _floats(text: str):
+    return [float(x) for x in text.split(",") if x.strip()]
+
+
+def _ints(text: str):
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def load_questions(path: str):
+    """(pertanyaan berlabel, path KB default dari file pertanyaan atau "")."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    questions = [
+        {"question": q["question"], "expected": [e.lower() for e in q["expected"]]}
+        for q in data["questions"]
+    ]
+    kb = data.get("kb") or ""
+    if kb and not os.path.isabs(kb):
+        kb = os.path.join(os.path.dirname(os.path.abspath(path)), kb)
+    return questions, kb
+
+
+def padded_kb(kb_path: str, folder: str, n_chunks: int, *, seed: int = 0) -> str:
+    """Salin KB ke `folder` + satu dokumen pengalih berisi `n_chunks` paragraf.
+
+    Paragraf pengalih = teks bertopik dari kata buatan (seperti
+    benchmarks.rag_retrievers) yang disisipi 30 kata paling umum di KB, jadi
+    topiknya lain tapi tetap bersaing untuk kata-kata umum ("sampah", "di", ...).
+    """
+    import random
+    from collections import Counter
+
+    from ai.rag.loader import load_kb_chunks
+    from ai.rag.vector_store import _tokenize
+    from benchmarks.rag_retrievers import make_kb as topic_kb
+
+    kb_dir = os.path.join(folder, "kb")
+    if os.path.isdir(kb_path):
+        shutil.copytree(kb_path, kb_dir)
+    else:
+        os.makedirs(kb_dir)
+        shutil.copy(kb_path, os.path.join(kb_dir, os.path.basename(kb_path)))
+
+    counts = Counter(t for c in load_kb_chunks(kb_path) for t in _tokenize(c.text))
+    common = [t for t, _ in counts.most_common(30)]
+    rng = random.Random(seed)
+    with open(topic_kb(folder, n_chunks, seed=seed), "r", encoding="utf-8") as f:
+        paragraphs = f.read().split("\n\n")
+    with open(os.path.join(kb_dir, _PAD_DOC), "w", encoding="utf-8") as f:
+        f.write("\n\n".join(
+            " ".join(rng.choice(common) if rng.random() < 0.15 else w for w in p.split()) for p in paragraphs
+        ))
+    return kb_dir
+
+
+def _relevant(chunk, expected) -> bool:
+    if chunk.id.startswith(_PAD_DOC + ":"):
+        return False
+    text = chunk.text.lower()
+    return any(e in text for e in expected)
+
+
+def _index_bytes(engine) -> int:
+    """Memori struktur index (tanpa teks chunk, yang sudah ada sebelum index dibuat)."""
+    from ai.rag.vector_store import build_index
+
+    chunks = list(engine._index.chunks)
+    tracemalloc.start()
+    index = build_index(chunks, backend=engine.index_backend, k1=engine.bm25_k1, b=engine.bm25_b)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del index
+    if engine._dense is not None:
+        size += engine._dense.nbytes()
+    return size
+
+
+def evaluate(engine, questions, *, k_values, repeat: int, memory: bool) -> dict:
+    depth = max(k_values)
+    hits = {k: 0 for k in k_values}
+    rr = 0.0
+    misses = []
+    for q in questions:
+        chunks = engine._retrieve_chunks(q["question"], depth)
+        rank = next((i + 1 for i, c in enumerate(chunks) if _relevant(c, q["expected"])), None)
+        if rank is None:
+            misses.append(q["question"])
+            continue
+        rr += 1.0 / rank
+        for k in k_values:
+            hits[k] += rank <= k
+
+    retrieve_t, answer_t = [], []
+    for _ in range(max(1, repeat)):
+        for q in questions:
+            t0 = time.perf_counter()
+            engine._retrieve_chunks(q["question"], engine.top_k)
+            retrieve_t.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            engine.answer(q["question"])
+            answer_t.append(time.perf_counter() - t0)
+
+    n = len(questions)
+    return {
+        "recall": {f"@{k}": round(hits[k] / n, 4) for k in k_values},
+        "mrr": round(rr / n, 4),
+        "misses": misses,
+        "index_bytes": _index_bytes(engine) if memory else None,
+        "retrieve": latency_summary(retrieve_t),
+        "answer": latency_summary(answer_t),
+    }
+
+
+def config_key(cfg: dict) -> str:
+    return (f"{cfg['backend']}/{cfg['retriever']} chunk={cfg['chunk_size']}/{cfg['chunk_overlap']} "
+            f"k1={cfg['k1']:g} b={cfg['b']:g}")
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True)
+        return out.stdout.strip()
+    except OSError:
+        return ""
+
+
+def _print_compare(runs, path: str) -> None:
+    with open(path, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    previous = {r["key"]: r for r in old["results"]["runs"]}
+    print(f"\nselisih dengan {path} (commit {old['results'].get('git_commit') or '?'}):")
+    for run in runs:
+        prev = previous.get(run["key"])
+        if prev is None:
+            print(f"  {run['key']:50s} (tidak ada di hasil lama)")
+            continue
+        recall = "  ".join(
+            f"R{k} {run['recall'][k] - prev['recall'].get(k, 0.0):+.3f}" for k in run["recall"]
+        )
+        p50 = run["retrieve"]["p50_ms"] - prev["retrieve"]["p50_ms"]
+        print(f"  {run['key']:50s} {recall}  MRR {run['mrr'] - prev['mrr']:+.3f}  retrieve p50 {p50:+.3f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--questions", default=DEFAULT_QUESTIONS, help="file JSON pertanyaan berlabel")
+    ap.add_argument("--kb", default="", help="default: KB yang disebut di file pertanyaan")
+    ap.add_argument("--chunk-sizes", default="650")
+    ap.add_argument("--overlaps", default="120")
+    ap.add_argument("--k1", default="1.5")
+    ap.add_argument("--b", default="0.75")
+    ap.add_argument("--backends", default="compact")
+    ap.add_argument("--retrievers", default="bm25")
+    ap.add_argument("--k", default="1,3,5", help="nilai k untuk recall@k (RAG_TOP_K = k terbesar)")
+    ap.add_argument("--pad-chunks", type=int, default=0, help="jumlah chunk pengalih sintetis")
+    ap.add_argument("--repeat", type=int, default=5, help="pengulangan pengukuran latensi")
+    ap.add_argument("--no-memory", action="store_true", help="lewati pengukuran memori index")
+    ap.add_argument("--compare", default="", help="file hasil rag_eval lama untuk dibandingkan")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    questions, default_kb = load_questions(args.questions)
+    kb_path = args.kb or default_kb or os.getenv("RAG_KB_PATH", "")
+    if not kb_path or not os.path.exists(kb_path):
+        raise SystemExit(f"KB tidak ditemukan: {kb_path!r} (pakai --kb)")
+    k_values = sorted(set(_ints(args.k)))
+
+    folder = tempfile.mkdtemp(prefix="rag-eval-")
+    runs = []
+    try:
+        kb = padded_kb(kb_path, folder, args.pad_chunks) if args.pad_chunks > 0 else kb_path
+        grid = itertools.product(
+            _ints(args.chunk_sizes), _ints(args.overlaps), _floats(args.k1), _floats(args.b),
+            [x for x in args.backends.split(",") if x], [x for x in args.retrievers.split(",") if x],
+        )
+        for chunk_size, overlap, k1, b, backend, retriever in grid:
+            cfg = {
+                "chunk_size": chunk_size, "chunk_overlap": overlap, "k1": k1, "b": b,
+                "backend": backend, "retriever": retriever,
+            }
+            t0 = time.perf_counter()
+            engine = EcoSeaRAG(
+                kb_path=kb,
+                top_k=max(k_values),
+                chunk_size=chunk_size,
+                chunk_overlap=overlap,
+                index_backend=backend,
+                retriever=retriever,
+                bm25_k1=k1,
+                bm25_b=b,
+                cache_size=0,
+            )
+            build_s = time.perf_counter() - t0
+            res = evaluate(engine, questions, k_values=k_values, repeat=args.repeat, memory=not args.no_memory)
+            run = dict(
+                key=config_key(cfg), config=cfg, chunks=len(engine._index.chunks), build_s=round(build_s, 4), **res
+            )
+            runs.append(run)
+
+            recall = "  ".join(f"R{k} {v:.3f}" for k, v in run["recall"].items())
+            mem = f"{run['index_bytes'] / 1e6:7.2f} MB" if run["index_bytes"] is not None else "      -   "
+            print(f"{run['key']:50s} {run['chunks']:6d} chunk  {recall}  MRR {run['mrr']:.3f}  "
+                  f"build {build_s:6.2f} s  index {mem}  retrieve p50 {run['retrieve']['p50_ms']:7.3f} ms "
+                  f"p95 {run['retrieve']['p95_ms']:7.3f} ms  answer p50 {run['answer']['p50_ms']:7.3f} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    best = max(runs, key=lambda r: (r["mrr"], r["recall"][f"@{max(k_values)}"], -r["retrieve"]["p50_ms"]))
+    print(f"\nterbaik (MRR): {best['key']}  MRR {best['mrr']:.3f}")
+    if best["misses"]:
+        print("meleset:", "; ".join(best["misses"]))
+
+    results = {
+        "git_commit": _git_commit(),
+        "questions_file": os.path.relpath(args.questions, BASE_DIR),
+        "kb": kb_path,
+        "questions": len(questions),
+        "pad_chunks": args.pad_chunks,
+        "k": k_values,
+        "best": best["key"],
+        "runs": runs,
+    }
+    path = write_results("rag_eval", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+    if args.compare:
+        _print_compare(runs, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Benchmark chunking file KB besar: loader lama (baca utuh) vs loader streaming.
+
+Corpus sintetis dibuat per ukuran (--sizes, MB): paragraf dari kosakata KB
+(atau teks contoh bawaan), di-wrap per ~80 karakter seperti dokumen hasil
+export, dengan sebagian kata terpotong ("p antai") supaya heuristik gabung
+kata ikut teruji.
+
+Tiap mode dijalankan di proses terpisah supaya peak RSS-nya tidak tercampur:
+- legacy   : baca seluruh file, _normalize_text + split_into_chunks versi lama.
+- streaming: iter_paragraphs + iter_chunks (dua pass, per paragraf).
+
+Hash seluruh chunk kedua mode dicek harus sama.
+
+Contoh:
+    python -m benchmarks.rag_loader --sizes 10,100,300
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks._common import BASE_DIR, current_rss_mb, peak_rss_mb, write_results
+from benchmarks.rag_search import base_chunks
+
+
+def _legacy_normalize_text(text: str) -> str:
+    # Salinan _normalize_text sebelum loader streaming (ai/rag/loader.py).
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    para_token = "<<PARA_BREAK>>"
+    text = text.replace("\n\n", para_token)
+    text = text.replace("\n", " ")
+    vocab = set(re.findall(r"[A-Za-zÀ-ÿ]+", text.lower()))
+
+    def _join_if_known(m: re.Match) -> str:
+        combined = f"{m.group(1)}{m.group(2)}"
+        return combined if combined in vocab else m.group(0)
+
+    text = re.sub(r"\b([a-z]{1,2})\s+([a-z]{2,})\b", _join_if_known, text)
+    text = text.replace(para_token, "\n\n")
+    return text.strip()
+
+
+def _legacy_split_into_chunks(text: str, *, chunk_size: int, chunk_overlap: int):
+    text = _legacy_normalize_text(text)
+    if not text:
+        return []
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    chunks = []
+    cur = ""
+    for p in paragraphs:
+        candidate = (cur + "\n\n" + p).strip() if cur else p
+        if len(candidate) <= chunk_size:
+            cur = candidate
+            continue
+        if cur:
+            chunks.append(cur)
+            cur = ""
+        if len(p) > chunk_size:
+            start = 0
+            while start < len(p):
+                end = min(len(p), start + chunk_size)
+                chunks.append(p[start:end].strip())
+                if end >= len(p):
+                    break
+                start = max(0, end - chunk_overlap)
+        else:
+            cur = p
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def make_corpus(path: str, size_mb: float, *, seed: int = 0) -> None:
+    """Tulis corpus sintetis sekitar `size_mb` MB ke `path`."""
+    from ai.rag.vector_store import _tokenize
+
+    base = base_chunks(os.getenv("RAG_KB_PATH", os.path.join(BASE_DIR, "ai-chat", "chatbot.txt")))
+    vocab = sorted({t for ch in base for t in _tokenize(ch.text)}) or ["pantai"]
+    rng = random.Random(seed)
+
+    pool = []
+    for _ in range(2000):
+        words = rng.choices(vocab, k=rng.randint(20, 400))
+        for i, w in enumerate(words):
+            if len(w) > 4 and rng.random() < 0.02:
+                words[i] = w[:1] + " " + w[1:]  # kata terpotong, mis. "p antai"
+        sentences, i = [], 0
+        while i < len(words):
+            n = rng.randint(6, 20)
+            sentences.append(" ".join(words[i:i + n]).capitalize() + ".")
+            i += n
+        text = " ".join(sentences)
+        lines, line = [], ""
+        for w in text.split(" "):
+            if line and len(line) + 1 + len(w) > 80:
+                lines.append(line)
+                line = w
+            else:
+                line = f"{line} {w}" if line else w
+        lines.append(line)
+        pool.append("\n".join(lines))
+
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < target:
+            block = "\n\n".join(rng.choices(pool, k=256)) + "\n\n"
+            f.write(block)
+            written += len(block.encode("utf-8"))
+
+
+def _child(mode: str, path: str, chunk_size: int, chunk_overlap: int) -> None:
+    from ai.rag.loader import iter_chunks, iter_paragraphs
+
+    rss_before = current_rss_mb()
+    digest = hashlib.blake2b(digest_size=16)
+    n = 0
+    t0 = time.perf_counter()
+    if mode == "legacy":
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        chunks = _legacy_split_into_chunks(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    else:
+        paragraphs = iter_paragraphs(lambda: open(path, "r", encoding="utf-8"))
+        chunks = iter_chunks(paragraphs, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for c in chunks:
+        digest.update(c.encode("utf-8"))
+        digest.update(b"\0")
+        n += 1
+    seconds = time.perf_counter() - t0
+
+    print(json.dumps({
+        "mode": mode,
+        "chunks": n,
+        "seconds": round(seconds, 3),
+        "digest": digest.hexdigest(),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+    }), flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="10,100", help="ukuran corpus (MB), dipisah koma")
+    ap.add_argument("--chunk-size", type=int, default=650)
+    ap.add_argument("--chunk-overlap", type=int, default=120)
+    ap.add_argument("--modes", default="legacy,streaming")
+    ap.add_argument("--out", default="")
+    ap.add_argument("--child", default="", help=argparse.SUPPRESS)
+    ap.add_argument("--path", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child, args.path, args.chunk_size, args.chunk_overlap)
+        return
+
+    tmpdir = tempfile.mkdtemp(prefix="rag-loader-")
+    results = {"chunk_size": args.chunk_size, "chunk_overlap": args.chunk_overlap, "sizes": {}}
+    try:
+        for size in [float(s) for s in args.sizes.split(",") if s.strip()]:
+            path = os.path.join(tmpdir, f"kb-{size:g}mb.txt")
+            make_corpus(path, size)
+            file_mb = round(os.path.getsize(path) / (1024 * 1024), 1)
+            row = {"file_mb": file_mb, "modes": {}}
+            for mode in [m for m in args.modes.split(",") if m]:
+                cmd = [sys.executable, "-m", "benchmarks.rag_loader", "--child", mode, "--path", path,
+                       "--chunk-size", str(args.chunk_size), "--chunk-overlap", str(args.chunk_overlap)]
+                out = subprocess.run(cmd, cwd=BASE_DIR, capture_output=True, text=True, check=True)
+                res = json.loads(out.stdout.strip().splitlines()[-1])
+                row["modes"][mode] = res
+                print(f"{file_mb:8.1f} MB  {mode:9s} {res['seconds']:8.2f} s  {res['chunks']:9d} chunk  "
+                      f"peak RSS {res['peak_rss_mb']:8.1f} MB (+{res['peak_rss_growth_mb']} MB)")
+            digests = {r["digest"] for r in row["modes"].values()}
+            row["identical"] = len(digests) == 1
+            if not row["identical"]:
+                print("  PERINGATAN: chunk hasil kedua mode berbeda")
+            results["sizes"][f"{size:g}"] = row
+            os.remove(path)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    path = write_results("rag_loader", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Evaluasi retriever RAG: recall@k dan latensi BM25 vs dense vs hybrid (RRF).
+
+KB sintetis berisi kata-kata buatan dari suku kata bahasa Indonesia
+("lapuran", "tambaku", ...) yang dikelompokkan per topik: tiap chunk
+sebagian besar memakai kata dari satu topik ditambah kata umum, jadi ada
+pola kata yang sering muncul bersama seperti teks asli. (KB make_kb di
+benchmark lain memakai "istilahN" acak tanpa topik, tidak cocok untuk menilai
+retriever dense.)
+
+Query dibuat dari chunk target yang dipilih acak: beberapa kata dari chunk
+itu, dalam dua set:
+- persis  : kata persis seperti di chunk.
+- variasi : sebagian kata diubah seperti ejaan informal / berimbuhan
+            ("numpuk" -> "menumpuk", "sampah" -> "sampahnya", "jalan" ->
+            "jalan2", huruf vokal hilang), jadi token-nya tidak ada di KB.
+
+Chunk target = satu-satunya jawaban benar; recall@k = persentase query yang
+chunk targetnya masuk k hasil teratas, MRR = rata-rata 1 / peringkatnya.
+Latensi diukur per query (search tunggal) dan per batch (search_many).
+
+Set ketiga, asing, berisi kata buatan yang tidak ada di KB: yang dicatat
+persentase query yang tetap mendapat hasil (idealnya 0, supaya engine bisa
+menjawab "tidak ditemukan").
+
+Contoh:
+    python -m benchmarks.rag_retrievers --chunks 10000 --queries 500
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks._common import latency_summary, write_results
+
+_SYLLABLES = [
+    c + v for c in ["", "b", "d", "g", "k", "l", "m", "n", "p", "r", "s", "t", "ng", "ny", "h", "j", "w"]
+    for v in "aiueo"
+]
+
+_PREFIXES = ["me", "di", "ber", "ter", "ke"]
+_SUFFIXES = ["nya", "kan", "an", "lah", "2"]
+
+
+def make_kb(folder: str, n_chunks: int, *, topics: int = 0, seed: int = 0) -> str:
+    """Tulis KB sintetis bertopik ke `folder`/kb.txt (satu chunk per paragraf)."""
+    rng = random.Random(seed)
+    topics = topics or max(20, n_chunks // 50)
+
+    def word() -> str:
+        return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    common = [word() for _ in range(300)]
+    topic_words = [[word() for _ in range(60)] for _ in range(topics)]
+    common_w = [1.0 / (r + 1) for r in range(len(common))]
+    topic_w = [1.0 / (r + 1) ** 0.7 for r in range(60)]
+
+    paragraphs = []
+    for _ in range(n_chunks):
+        words = topic_words[rng.randrange(topics)]
+        n_words = rng.randint(40, 90)
+        n_topic = int(n_words * 0.6)
+        toks = rng.choices(words, topic_w, k=n_topic) + rng.choices(common, common_w, k=n_words - n_topic)
+        rng.shuffle(toks)
+        paragraphs.append(" ".join(toks) + ".")
+    path = os.path.join(folder, "kb.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(paragraphs))
+    return path
+
+
+def perturb(word: str, rng: random.Random) -> str:
+    """Variasi ejaan informal / berimbuhan dari satu kata."""
+    roll = rng.random()
+    if roll < 0.3:
+        return rng.choice(_PREFIXES) + word
+    if roll < 0.6:
+        return word + rng.choice(_SUFFIXES)
+    vowels = [i for i, c in enumerate(word[1:-1], start=1) if c in "aiueo"]
+    if vowels:
+        i = rng.choice(vowels)
+        return word[:i] + word[i + 1:]
+    return word + word[-1]
+
+
+def make_queries(chunks, n: int, *, words: int, seed: int = 0):
+    """[(id chunk target, query persis, query variasi)]."""
+    from ai.rag.vector_store import _tokenize
+
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        target = chunks[rng.randrange(len(chunks))]
+        toks = sorted({t for t in _tokenize(target.text) if len(t) >= 4})
+        if len(toks) < words:
+            continue
+        picked = rng.sample(toks, words)
+        changed = set(rng.sample(range(words), max(1, words // 2)))
+        variant = [perturb(t, rng) if i in changed else t for i, t in enumerate(picked)]
+        out.append((target.id, " ".join(picked), " ".join(variant)))
+    return out
+
+
+def make_unrelated(chunks, n: int, *, seed: int = 1):
+    """Query dari kata buatan yang tidak muncul di KB."""
+    from ai.rag.vector_store import _tokenize
+
+    vocab = {t for ch in chunks for t in _tokenize(ch.text)}
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        words = ["".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(3, 4))) for _ in range(rng.randint(1, 3))]
+        if not vocab.intersection(words):
+            out.append(" ".join(words))
+    return out
+
+
+def evaluate(search, queries, *, k_values):
+    """recall@k + MRR (dalam max(k_values) hasil teratas) + latensi search tunggal."""
+    depth = max(k_values)
+    hits = {k: 0 for k in k_values}
+    rr = 0.0
+    latencies = []
+    for target, query in queries:
+        t0 = time.perf_counter()
+        ids = [c.id for c in search(query, depth)]
+        latencies.append(time.perf_counter() - t0)
+        if target in ids:
+            rank = ids.index(target) + 1
+            rr += 1.0 / rank
+            for k in k_values:
+                hits[k] += rank <= k
+    n = len(queries)
+    return {
+        "recall": {f"@{k}": round(hits[k] / n, 4) for k in k_values},
+        "mrr": round(rr / n, 4),
+        "latency": latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, default=10000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--words", type=int, default=4, help="jumlah kata per query")
+    ap.add_argument("--k", default="1,4,10")
+    ap.add_argument("--backend", default="compact")
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--min-score", type=float, default=0.2, help="RAG_DENSE_MIN_SCORE")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.rag_engine import EcoSeaRAG
+
+    k_values = [int(x) for x in args.k.split(",") if x.strip()]
+    folder = tempfile.mkdtemp(prefix="rag-retrievers-")
+    try:
+        kb = make_kb(folder, args.chunks)
+        t0 = time.perf_counter()
+        engine = EcoSeaRAG(
+            kb_path=kb, index_backend=args.backend, retriever="hybrid", dense_dim=args.dim,
+            dense_min_score=args.min_score, cache_size=0,
+        )
+        build_s = time.perf_counter() - t0
+        index, dense = engine._index, engine._dense
+        queries = make_queries(index.chunks, args.queries, words=args.words)
+
+        retrievers = {
+            "bm25": lambda q, k: [h.chunk for h in index.search(q, k=k)],
+            "dense": lambda q, k: [h.chunk for h in dense.search(q, k=k, min_score=args.min_score)],
+            "hybrid": engine._retrieve_chunks,
+        }
+        results = {
+            "chunks": len(index.chunks),
+            "queries": len(queries),
+            "words": args.words,
+            "backend": args.backend,
+            "dense_min_score": args.min_score,
+            "dense": {"dim": dense.dim, "bytes": dense.nbytes(), "engine_build_s": round(build_s, 3)},
+            "sets": {},
+            "batch": {},
+        }
+        for set_name, col in (("persis", 1), ("variasi", 2)):
+            qs = [(q[0], q[col]) for q in queries]
+            results["sets"][set_name] = {}
+            for name, search in retrievers.items():
+                res = evaluate(search, qs, k_values=k_values)
+                results["sets"][set_name][name] = res
+                recall = "  ".join(f"R{k} {v:.3f}" for k, v in res["recall"].items())
+                print(f"{set_name:8s} {name:7s} {recall}  MRR {res['mrr']:.3f}  "
+                      f"p50 {res['latency']['p50_ms']:7.3f} ms  p95 {res['latency']['p95_ms']:7.3f} ms")
+
+        unrelated = make_unrelated(index.chunks, len(queries))
+        results["sets"]["asing"] = {}
+        for name, search in retrievers.items():
+            answered = sum(1 for q in unrelated if search(q, max(k_values))) / len(unrelated)
+            results["sets"]["asing"][name] = {"with_results": round(answered, 4)}
+            print(f"asing    {name:7s} ada hasil {answered:.3f}")
+
+        # Throughput batch (search_many), semua query variasi sekaligus.
+        texts = [q[2] for q in queries]
+        k = max(k_values)
+        batch = {
+            "bm25": lambda: index.search_many(texts, k=k),
+            "dense": lambda: dense.search_many(texts, k=k, min_score=args.min_score),
+            "hybrid": lambda: engine._retrieve_many(texts, k),
+        }
+        for name, fn in batch.items():
+            t0 = time.perf_counter()
+            fn()
+            seconds = time.perf_counter() - t0
+            results["batch"][name] = {"seconds": round(seconds, 4), "queries_per_s": round(len(texts) / seconds, 1)}
+            print(f"batch    {name:7s} {len(texts) / seconds:10.1f} query/s")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    path = write_results("rag_retrievers", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Benchmark latensi BM25Index.search saat KB membesar.
+
+KB dasar diambil dari RAG_KB_PATH (chatbot.txt). Untuk ukuran yang lebih
+besar, chunk sintetis dibuat dari kosakata KB itu dengan distribusi Zipf
+(mirip teks asli: sedikit kata sangat sering, banyak kata jarang), sampai
+--sizes chunk (default 1000, 10000, 100000).
+
+Backend yang diukur (--backends): `bm25` (postings dict Python) dan
+`compact` (CSR NumPy). Untuk tiap backend dicatat waktu build, memori index
+(tracemalloc, tanpa teks chunk), latensi search dan query/detik. Hasil
+search semua backend dicek sama persis.
+
+Untuk pembanding, `legacy` menjalankan cara lama: skor tiap chunk satu per
+satu lalu sort semua hasil.
+
+Contoh:
+    python -m benchmarks.rag_search --sizes 1000,10000,100000
+    python -m benchmarks.rag_search --backends compact --no-legacy
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+
+from benchmarks._common import BASE_DIR, latency_summary, peak_rss_mb, write_results
+
+QUERIES = [
+    "Apa itu EcoSea?",
+    "Kenapa sampah plastik berbahaya untuk biota laut?",
+    "Bagaimana cara melapor pantai kotor di muara?",
+    "Rekomendasi wisata pantai di Tegal",
+    "sampah kiriman sungai saat rob",
+    "mangrove dan lamun untuk konservasi pesisir",
+    "pantai alam indah pai",
+    "apa yang bisa aku lakukan untuk bersih pantai bareng teman",
+]
+
+_FALLBACK_TEXT = (
+    "EcoSea adalah aplikasi untuk melaporkan kondisi pantai. Sampah plastik seperti botol, kresek, "
+    "sedotan dan puntung rokok sering terbawa arus dari sungai dan muara ke laut. Sampah merusak "
+    "ekosistem pesisir, mangrove, lamun, dan membahayakan biota laut. Wisata pantai di Tegal dan "
+    "Pantura antara lain Pantai Alam Indah, Muarareja, Dampyak, Purwahamba Indah dan Randusanga. "
+    "Edukasi, konservasi, dan aksi bersih pantai bersama komunitas membantu menjaga pantai tetap bersih."
+)
+
+
+class _LegacyBM25:
+    """Cara lama: hitung skor semua dokumen, lalu sort penuh."""
+
+    def __init__(self, chunks, k1: float = 1.5, b: float = 0.75):
+        from ai.rag.vector_store import _tokenize
+
+        self.chunks = chunks
+        self.k1, self.b = k1, b
+        self._tf: List[Dict[str, int]] = []
+        self._lens: List[int] = []
+        df: Dict[str, int] = {}
+        for ch in chunks:
+            toks = _tokenize(ch.text)
+            tf: Dict[str, int] = {}
+            for t in toks:
+                tf[t] = tf.get(t, 0) + 1
+            self._tf.append(tf)
+            self._lens.append(len(toks))
+            for t in tf:
+                df[t] = df.get(t, 0) + 1
+        n = len(chunks)
+        self._avg = sum(self._lens) / max(1, n)
+        self._idf = {t: math.log((n - d + 0.5) / (d + 0.5) + 1.0) for t, d in df.items()}
+
+    def search(self, query: str, *, k: int = 4):
+        from ai.rag.vector_store import ScoredChunk, _tokenize
+
+        q = _tokenize(query)
+        results = []
+        for idx, ch in enumerate(self.chunks):
+            tf, dl = self._tf[idx], self._lens[idx]
+            score = 0.0
+            for t in q:
+                if t not in tf:
+                    continue
+                f = tf[t]
+                denom = f + self.k1 * (1 - self.b + self.b * (dl / (self._avg or 1.0)))
+                score += self._idf.get(t, 0.0) * (f * (self.k1 + 1) / (denom or 1.0))
+            if score > 0:
+                results.append(ScoredChunk(chunk=ch, score=score))
+        results.sort(key=lambda x: x.score, reverse=True)
+        return results[: max(1, k)]
+
+
+def base_chunks(kb_path: str):
+    from ai.rag.loader import Chunk, load_kb_chunks
+
+    if kb_path and os.path.exists(kb_path):
+        return load_kb_chunks(kb_path)
+    print(f"KB {kb_path} tidak ada, pakai teks contoh bawaan benchmark")
+    return [Chunk(id=f"kb:{i}", text=s) for i, s in enumerate(_FALLBACK_TEXT.split(". "))]
+
+
+def synthetic_chunks(base, size: int, *, seed: int = 0):
+    """`base` + chunk sintetis (kosakata KB, frekuensi Zipf) sampai `size` chunk."""
+    from ai.rag.loader import Chunk
+    from ai.rag.vector_store import _tokenize
+
+    counts: Dict[str, int] = {}
+    for ch in base:
+        for t in _tokenize(ch.text):
+            counts[t] = counts.get(t, 0) + 1
+    vocab = sorted(counts, key=lambda t: -counts[t])
+    # kosakata tambahan biar KB besar tidak cuma berisi kata yang sama
+    vocab += [f"istilah{i}" for i in range(max(0, 20000 - len(vocab)))]
+    weights = [1.0 / (r + 1) for r in range(len(vocab))]
+
+    rng = random.Random(seed)
+    out = list(base)
+    while len(out) < size:
+        n_words = rng.randint(40, 110)
+        out.append(Chunk(id=f"syn:{len(out)}", text=" ".join(rng.choices(vocab, weights, k=n_words))))
+    return out[:max(size, len(base))]
+
+
+def _bench(index, repeat: int):
+    timings = []
+    for _ in range(max(1, repeat)):
+        for q in QUERIES:
+            t0 = time.perf_counter()
+            index.search(q, k=4)
+            timings.append(time.perf_counter() - t0)
+    out = latency_summary(timings)
+    out["queries_per_s"] = round(len(timings) / sum(timings), 1) if sum(timings) else 0.0
+    return out
+
+
+def _build_measured(factory, chunks):
+    """(index, detik build, MB memori yang dipegang index)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    index = factory(chunks)
+    build_s = time.perf_counter() - t0
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return index, build_s, round(held / (1024 * 1024), 2)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--kb", default=os.getenv("RAG_KB_PATH", os.path.join(BASE_DIR, "ai-chat", "chatbot.txt")))
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--backends", default="bm25,compact")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--no-legacy", action="store_true", help="jangan ukur cara lama (lambat di KB besar)")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.vector_store import INDEX_BACKENDS
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    base = base_chunks(args.kb)
+    sizes = [len(base)] + [int(s) for s in args.sizes.split(",") if s.strip() and int(s) > len(base)]
+
+    results = {"queries": len(QUERIES), "repeat": args.repeat, "sizes": {}}
+    for size in sizes:
+        chunks = synthetic_chunks(base, size)
+        row = {"chunks": len(chunks)}
+        indexes = {}
+        for name in backends:
+            index, build_s, index_mb = _build_measured(INDEX_BACKENDS[name], chunks)
+            indexes[name] = index
+            row[name] = {"build_s": round(build_s, 3), "index_mb": index_mb, "search": _bench(index, args.repeat)}
+        if not args.no_legacy:
+            legacy, build_s, index_mb = _build_measured(_LegacyBM25, chunks)
+            indexes["legacy"] = legacy
+            row["legacy"] = {"build_s": round(build_s, 3), "index_mb": index_mb, "search": _bench(legacy, args.repeat)}
+
+        ref_name = next(iter(indexes))
+        for q in QUERIES:
+            ref = [(h.chunk.id, h.score) for h in indexes[ref_name].search(q, k=4)]
+            for name, index in indexes.items():
+                if [(h.chunk.id, h.score) for h in index.search(q, k=4)] != ref:
+                    raise SystemExit(f"Hasil search {name} beda dengan {ref_name} untuk query {q!r}")
+
+        results["sizes"][str(len(chunks))] = row
+        for name in indexes:
+            r = row[name]
+            print(
+                f"{len(chunks):>7d} chunk  {name:8s} build {r['build_s']:6.2f} s  index {r['index_mb']:8.2f} MB  "
+                f"search p50 {r['search']['p50_ms']:8.3f} ms  {r['search']['queries_per_s']:8.1f} q/s"
+            )
+        del indexes
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    path = write_results("rag_search", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark pemilihan kalimat kunci di EcoSeaRAG._generate.
+
+Membandingkan dua cara mengambil kalimat kunci dari top-k chunk hasil search:
+- legacy     : gabung teks konteks, pecah kalimat + regex + skor keyword tiap request
+               (`_extract_key_sentences`).
+- precomputed: kalimat + skor sudah dihitung per chunk saat index dibuat
+               (`Chunk.sentences`), tiap request tinggal digabung (`_pick_key_sentences`).
+
+Hasil kedua cara dicek harus sama persis untuk semua pertanyaan di QUERIES.
+
+Contoh:
+    python -m benchmarks.rag_sentences --chunks 10000 --repeat 200
+"""
+
+import argparse
+import os
+import random
+import time
+
+from benchmarks._common import BASE_DIR, latency_summary, write_results
+from benchmarks.rag_search import QUERIES, base_chunks, synthetic_chunks
+
+
+def punctuated_chunks(base, size: int, *, seed: int = 0):
+    """Chunk sintetis dengan kalimat bertitik (sebagian chunk terpotong di tengah kalimat)."""
+    from ai.rag.loader import KEY_SENTENCE_KEYWORDS, Chunk
+
+    rng = random.Random(seed)
+    out = []
+    for ch in synthetic_chunks(base, size, seed=seed):
+        if not ch.id.startswith("syn:"):
+            out.append(ch)
+            continue
+        words = ch.text.split()
+        parts, i = [], 0
+        while i < len(words):
+            n = rng.randint(6, 22)
+            sent = words[i:i + n]
+            if rng.random() < 0.4:
+                sent.insert(rng.randint(0, len(sent)), rng.choice(KEY_SENTENCE_KEYWORDS))
+            parts.append(" ".join(sent).capitalize() + rng.choice(".!?"))
+            i += n
+        text = " ".join(parts)
+        if rng.random() < 0.3:
+            text = text[:-1]  # chunk berhenti di tengah kalimat
+        out.append(Chunk(id=ch.id, text=text))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, default=10000)
+    ap.add_argument("--top-k", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    from ai.rag.rag_engine import _extract_key_sentences, _pick_key_sentences
+    from ai.rag.vector_store import build_index
+
+    base = base_chunks(os.getenv("RAG_KB_PATH", os.path.join(BASE_DIR, "ai-chat", "chatbot.txt")))
+    chunks = punctuated_chunks(base, args.chunks)
+    index = build_index(chunks, backend="compact")
+
+    t0 = time.perf_counter()
+    for ch in chunks:
+        ch.sentences
+    precompute_s = time.perf_counter() - t0
+
+    hits = [[h.chunk for h in index.search(q, k=args.top_k)] for q in QUERIES]
+    for q, hs in zip(QUERIES, hits):
+        legacy = _extract_key_sentences([c.text for c in hs])
+        fast = _pick_key_sentences([c.sentences for c in hs])
+        if legacy != fast:
+            raise SystemExit(f"hasil beda untuk {q!r}:\n  legacy {legacy}\n  precomputed {fast}")
+
+    results = {"chunks": len(chunks), "top_k": args.top_k, "precompute_s": round(precompute_s, 3), "modes": {}}
+    modes = (
+        ("legacy", lambda hs: _extract_key_sentences([c.text for c in hs])),
+        ("precomputed", lambda hs: _pick_key_sentences([c.sentences for c in hs])),
+    )
+    for name, fn in modes:
+        timings = []
+        for _ in range(args.repeat):
+            for hs in hits:
+                t = time.perf_counter()
+                fn(hs)
+                timings.append(time.perf_counter() - t)
+        summary = latency_summary(timings)
+        results["modes"][name] = summary
+        print(f"{name:12s} p50 {summary['p50_ms']:8.4f} ms  p99 {summary['p99_ms']:8.4f} ms")
+
+    print(f"precompute kalimat {len(chunks)} chunk: {precompute_s:.2f} s (sekali, saat index dibuat)")
+    path = write_results("rag_sentences", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark time-to-first-request saat proses app start.
+
+Mode yang dibandingkan (masing-masing di proses Python baru):
+
+- eager : perilaku lama, model di-load sinkron sebelum app bisa melayani request.
+- lazy  : model tidak di-load sama sekali sampai ada yang butuh (AI_WARMUP=0).
+- warmup: model di-load di background thread (default app, AI_WARMUP=1).
+
+Untuk tiap mode dicatat waktu sampai request pertama (`GET /`) selesai, dan
+untuk eager/warmup juga waktu sampai model siap.
+
+Contoh:
+    python -m benchmarks.startup --runs 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks._common import BASE_DIR, write_results
+
+MODES = ("eager", "lazy", "warmup")
+
+
+def _child(mode: str) -> None:
+    t0 = float(os.environ["BENCH_T0"])
+    os.environ["AI_WARMUP"] = "1" if mode == "warmup" else "0"
+
+    from app import app
+    from ai.predict import get_model, model_status
+
+    if mode == "eager":
+        get_model()
+
+    client = app.test_client()
+    res = client.get("/")
+    first_request = time.time() - t0
+
+    model_ready = None
+    if mode in ("eager", "warmup"):
+        while not model_status()["ready"] and model_status()["state"] != "error":
+            time.sleep(0.01)
+        model_ready = time.time() - t0
+
+    print(json.dumps({
+        "mode": mode,
+        "status_code": res.status_code,
+        "first_request_s": round(first_request, 3),
+        "model_ready_s": round(model_ready, 3) if model_ready is not None else None,
+        "model_state": model_status()["state"],
+    }), flush=True)
+    # Skip teardown interpreter: TF kadang abort kalau di-import dari thread lain.
+    os._exit(0)
+
+
+def _run_once(mode: str) -> dict:
+    env = dict(os.environ)
+    env["BENCH_T0"] = repr(time.time())
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", mode],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--modes", default=",".join(MODES))
+    ap.add_argument("--out", default="")
+    ap.add_argument("--child", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child)
+        return
+
+    results = {}
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        runs = [_run_once(mode) for _ in range(max(1, args.runs))]
+        first = sorted(r["first_request_s"] for r in runs)
+        ready = sorted(r["model_ready_s"] for r in runs if r["model_ready_s"] is not None)
+        results[mode] = {
+            "runs": runs,
+            "first_request_median_s": first[len(first) // 2],
+            "model_ready_median_s": ready[len(ready) // 2] if ready else None,
+        }
+        print(f"{mode:7s} first request {results[mode]['first_request_median_s']:.3f}s"
+              f"  model ready {results[mode]['model_ready_median_s']}")
+
+    path = write_results("startup", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark backend TFLite (float16 / dynamic / int8) vs Keras.
+
+Tiap backend dijalankan di proses terpisah supaya peak RSS-nya tidak
+tercampur. Yang diukur:
+
+- load   : waktu load model (untuk TFLite termasuk konversi dari .keras,
+           karena file .tflite dibuat di folder sementara).
+- single : latensi batch 1 per gambar.
+- batch  : throughput batch --batch-size.
+- mixed  : throughput batch berukuran acak 1..--batch-size (seperti MicroBatcher).
+- akurasi: label + probabilitas tiap gambar dibandingkan dengan Keras.
+
+Contoh:
+    python -m benchmarks.tflite_backend --repeat 3
+    python -m benchmarks.tflite_backend --backends keras,float16 --threads 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks._common import BASE_DIR, latency_summary, list_images, peak_rss_mb, write_results
+
+
+def _child(backend: str, images: str, tflite_dir: str, threads: int, repeat: int, batch_size: int) -> None:
+    from ai.model_holder import ModelHolder
+    from ai.predict import CLASS_NAMES, IMG_SIZE, MODEL_PATH
+    from ai.preprocess import image_bytes_to_array
+
+    files = list_images(images)
+    arrays = []
+    for p in files:
+        with open(p, "rb") as f:
+            arrays.append(image_bytes_to_array(f.read(), IMG_SIZE))
+
+    options = {"backend": "keras"}
+    if backend != "keras":
+        options = {
+            "backend": "tflite",
+            "tflite_quant": backend,
+            "tflite_threads": threads,
+            "tflite_max_batch": batch_size,
+            "tflite_dir": tflite_dir,
+            "representative_dir": images,
+        }
+    holder = ModelHolder(MODEL_PATH, class_names=CLASS_NAMES, input_shape=IMG_SIZE + (3,), **options)
+
+    t0 = time.perf_counter()
+    model = holder.get()
+    load_s = time.perf_counter() - t0
+    model.predict_on_batch(np.stack(arrays[:1]))
+
+    single = []
+    for _ in range(max(1, repeat)):
+        for a in arrays:
+            t0 = time.perf_counter()
+            model.predict_on_batch(a[None])
+            single.append(time.perf_counter() - t0)
+
+    batch = np.stack([arrays[i % len(arrays)] for i in range(batch_size)])
+    model.predict_on_batch(batch)
+    n_batches = max(3, repeat * 3)
+    t0 = time.perf_counter()
+    for _ in range(n_batches):
+        model.predict_on_batch(batch)
+    batch_s = time.perf_counter() - t0
+
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(1, batch_size + 1, size=max(12, repeat * 12))
+    t0 = time.perf_counter()
+    for n in sizes:
+        model.predict_on_batch(batch[:n])
+    mixed_s = time.perf_counter() - t0
+
+    preds = {}
+    for p, a in zip(files, arrays):
+        pr = model.predict_on_batch(a[None])[0]
+        preds[os.path.basename(p)] = {"label": CLASS_NAMES[int(np.argmax(pr))], "probs": [float(x) for x in pr]}
+
+    size_mb = None
+    path = getattr(model, "path", MODEL_PATH)
+    if os.path.isfile(path):
+        size_mb = round(os.path.getsize(path) / (1024 * 1024), 2)
+
+    out = {
+        "backend": backend,
+        "images": len(files),
+        "model_size_mb": size_mb,
+        "load_s": round(load_s, 3),
+        "single": latency_summary(single),
+        "batch": {
+            "batch_size": batch_size,
+            "images_per_s": round(batch_size * n_batches / batch_s, 2),
+        },
+        "mixed": {
+            "batches": len(sizes),
+            "images_per_s": round(int(sizes.sum()) / mixed_s, 2),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "predictions": preds,
+    }
+    print(json.dumps(out), flush=True)
+    # Skip teardown interpreter: TF kadang abort saat exit.
+    os._exit(0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--images", default=os.path.join(BASE_DIR, "uploads", "laporan"))
+    ap.add_argument("--backends", default="keras,float16,dynamic,int8")
+    ap.add_argument("--threads", type=int, default=0, help="thread interpreter TFLite (0 = default)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--out", default="")
+    ap.add_argument("--child", default="", help=argparse.SUPPRESS)
+    ap.add_argument("--tflite-dir", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child, args.images, args.tflite_dir, args.threads, args.repeat, args.batch_size)
+        return
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if "keras" not in backends:
+        backends.insert(0, "keras")  # referensi akurasi
+
+    tmpdir = tempfile.mkdtemp(prefix="tflite-bench-")
+    results = {}
+    try:
+        for backend in backends:
+            cmd = [sys.executable, "-m", "benchmarks.tflite_backend", "--child", backend,
+                   "--images", args.images, "--tflite-dir", tmpdir, "--threads", str(args.threads),
+                   "--repeat", str(args.repeat), "--batch-size", str(args.batch_size)]
+            out = subprocess.run(cmd, cwd=BASE_DIR, capture_output=True, text=True, check=True)
+            results[backend] = json.loads(out.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    ref = results["keras"]["predictions"]
+    for backend in backends:
+        r = results[backend]
+        preds = r.pop("predictions")
+        changed = sorted(n for n in ref if preds[n]["label"] != ref[n]["label"])
+        max_diff = max(
+            (abs(a - b) for n in ref for a, b in zip(ref[n]["probs"], preds[n]["probs"])),
+            default=0.0,
+        )
+        r["vs_keras"] = {
+            "same_label": len(ref) - len(changed),
+            "changed": changed,
+            "max_prob_diff": round(max_diff, 6),
+        }
+        print(
+            f"{backend:8s} load {r['load_s']:6.2f} s  p50 {r['single']['p50_ms']:7.2f} ms  "
+            f"p99 {r['single']['p99_ms']:7.2f} ms  batch {r['batch']['images_per_s']:7.1f} img/s  "
+            f"mixed {r['mixed']['images_per_s']:7.1f} img/s  "
+            f"RSS {r['peak_rss_mb']} MB  label sama {len(ref) - len(changed)}/{len(ref)}  "
+            f"selisih prob maks {max_diff:.4f}"
+        )
+
+    path = write_results("tflite_backend", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark memori per worker: build per worker (lazy) vs preload di master sebelum fork.
+
+Tiap kombinasi (mode, jumlah worker) dijalankan di proses Python baru yang
+meniru gunicorn prefork: proses master membuat app, lalu fork N worker.
+- lazy   : tiap worker membangun engine RAG (dan model) sendiri saat dipakai.
+- preload: master memanggil preload() dulu (APP_PRELOAD=1), worker mewarisi.
+
+Setelah semua worker menjawab beberapa pertanyaan chat (dan klasifikasi foto
+dummy kalau --model), memori tiap worker dibaca dari /proc/<pid>/smaps_rollup:
+RSS, PSS (halaman yang dibagi dihitung proporsional) dan USS (halaman privat).
+Total PSS master + worker adalah perkiraan memori yang benar-benar dipakai.
+
+Contoh:
+    python -m benchmarks.workers_memory --workers 1,4,8 --chunks 50000
+    python -m benchmarks.workers_memory --model   # + classifier backend tflite
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._common import BASE_DIR, write_results
+from benchmarks.rag_answer import make_kb
+from benchmarks.rag_search import QUERIES
+
+
+def smaps_mb(pid: int) -> dict:
+    """RSS / PSS / USS proses dari /proc/<pid>/smaps_rollup (Linux)."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "uss_mb": round(uss / 1024, 1),
+    }
+
+
+def _worker(app, with_model: bool, ready, done) -> None:
+    import numpy as np
+
+    from ai.rag.rag_engine import answer_question
+
+    with app.app_context():
+        for q in QUERIES:
+            answer_question(q)
+    if with_model:
+        from ai.predict import IMG_SIZE, predict_batch
+
+        predict_batch(np.zeros((1,) + IMG_SIZE + (3,), dtype=np.float32))
+    ready.wait()  # semua worker siap -> master mengukur
+    done.wait()   # master selesai mengukur
+    os._exit(0)
+
+
+def _child(mode: str, workers: int, with_model: bool) -> None:
+    from flask import Flask
+
+    from config import Config
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+
+    if mode == "preload":
+        from preload import preload
+
+        preload(app)
+
+    ctx = multiprocessing.get_context("fork")
+    ready = ctx.Barrier(workers + 1)
+    done = ctx.Barrier(workers + 1)
+    procs = [ctx.Process(target=_worker, args=(app, with_model, ready, done)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    per_worker = [smaps_mb(p.pid) for p in procs]
+    master = smaps_mb(os.getpid())
+    done.wait()
+    for p in procs:
+        p.join()
+
+    def mean(key):
+        return round(sum(w[key] for w in per_worker) / len(per_worker), 1)
+
+    print(json.dumps({
+        "mode": mode,
+        "workers": workers,
+        "master": master,
+        "per_worker": {k: mean(k) for k in ("rss_mb", "pss_mb", "uss_mb")},
+        "total_pss_mb": round(master["pss_mb"] + sum(w["pss_mb"] for w in per_worker), 1),
+    }), flush=True)
+    os._exit(0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", default="1,4,8")
+    ap.add_argument("--modes", default="lazy,preload")
+    ap.add_argument("--chunks", type=int, default=50000)
+    ap.add_argument("--backend", default="compact", help="RAG_INDEX_BACKEND")
+    ap.add_argument("--model", action="store_true", help="ikut load classifier (AI_BACKEND=tflite)")
+    ap.add_argument("--out", default="")
+    ap.add_argument("--child", default="", help=argparse.SUPPRESS)
+    ap.add_argument("--n", type=int, default=1, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child, args.n, args.model)
+        return
+
+    folder = tempfile.mkdtemp(prefix="workers-memory-")
+    results = {"chunks": args.chunks, "backend": args.backend, "model": args.model, "runs": []}
+    try:
+        env = dict(os.environ)
+        env.update({
+            "RAG_KB_PATH": make_kb(folder, args.chunks),
+            "RAG_INDEX_BACKEND": args.backend,
+            "RAG_INDEX_DIR": "",
+            "RAG_RELOAD_SECONDS": "0",
+            "AI_WARMUP": "0",
+        })
+        if args.model:
+            env["AI_BACKEND"] = "tflite"
+        for n in [int(x) for x in args.workers.split(",") if x.strip()]:
+            for mode in [m for m in args.modes.split(",") if m]:
+                cmd = [sys.executable, "-m", "benchmarks.workers_memory", "--child", mode, "--n", str(n)]
+                if args.model:
+                    cmd.append("--model")
+                out = subprocess.run(cmd, cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True)
+                res = json.loads(out.stdout.strip().splitlines()[-1])
+                results["runs"].append(res)
+                w = res["per_worker"]
+                print(f"{n} worker  {mode:8s} per worker RSS {w['rss_mb']:7.1f} MB  PSS {w['pss_mb']:7.1f} MB  "
+                      f"USS {w['uss_mb']:7.1f} MB  total PSS {res['total_pss_mb']:8.1f} MB")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    path = write_results("workers_memory", results, out_path=args.out)
+    print(f"hasil disimpan di {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Perintah CLI Flask untuk maintenance (jalankan: `flask --app app <perintah>`)."""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, inspect, or_, text, update
+
+from extensions import db
+from models import KlasifikasiJob, Laporan, PrediksiCache
+
+
+def _decode_for_pool(args) -> Optional[np.ndarray]:
+    """Dipanggil di proses pool: baca + decode + resize satu foto."""
+    path, draft = args
+    from ai.predict import IMG_SIZE
+    from ai.preprocess import image_bytes_to_array
+
+    try:
+        with open(path, "rb") as f:
+            return image_bytes_to_array(f.read(), IMG_SIZE, draft=draft)
+    except (OSError, ValueError):
+        return None
+
+
+def _pending_rows(version: str, after_id: int, limit: int, force_before: Optional[int]):
+    """Laporan (id, foto) yang labelnya belum dibuat oleh `version`, urut id (keyset)."""
+    q = (
+        db.session.query(Laporan.id, Laporan.foto)
+        .outerjoin(KlasifikasiJob, KlasifikasiJob.laporan_id == Laporan.id)
+        .filter(Laporan.id > after_id)
+    )
+    if force_before is None:
+        q = q.filter(or_(KlasifikasiJob.model_version.is_(None), KlasifikasiJob.model_version != version))
+    else:
+        q = q.filter(Laporan.id <= force_before)
+    return q.order_by(Laporan.id).limit(limit).all()
+
+
+def _write_results(version: str, results, failed) -> None:
+    """Tulis hasil satu chunk dengan bulk UPDATE/INSERT, lalu commit."""
+    now = db.func.now()
+    if results:
+        db.session.execute(
+            update(Laporan),
+            [{"id": lid, "ai_label": label, "ai_confidence": conf} for lid, label, conf in results],
+        )
+
+    records = [(lid, "done", None) for lid, _, _ in results]
+    records += [(lid, "failed", err) for lid, err in failed]
+    if not records:
+        db.session.commit()
+        return
+
+    ids = [lid for lid, _, _ in records]
+    existing = {
+        lid for (lid,) in
+        db.session.query(KlasifikasiJob.laporan_id).filter(KlasifikasiJob.laporan_id.in_(ids)).all()
+    }
+
+    table = KlasifikasiJob.__table__
+    to_update = [
+        {"b_laporan_id": lid, "b_status": status, "b_error": err}
+        for lid, status, err in records if lid in existing
+    ]
+    if to_update:
+        db.session.execute(
+            table.update()
+            .where(table.c.laporan_id == bindparam("b_laporan_id"))
+            .values(
+                status=bindparam("b_status"),
+                error=bindparam("b_error"),
+                model_version=version,
+                updated_at=now,
+            ),
+            to_update,
+        )
+
+    to_insert = [
+        {"laporan_id": lid, "status": status, "error": err, "attempts": 0, "model_version": version}
+        for lid, status, err in records if lid not in existing
+    ]
+    if to_insert:
+        db.session.execute(table.insert(), to_insert)
+
+    db.session.commit()
+
+
+@click.command("ai-reclassify")
+@click.option("--chunk-size", default=256, show_default=True, help="Jumlah laporan per chunk (per commit).")
+@click.option("--batch-size", default=32, show_default=True, help="Ukuran batch inferensi.")
+@click.option("--workers", default=0, help="Jumlah proses decode (default: jumlah CPU).")
+@click.option("--limit", default=0, help="Berhenti setelah N laporan (0 = semua).")
+@click.option("--force", is_flag=True, help="Klasifikasi ulang semua laporan, termasuk yang sudah versi terbaru.")
+@click.option("--after-id", default=0, help="Mulai dari laporan dengan id > nilai ini (lanjutkan run --force).")
+@with_appcontext
+def reclassify_command(chunk_size, batch_size, workers, limit, force, after_id):
+    """Hitung ulang ai_label/ai_confidence semua laporan dengan model aktif.
+
+    Laporan diproses per chunk (urut id) dan tiap chunk langsung di-commit
+    bersama versi model di klasifikasi_job. Kalau proses terhenti, jalankan
+    lagi perintah yang sama: laporan yang sudah punya label dari versi model
+    ini otomatis dilewati. Dengan --force semua laporan memang diproses ulang,
+    jadi lanjutkan dengan `--force --after-id <id>`: id terakhir yang sudah
+    di-commit dicetak di log tiap chunk ("s/d laporan #<id>").
+    """
+    from ai.predict import active_model, predict_batch
+
+    # Pegang satu versi model untuk seluruh run, walaupun ada swap di tengah jalan.
+    holder = active_model()
+    class_names = holder.class_names
+    version = holder.version
+    folder = current_app.config["UPLOAD_FOLDER"]
+    # Mode decode sama dengan yang tercatat di versi (holder.version).
+    draft = holder.jpeg_draft
+    workers = workers or os.cpu_count() or 1
+    batch_size = max(1, batch_size)
+
+    # --force dibatasi ke laporan yang sudah ada saat mulai; laporan baru
+    # sudah diklasifikasi worker dengan model yang sama.
+    force_before = db.session.query(db.func.max(Laporan.id)).scalar() if force else None
+
+    click.echo(f"Model {version}; {workers} proses decode, batch {batch_size}, chunk {chunk_size}")
+    holder.get()
+
+    done = 0
+    failed_total = 0
+    after_id = max(0, after_id)
+    t_start = time.perf_counter()
+    # "spawn": proses decode tidak ikut mewarisi state TensorFlow dari proses ini.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        while True:
+            take = chunk_size if not limit else min(chunk_size, limit - done)
+            if take <= 0:
+                break
+            rows = _pending_rows(version, after_id, take, force_before)
+            if not rows:
+                break
+            after_id = rows[-1].id
+
+            jobs = [(os.path.join(folder, r.foto or ""), draft) for r in rows]
+            arrays = list(pool.map(_decode_for_pool, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+            ok = [(r.id, a) for r, a in zip(rows, arrays) if a is not None]
+            failed = [(r.id, "foto tidak bisa dibaca") for r, a in zip(rows, arrays) if a is None]
+
+            results = []
+            for i in range(0, len(ok), batch_size):
+                part = ok[i:i + batch_size]
+                preds = predict_batch(np.stack([a for _, a in part]), holder=holder)
+                for (lid, _), p in zip(part, preds):
+                    idx = int(np.argmax(p))
+                    results.append((lid, class_names[idx], round(float(p[idx]), 4)))
+
+            _write_results(version, results, failed)
+            db.session.expunge_all()
+
+            done += len(rows)
+            failed_total += len(failed)
+            elapsed = time.perf_counter() - t_start
+            click.echo(
+                f"  s/d laporan #{after_id}: {done} diproses ({failed_total} gagal), "
+                f"{done / elapsed:.1f} gambar/detik"
+            )
+
+    elapsed = time.perf_counter() - t_start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    click.echo(f"Selesai: {done} laporan, {failed_total} gagal, {elapsed:.1f} s ({rate:.1f} gambar/detik)")
+
+
+@click.command("ai-convert-tflite")
+@click.option("--quant", default="", help="float16 / dynamic / int8 (default: AI_TFLITE_QUANT).")
+@with_appcontext
+def convert_tflite_command(quant):
+    """Konversi model aktif ke .tflite sekarang (biasanya dibuat otomatis saat load pertama)."""
+    from ai.predict import active_model
+    from ai.tflite_backend import QUANT_MODES
+
+    quant = quant or current_app.config.get("AI_TFLITE_QUANT", "float16")
+    if quant not in QUANT_MODES:
+        raise click.BadParameter(f"pilih salah satu: {', '.join(QUANT_MODES)}", param_hint="--quant")
+
+    active = active_model()
+    holder = type(active)(
+        active.model_path,
+        class_names=active.class_names,
+        name=active.name,
+        registry_version=active.registry_version,
+        input_shape=active.input_shape,
+        backend="tflite",
+        tflite_quant=quant,
+        tflite_threads=active.tflite_threads,
+        tflite_dir=current_app.config.get("AI_TFLITE_DIR") or "",
+        representative_dir=current_app.config["UPLOAD_FOLDER"],
+    )
+    t0 = time.perf_counter()
+    model = holder.get()
+    click.echo(f"{model.path} ({os.path.getsize(model.path) / (1024 * 1024):.1f} MB, {time.perf_counter() - t0:.1f} s)")
+
+
+# Kolom yang ditambahkan setelah tabelnya mungkin sudah dibuat di database lama.
+# create(checkfirst=True) tidak mengubah tabel yang sudah ada, jadi ditambah di sini.
+_ADDED_COLUMNS = (
+    (KlasifikasiJob.__table__, "model_version"),
+)
+
+
+def _add_missing_column(table, name: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN (+ index kolom itu) kalau kolomnya belum ada."""
+    if name in {c["name"] for c in inspect(db.engine).get_columns(table.name)}:
+        return False
+
+    column = table.c[name]
+    quote = db.engine.dialect.identifier_preparer.quote
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+            f"{column.type.compile(dialect=db.engine.dialect)}"
+        ))
+    for index in table.indexes:
+        if [c.name for c in index.columns] == [name]:
+            index.create(bind=db.engine, checkfirst=True)
+    return True
+
+
+@click.command("ai-init-db")
+@with_appcontext
+def init_db_command():
+    """Buat / upgrade tabel fitur AI (klasifikasi_job, prediksi_cache).
+
+    Jalankan saat deploy, sebelum worker start. Aman diulang: tabel yang
+    sudah ada tidak dibuat ulang, hanya ditambah kolom yang belum ada
+    (mis. klasifikasi_job.model_version untuk ai-reclassify).
+    """
+    for table in (KlasifikasiJob.__table__, PrediksiCache.__table__):
+        table.create(bind=db.engine, checkfirst=True)
+        click.echo(f"Tabel {table.name} siap")
+
+    for table, name in _ADDED_COLUMNS:
+        if _add_missing_column(table, name):
+            click.echo(f"Kolom {table.name}.{name} ditambahkan")
+
+
+def init_app(app) -> None:
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(reclassify_command)
+    app.cli.add_command(convert_tflite_command)
@@ -19,9 +19,89 @@ class Config:
     UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads", "laporan")
     PROFILE_UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads", "profile")
 
+    # Knowledge base chatbot: satu file, atau folder berisi dokumen .txt/.md
     RAG_KB_PATH = os.getenv("RAG_KB_PATH", os.path.join(BASE_DIR, "ai-chat", "chatbot.txt"))
 
     RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
 
     RAG_CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "650"))
-    RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "120"))
\ No newline at end of file
+    RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "120"))
+    # Backend index in-memory: "bm25" (dict Python) atau "compact" (CSR SciPy, hemat memori untuk
+    # KB besar). Tidak dipakai kalau RAG_INDEX_DIR diisi: index tersimpan selalu compact.
+    RAG_INDEX_BACKEND = os.getenv("RAG_INDEX_BACKEND", "bm25")
+    # Parameter BM25: k1 = saturasi frekuensi kata, b = normalisasi panjang chunk
+    # (cari nilai terbaik dengan benchmarks/rag_eval.py)
+    RAG_BM25_K1 = float(os.getenv("RAG_BM25_K1", "1.5"))
+    RAG_BM25_B = float(os.getenv("RAG_BM25_B", "0.75"))
+    # Opsional: folder index RAG tersimpan (compact, di-mmap & dibagi antar worker, mis.
+    # ai-chat/index). Dibuat ulang otomatis kalau isi KB / RAG_CHUNK_SIZE / RAG_CHUNK_OVERLAP
+    # berubah. Kosong (default) = index dibangun di memori dengan RAG_INDEX_BACKEND.
+    RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", "")
+    # Cek perubahan RAG_KB_PATH tiap N detik dan reload index di background (0 = mati)
+    RAG_RELOAD_SECONDS = float(os.getenv("RAG_RELOAD_SECONDS", "5"))
+    # Cache LRU + TTL hasil retrieval / jawaban chat per worker (0 = mati)
+    RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "1024"))
+    RAG_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", "600"))
+    # Retriever: "bm25" (token persis) atau "hybrid" (BM25 + vektor n-gram karakter, digabung
+    # dengan reciprocal rank fusion; lebih tahan variasi ejaan seperti "numpuk"/"menumpuk").
+    RAG_RETRIEVER = os.getenv("RAG_RETRIEVER", "bm25")
+    RAG_DENSE_DIM = int(os.getenv("RAG_DENSE_DIM", "256"))
+    # Cosine minimum hit dense yang ikut digabung (hit dense dipakai hanya kalau BM25 juga menemukan chunk)
+    RAG_DENSE_MIN_SCORE = float(os.getenv("RAG_DENSE_MIN_SCORE", "0.2"))
+    RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+    # Gazetteer intent + nama pantai lokal untuk jawaban chat (JSON; kosong = ai/rag/gazetteer.json)
+    RAG_GAZETTEER_PATH = os.getenv("RAG_GAZETTEER_PATH", "")
+    # Riwayat chat per user disimpan di server (per worker): LRU antar user, N giliran
+    # terakhir per user, kedaluwarsa setelah TTL detik tidak aktif. Client cukup kirim pesan baru.
+    RAG_MEMORY_MAX_USERS = int(os.getenv("RAG_MEMORY_MAX_USERS", "10000"))
+    RAG_MEMORY_MAX_TURNS = int(os.getenv("RAG_MEMORY_MAX_TURNS", "6"))
+    RAG_MEMORY_TTL = float(os.getenv("RAG_MEMORY_TTL", "1800"))
+    RAG_MEMORY_MAX_CHARS = int(os.getenv("RAG_MEMORY_MAX_CHARS", "1000"))
+    # Jumlah pertanyaan user sebelumnya yang digabung ke query retrieval pertanyaan lanjutan
+    RAG_HISTORY_TURNS = int(os.getenv("RAG_HISTORY_TURNS", "2"))
+    # Maksimum pertanyaan per request POST /api/chat/batch (admin)
+    RAG_BATCH_MAX_QUESTIONS = int(os.getenv("RAG_BATCH_MAX_QUESTIONS", "500"))
+
+    # Bangun index RAG + model (backend tflite) di proses master sebelum fork gunicorn,
+    # dibagi copy-on-write ke semua worker. Lihat preload.py dan gunicorn.conf.py.
+    APP_PRELOAD = os.getenv("APP_PRELOAD", "0") == "1"
+
+    # Classifier (ai/predict.py): warm-up model di background thread saat app start.
+    AI_WARMUP = os.getenv("AI_WARMUP", "1") == "1"
+
+    # Micro-batching inferensi: gabung request sampai N gambar atau T ms.
+    # AI_BATCH_MAX_SIZE=1 mematikan batching (inferensi langsung per gambar).
+    AI_BATCH_MAX_SIZE = int(os.getenv("AI_BATCH_MAX_SIZE", "8"))
+    AI_BATCH_MAX_WAIT_MS = float(os.getenv("AI_BATCH_MAX_WAIT_MS", "5"))
+
+    # Klasifikasi laporan di background (ai/jobs.py). AI_ASYNC=0 -> klasifikasi langsung di request.
+    # Tabel job dibuat dengan `flask --app app ai-init-db` (sekali saat deploy).
+    AI_ASYNC = os.getenv("AI_ASYNC", "1") == "1"
+    AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "2"))
+    AI_JOB_MAX_RETRIES = int(os.getenv("AI_JOB_MAX_RETRIES", "3"))
+    AI_JOB_RETRY_DELAY = float(os.getenv("AI_JOB_RETRY_DELAY", "5"))
+    AI_JOB_STALE_SECONDS = int(os.getenv("AI_JOB_STALE_SECONDS", "600"))
+
+    # Cache prediksi per isi foto: LRU di memori + tabel prediksi_cache (flask ai-init-db).
+    AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "2048"))
+    AI_CACHE_PERSIST = os.getenv("AI_CACHE_PERSIST", "1") == "1"
+
+    # Decode JPEG langsung di skala kecil (DCT scaling, minimal 2x 224x224) sebelum
+    # resize. Jauh lebih cepat untuk foto kamera beberapa megapiksel; label sama,
+    # tapi probabilitasnya bisa sedikit beda dari decode penuh, jadi mode ini ikut
+    # versi model (key cache + klasifikasi_job.model_version). 0 = decode penuh.
+    AI_JPEG_DRAFT = os.getenv("AI_JPEG_DRAFT", "1") == "1"
+
+    # Registry model: ai/models/<versi>/ (model.keras + class_names.json).
+    # AI_MODEL_VERSION kosong -> pakai file ai/models/ACTIVE, kalau tidak ada "default".
+    AI_MODELS_DIR = os.getenv("AI_MODELS_DIR", os.path.join(BASE_DIR, "ai", "models"))
+    AI_MODEL_VERSION = os.getenv("AI_MODEL_VERSION", "")
+    AI_MODEL_POLL_SECONDS = float(os.getenv("AI_MODEL_POLL_SECONDS", "5"))
+
+    # Backend inferensi: "keras" atau "tflite" (model dikonversi sekali, lalu
+    # jalan di interpreter TFLite). AI_TFLITE_QUANT: float16 / dynamic / int8.
+    AI_BACKEND = os.getenv("AI_BACKEND", "keras")
+    AI_TFLITE_QUANT = os.getenv("AI_TFLITE_QUANT", "float16")
+    AI_TFLITE_THREADS = int(os.getenv("AI_TFLITE_THREADS", "0"))  # 0 = default interpreter
+    # Folder hasil konversi .tflite (artefak build, di-.gitignore)
+    AI_TFLITE_DIR = os.getenv("AI_TFLITE_DIR", os.path.join(BASE_DIR, "ai", "tflite"))
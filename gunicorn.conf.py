@@ -0,0 +1,23 @@
+# Konfigurasi gunicorn (dibaca otomatis dari working directory).
+#   APP_PRELOAD=1 gunicorn -w 4 app:app
+# APP_PRELOAD=1 -> app di-import di master (index RAG + model dibangun sekali, lihat
+# preload.py), lalu worker di-fork dan berbagi memori itu copy-on-write.
+import os
+
+preload_app = os.getenv("APP_PRELOAD", "0") == "1"
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import app
+        from preload import after_fork
+
+        after_fork(app)
+
+
+def post_worker_init(worker):
+    # Dengan atau tanpa preload: job klasifikasi yang tertunda dipulihkan di worker, bukan di master.
+    from app import app
+    from preload import worker_start
+
+    worker_start(app)
@@ -35,6 +35,36 @@ class Laporan(db.Model):
     ai_confidence = db.Column(db.Float)       
 
 
+class KlasifikasiJob(db.Model):
+    """Antrean klasifikasi AI untuk foto laporan (diproses di background)."""
+    __tablename__ = 'klasifikasi_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    laporan_id = db.Column(db.Integer, db.ForeignKey('laporan.id'), nullable=False, unique=True, index=True)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    model_version = db.Column(db.String(64), index=True)  # versi model yang menghasilkan ai_label
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    laporan = db.relationship('Laporan', backref=db.backref('klasifikasi_job', uselist=False), lazy=True)
+
+
+class PrediksiCache(db.Model):
+    """Cache hasil klasifikasi per isi foto (sha256) + versi model."""
+    __tablename__ = 'prediksi_cache'
+    __table_args__ = (db.UniqueConstraint('digest', 'model_version', name='uq_prediksi_digest_model'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), nullable=False)
+    model_version = db.Column(db.String(64), nullable=False)
+    label = db.Column(db.String(20), nullable=False)
+    confidence = db.Column(db.Float, nullable=False)
+    probs = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class Berita(db.Model):
     __tablename__ = 'berita'
 
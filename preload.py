@@ -0,0 +1,81 @@
+"""Mode preload untuk deployment multi-worker (gunicorn --preload / APP_PRELOAD=1).
+
+Index RAG dan model classifier dibangun sekali di proses master sebelum fork,
+jadi halaman memorinya dibagi copy-on-write ke semua worker, bukan dibangun
+ulang di tiap worker.
+
+Catatan:
+- Index "compact" (array NumPy, atau di-mmap dari RAG_INDEX_DIR) paling awet
+  dibagi; index "bm25" berisi jutaan objek Python yang refcount-nya berubah
+  saat dibaca, jadi halamannya pelan-pelan ter-copy di tiap worker.
+- Runtime TensorFlow (backend keras) tidak aman dipakai setelah fork (worker
+  hang saat inferensi), jadi model keras tidak di-load di master: tiap worker
+  warm-up sendiri setelah fork (lihat gunicorn.conf.py). Backend tflite aman
+  dan ikut di-preload.
+
+`worker_start` dijalankan di tiap worker (dengan atau tanpa preload) sebelum
+mulai melayani request: pekerjaan yang butuh thread / DB, seperti memulihkan
+job klasifikasi, tidak dijalankan saat app di-import.
+"""
+
+import gc
+import logging
+import time
+
+from ai.jobs import classification_queue
+from ai.predict import active_model, registry, warmup
+from ai.rag.rag_engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def preload(app) -> dict:
+    """Bangun engine RAG + model classifier (tflite) di proses ini. Dipanggil sebelum fork."""
+    out = {}
+    t0 = time.perf_counter()
+    try:
+        with app.app_context():
+            get_engine()
+        out["rag_s"] = round(time.perf_counter() - t0, 3)
+    except Exception as e:
+        # Sama seperti tanpa preload: error-nya muncul di request chat, bukan saat start.
+        logger.warning("Preload engine RAG gagal: %s", e)
+
+    if active_model().backend == "tflite":
+        t0 = time.perf_counter()
+        try:
+            warmup(background=False)
+            out["model_s"] = round(time.perf_counter() - t0, 3)
+        except Exception as e:
+            # Model gagal bukan alasan app gagal start; worker mencoba load lagi saat dipakai.
+            logger.warning("Preload model classifier gagal: %s", e)
+    else:
+        logger.info("Preload: model backend %s di-load per worker setelah fork", active_model().backend)
+
+    # Objek yang sudah ada dipindah ke generasi permanen: GC di worker tidak lagi
+    # menulis header objek-objek ini, jadi halamannya tetap dibagi.
+    gc.collect()
+    gc.freeze()
+    logger.info("Preload selesai: %s", out)
+    return out
+
+
+def after_fork(app) -> None:
+    """Dipanggil di tiap worker setelah fork (hook post_fork gunicorn).
+
+    Model keras yang terlanjur di-load master (mis. oleh kode lain saat import)
+    tidak dipercaya walaupun statusnya ready: dibuang dan di-load ulang di sini.
+    """
+    discarded = registry().after_fork()
+    if discarded:
+        logger.warning("Model %s sudah di-load sebelum fork, di-load ulang di worker", ", ".join(discarded))
+    if app.config.get("AI_WARMUP") and not active_model().is_ready():
+        warmup(background=True)
+
+
+def worker_start(app) -> None:
+    """Dipanggil sekali di tiap worker sebelum melayani request (hook
+    post_worker_init gunicorn, atau server dev di app.py)."""
+    n = classification_queue.start()
+    if n:
+        logger.info("%s job klasifikasi dijadwalkan ulang", n)
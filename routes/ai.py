@@ -0,0 +1,54 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+
+from ai.cache import prediction_cache
+from ai.predict import model_status, registry
+from routes.admin_utils import admin_required
+
+
+ai_bp = Blueprint("ai", __name__)
+
+
+@ai_bp.route("/ai/status", methods=["GET"])
+def ai_status():
+    """Readiness classifier. 503 selama model belum siap (buat health check)."""
+    status = model_status()
+    return jsonify({
+        "model": status,
+        "cache": prediction_cache.stats(),
+    }), (200 if status["ready"] else 503)
+
+
+# ===============================
+# REGISTRY MODEL (ADMIN)
+# ===============================
+@ai_bp.route("/ai/models", methods=["GET"])
+@jwt_required()
+@admin_required
+def list_models():
+    return jsonify(registry().status()), 200
+
+
+@ai_bp.route("/ai/models/<version>/activate", methods=["POST"])
+@jwt_required()
+@admin_required
+def activate_model(version):
+    """Load + warm-up versi baru di background, lalu swap. Cek progresnya di GET /ai/models."""
+    try:
+        registry().activate(version, background=True)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 404
+
+    return jsonify({"message": f"Aktivasi model {version} dimulai", **registry().status()}), 202
+
+
+@ai_bp.route("/ai/models/rollback", methods=["POST"])
+@jwt_required()
+@admin_required
+def rollback_model():
+    try:
+        version = registry().rollback()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 409
+
+    return jsonify({"message": f"Model dikembalikan ke {version}", **registry().status()}), 200
@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify
+import json
+
+from flask import Blueprint, Response, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from ai.rag.rag_engine import answer_question
+from ai.rag.conversation import get_conversations
+from ai.rag.rag_engine import answer_many, answer_question, get_engine, stream_answer
+from routes.admin_utils import admin_required
 
 
 chat_bp = Blueprint("chat", __name__)
@@ -10,19 +14,20 @@ chat_bp = Blueprint("chat", __name__)
 @chat_bp.route("/chat", methods=["POST"])
 @jwt_required()
 def chat():
-    # identity saat ini tidak dipakai untuk RAG, tapi tetap wajib login
-    _ = get_jwt_identity()
+    """Body: {"message": "..."}. Riwayat percakapan disimpan di server per user
+    (field `history` dari client lama diabaikan)."""
+    user_id = get_jwt_identity()
 
     data = request.get_json(silent=True) or {}
 
     user_message = (data.get("message") or "").strip()
-    history = data.get("history", [])
 
-    if not user_message and (not isinstance(history, list) or len(history) == 0):
+    if not user_message:
         return jsonify({"message": "Pesan kosong"}), 400
 
+    conversations = get_conversations()
     try:
-        res = answer_question(user_message, history=history if isinstance(history, list) else None)
+        res = answer_question(user_message, history=conversations.history(user_id))
     except Exception as e:
         # Fail-safe: jangan bocorin detail stacktrace ke client.
         return jsonify({
@@ -30,7 +35,120 @@ def chat():
             "detail": str(e)
         }), 500
 
+    conversations.append(user_id, user_message, res.reply)
     return jsonify({
         "reply": res.reply,
         "contexts": res.contexts,
     }), 200
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@chat_bp.route("/chat/stream", methods=["POST"])
+@jwt_required()
+def chat_stream():
+    """Versi streaming /chat (Server-Sent Events).
+
+    Urutan event: `contexts` ({"contexts": [...]}) begitu retrieval selesai,
+    lalu `delta` ({"text": "..."}) per potongan jawaban, dan terakhir `done`.
+    Kalau gagal di tengah jalan dikirim event `error` ({"message": ...}).
+    Jawaban masuk riwayat percakapan setelah selesai di-stream.
+    """
+    user_id = get_jwt_identity()
+
+    data = request.get_json(silent=True) or {}
+
+    user_message = (data.get("message") or "").strip()
+
+    if not user_message:
+        return jsonify({"message": "Pesan kosong"}), 400
+
+    conversations = get_conversations()
+    try:
+        events = stream_answer(user_message, history=conversations.history(user_id))
+    except Exception as e:
+        return jsonify({
+            "message": "Gagal memproses chat RAG",
+            "detail": str(e)
+        }), 500
+
+    def generate():
+        parts = []
+        try:
+            for kind, payload in events:
+                if kind == "contexts":
+                    yield _sse("contexts", {"contexts": payload})
+                else:
+                    parts.append(payload)
+                    yield _sse("delta", {"text": payload})
+        except Exception as e:
+            yield _sse("error", {"message": "Gagal memproses chat RAG", "detail": str(e)})
+            return
+        conversations.append(user_id, user_message, "".join(parts))
+        yield _sse("done", {})
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        # X-Accel-Buffering: supaya nginx tidak menahan event sampai response selesai
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@chat_bp.route("/chat/history", methods=["GET"])
+@jwt_required()
+def chat_history():
+    """Riwayat percakapan user ini yang disimpan server (lama -> baru)."""
+    return jsonify({"history": get_conversations().history(get_jwt_identity())}), 200
+
+
+@chat_bp.route("/chat/history", methods=["DELETE"])
+@jwt_required()
+def chat_history_clear():
+    """Mulai percakapan baru: hapus riwayat user ini."""
+    get_conversations().clear(get_jwt_identity())
+    return jsonify({"message": "Riwayat chat dihapus"}), 200
+
+
+@chat_bp.route("/chat/batch", methods=["POST"])
+@jwt_required()
+@admin_required
+def chat_batch():
+    """Jawab banyak pertanyaan sekaligus (evaluasi offline / precompute FAQ).
+
+    Body: {"questions": ["...", ...]}. Hasil: {"results": [{"reply", "contexts"}, ...]}
+    dengan urutan sama seperti `questions`.
+    """
+    data = request.get_json(silent=True) or {}
+    questions = data.get("questions")
+
+    if not isinstance(questions, list) or not questions:
+        return jsonify({"message": "questions harus berupa list pertanyaan"}), 400
+    if not all(isinstance(q, str) for q in questions):
+        return jsonify({"message": "Setiap pertanyaan harus berupa teks"}), 400
+
+    max_questions = int(current_app.config.get("RAG_BATCH_MAX_QUESTIONS", 500))
+    if len(questions) > max_questions:
+        return jsonify({"message": f"Maksimal {max_questions} pertanyaan per request"}), 400
+
+    try:
+        results = answer_many([q.strip() for q in questions])
+    except Exception as e:
+        return jsonify({
+            "message": "Gagal memproses chat RAG",
+            "detail": str(e)
+        }), 500
+
+    return jsonify({
+        "results": [{"reply": r.reply, "contexts": r.contexts} for r in results],
+    }), 200
+
+
+@chat_bp.route("/chat/stats", methods=["GET"])
+@jwt_required()
+@admin_required
+def chat_stats():
+    """Statistik engine RAG di worker ini (index + cache jawaban + riwayat percakapan)."""
+    return jsonify(dict(get_engine().stats(), conversations=get_conversations().stats())), 200
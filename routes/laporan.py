@@ -3,7 +3,9 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from extensions import db
 from models import Laporan, User
-from ai.predict import predict_image
+from ai.predict import model_version, predict_image_bytes
+from ai.cache import content_digest, prediction_cache
+from ai.jobs import AI_LABEL_PENDING, JOB_DONE, JOB_PENDING, ai_status_json, classification_queue
 import os
 import time
 
@@ -20,9 +22,24 @@ def kirim_laporan():
     
     filename = f"{int(time.time())}_{secure_filename(foto.filename)}"
     foto_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-    foto.save(foto_path)
+    # Foto dibaca sekali ke memori: dipakai untuk hash cache, klasifikasi, dan disimpan ke disk.
+    foto_bytes = foto.read()
 
-    ai_result = predict_image(foto_path)
+    # Foto yang sama persis (mis. upload ulang) langsung pakai hasil cache.
+    foto_digest = content_digest(foto_bytes)
+    ai_result = prediction_cache.get(foto_digest)
+
+    # Mode async: laporan langsung disimpan, klasifikasi jalan di background.
+    async_ai = current_app.config.get("AI_ASYNC", True)
+    if ai_result is None and not async_ai:
+        ai_result = predict_image_bytes(foto_bytes)
+        prediction_cache.put(foto_digest, ai_result, version=ai_result["model_version"])
+    need_job = ai_result is None
+    if need_job:
+        ai_result = {"label": AI_LABEL_PENDING, "confidence": None}
+
+    with open(foto_path, "wb") as f:
+        f.write(foto_bytes)
 
     
     laporan = Laporan(
@@ -39,15 +56,40 @@ def kirim_laporan():
     )
 
     db.session.add(laporan)
+    done_version = None if need_job else (ai_result.get("model_version") or model_version())
+    job = classification_queue.create_job(laporan, done_version=done_version)
     db.session.commit()
 
+    if need_job:
+        classification_queue.submit(job.id, data=foto_bytes)
+
     return jsonify({
         "message": "Laporan berhasil dikirim",
+        "id": laporan.id,
+        "ai_status": JOB_PENDING if need_job else JOB_DONE,
         "ai_label": ai_result["label"],
-        "ai_confidence": ai_result["confidence"]
+        "ai_confidence": ai_result["confidence"],
+        "ai_model_version": done_version,
     }), 201
 
 
+@laporan_bp.route('/laporan/<int:laporan_id>/ai', methods=['GET'])
+@jwt_required()
+def get_laporan_ai(laporan_id):
+    """Poll hasil klasifikasi AI (ai_status: pending/running/done/failed)."""
+    user_id = int(get_jwt_identity())
+    laporan = Laporan.query.get(laporan_id)
+    if not laporan:
+        return jsonify({"message": "Laporan tidak ditemukan"}), 404
+
+    if laporan.user_id != user_id:
+        user = User.query.get(user_id)
+        if not user or user.role != 'admin':
+            return jsonify({"message": "Akses ditolak"}), 403
+
+    return jsonify(ai_status_json(laporan)), 200
+
+
 @laporan_bp.route('/laporan/<int:laporan_id>/tanggapi', methods=['PUT'])
 @jwt_required()
 def tanggapi_laporan(laporan_id):
@@ -1,7 +1,12 @@
+import os
+
+# Script ini cuma butuh RAG, jangan ikut warm-up model classifier.
+os.environ.setdefault("AI_WARMUP", "0")
+
 from app import app
 from ai.rag.rag_engine import answer_question
 
 if __name__ == "__main__":
     with app.app_context():
         res = answer_question("Apa itu EcoSea?")
-        print(res.reply)
\ No newline at end of file
+        print(res.reply)